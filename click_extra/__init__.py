@@ -15,7 +15,11 @@
 # Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
 """Expose package-wide elements."""
 
+from __future__ import annotations
+
 import sys
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
 
 __version__ = "4.6.4"
 """Examples of valid version strings according :pep:`440#version-scheme`:
@@ -48,6 +52,14 @@ else:
         return lru_cache(maxsize=None)(user_function)
 
 
+_namespace = globals()
+"""Reference to the module's namespace.
+
+.. caution::
+    Captured before the star imports below, as these are leaking the
+    ``click.globals`` submodule and shadows the ``globals()`` builtin.
+"""
+
 # Import all click's module-level content to allow for drop-in replacement.
 # XXX Star import is really badly supported by mypy for now and leads to lots of
 # "Module 'XXX' has no attribute 'YYY'". See: https://github.com/python/mypy/issues/4930
@@ -56,60 +68,158 @@ from click import *  # noqa: E402, F403
 from click.core import ParameterSource  # noqa: E402
 from cloup import *  # type: ignore[no-redef, assignment] # noqa: E402, F403
 
-from .colorize import (  # noqa: E402
-    ColorOption,
-    HelpExtraFormatter,
-    HelpExtraTheme,
-    HelpOption,
-)
-from .commands import (  # noqa: E402
-    ExtraCommand,
-    ExtraContext,
-    ExtraGroup,
-)
-from .config import ConfigOption  # noqa: E402
-from .decorators import (  # type: ignore[no-redef, has-type] # noqa: E402
-    color_option,
-    command,
-    config_option,
-    extra_command,
-    extra_group,
-    extra_version_option,
-    group,
-    help_option,
-    show_params_option,
-    table_format_option,
-    telemetry_option,
-    timer_option,
-    verbosity_option,
-)
-from .logging import (  # noqa: E402
-    ExtraLogFormatter,
-    ExtraLogHandler,
-    VerbosityOption,
-    extra_basic_config,
-)
-from .parameters import (  # noqa: E402
-    ExtraOption,
-    ParamStructure,
-    ShowParamsOption,
-    search_params,
-)
-from .tabulate import TableFormatOption  # noqa: E402
-from .telemetry import TelemetryOption  # noqa: E402
-from .testing import ExtraCliRunner  # noqa: E402
-from .timer import TimerOption  # noqa: E402
-from .version import ExtraVersionOption  # noqa: E402
+if TYPE_CHECKING:
+    from .colorize import (
+        ColorOption,
+        HelpCache,
+        HelpExtraFormatter,
+        HelpExtraTheme,
+        HelpOption,
+    )
+    from .commands import (
+        ExtraCommand,
+        ExtraContext,
+        ExtraGroup,
+        LazyCommand,
+        LazyGroup,
+    )
+    from .config import ConfigOption
+    from .decorators import (  # type: ignore[no-redef, has-type]
+        color_option,
+        command,
+        config_option,
+        extra_command,
+        extra_group,
+        extra_version_option,
+        group,
+        help_option,
+        lazy_group,
+        log_file_option,
+        log_format_option,
+        show_params_option,
+        table_format_option,
+        telemetry_option,
+        timer_option,
+        verbosity_option,
+    )
+    from .logging import (
+        AsyncLogHandler,
+        BufferedFileHandler,
+        ExtraLogFormatter,
+        ExtraLogHandler,
+        JSONLogFormatter,
+        LogFileOption,
+        LogFormatOption,
+        VerbosityOption,
+        extra_basic_config,
+    )
+    from .parameters import (
+        ExtraOption,
+        ParamStructure,
+        ShowParamsOption,
+        search_params,
+    )
+    from .tabulate import TableFormatOption
+    from .telemetry import TelemetryOption
+    from .testing import ExtraCliRunner
+    from .timer import TimerOption
+    from .version import ExtraVersionOption
+
+
+_lazy_members: dict[str, str] = {
+    "ColorOption": "colorize",
+    "HelpCache": "colorize",
+    "HelpExtraFormatter": "colorize",
+    "HelpExtraTheme": "colorize",
+    "HelpOption": "colorize",
+    "ExtraCommand": "commands",
+    "ExtraContext": "commands",
+    "ExtraGroup": "commands",
+    "LazyCommand": "commands",
+    "LazyGroup": "commands",
+    "ConfigOption": "config",
+    "color_option": "decorators",
+    "command": "decorators",
+    "config_option": "decorators",
+    "extra_command": "decorators",
+    "extra_group": "decorators",
+    "extra_version_option": "decorators",
+    "group": "decorators",
+    "help_option": "decorators",
+    "lazy_group": "decorators",
+    "log_file_option": "decorators",
+    "log_format_option": "decorators",
+    "show_params_option": "decorators",
+    "table_format_option": "decorators",
+    "telemetry_option": "decorators",
+    "timer_option": "decorators",
+    "verbosity_option": "decorators",
+    "AsyncLogHandler": "logging",
+    "BufferedFileHandler": "logging",
+    "ExtraLogFormatter": "logging",
+    "ExtraLogHandler": "logging",
+    "JSONLogFormatter": "logging",
+    "LogFileOption": "logging",
+    "LogFormatOption": "logging",
+    "VerbosityOption": "logging",
+    "extra_basic_config": "logging",
+    "ExtraOption": "parameters",
+    "ParamStructure": "parameters",
+    "ShowParamsOption": "parameters",
+    "search_params": "parameters",
+    "TableFormatOption": "tabulate",
+    "TelemetryOption": "telemetry",
+    "ExtraCliRunner": "testing",
+    "TimerOption": "timer",
+    "ExtraVersionOption": "version",
+}
+"""Map Click Extra's own members exposed at the root of the package to the submodule
+implementing them.
+
+These are imported on first access by ``__getattr__`` below, so ``import click_extra``
+doesn't pay for loading the configuration parsers, the testing utilities or the
+version introspection machinery until they're actually needed.
+"""
+
+# Some of our members shadows Click and Cloup ones of the same name (like ``command``
+# or ``group``). Remove the latter from the namespace so they don't bypass the lazy
+# loader.
+for _name in _lazy_members:
+    _namespace.pop(_name, None)
+del _name
+
+
+def __getattr__(name: str) -> Any:
+    """Import Click Extra's own members on first access.
+
+    Implements :pep:`562` module-level attribute access. The resolved member is then
+    cached in the module's namespace so subsequent lookups are direct.
+    """
+    submodule = _lazy_members.get(name)
+    if submodule is None:
+        msg = f"module {__name__!r} has no attribute {name!r}"
+        raise AttributeError(msg)
+    member = getattr(import_module(f".{submodule}", __name__), name)
+    _namespace[name] = member
+    return member
+
+
+def __dir__() -> list[str]:
+    """Expose lazy members alongside the ones already loaded."""
+    return sorted(set(_namespace).union(_lazy_members))
+
 
 __all__ = [  # noqa: F405
     "Abort",
     "Argument",
     "argument",
+    "AsyncLogHandler",
     "BadArgumentUsage",
     "BadOptionUsage",
     "BadParameter",
     "BaseCommand",
     "BOOL",
+    "BufferedFileHandler",
     "Choice",
     "clear",
     "ClickException",
@@ -164,6 +274,7 @@ __all__ = [  # noqa: F405
     "Group",
     "group",
     "help_option",
+    "HelpCache",
     "HelpExtraFormatter",
     "HelpExtraTheme",
     "HelpFormatter",
@@ -172,7 +283,15 @@ __all__ = [  # noqa: F405
     "HelpTheme",
     "INT",
     "IntRange",
+    "JSONLogFormatter",
     "launch",
+    "lazy_group",
+    "LazyCommand",
+    "LazyGroup",
+    "log_file_option",
+    "log_format_option",
+    "LogFileOption",
+    "LogFormatOption",
     "make_pass_decorator",
     "MissingParameter",
     "MultiCommand",
@@ -0,0 +1,351 @@
+# Copyright Kevin Deldycke <kevin@deldycke.com> and contributors.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+"""Batch mode, to run many command lines through the same CLI in one process.
+
+Records are newline-delimited command lines, either shell-quoted or as JSON arrays of
+strings. Each record is run against the already-built command tree, in isolation, and
+reports its own exit code and output.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import logging
+import multiprocessing
+import os
+import shlex
+import sys
+import traceback
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from itertools import islice
+from typing import IO, Iterable, Iterator, cast
+
+import click
+from boltons.strutils import strip_ansi
+
+from .server import load_cli
+
+CHUNK_SIZE = 16
+"""Number of records sent at once to a worker process."""
+
+MAX_PENDING_CHUNKS = 2
+"""Number of chunks per worker process submitted ahead of the results yielded."""
+
+
+@dataclass
+class BatchResult:
+    """Outcome of a record run by the batch."""
+
+    line: int
+    """Line number of the record in the input, starting at 1."""
+
+    args: list[str]
+    exit_code: int
+    stdout: str
+    stderr: str
+
+
+def strip_comment(record: str) -> str:
+    """Remove the trailing comment of a shell-quoted record.
+
+    Like in a shell, a comment starts with an unquoted ``#`` at the beginning of a
+    word. A ``#`` within a word, like in ``issue#12``, is kept.
+    """
+    quote = None
+    escaped = False
+    for index, char in enumerate(record):
+        if escaped:
+            escaped = False
+        elif char == "\\" and quote != "'":
+            escaped = True
+        elif quote:
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            quote = char
+        elif char == "#" and (index == 0 or record[index - 1].isspace()):
+            return record[:index]
+    return record
+
+
+def parse_record(record: str) -> list[str] | None:
+    """Parse a record into a list of arguments.
+
+    Records starting with ``[`` are parsed as JSON arrays of strings, others are split
+    like a shell would, including comments. Returns ``None`` for blank records and
+    comments.
+
+    Raises ``ValueError`` if the record cannot be parsed.
+    """
+    record = record.strip()
+    if record.startswith("["):
+        args = json.loads(record)
+        if not isinstance(args, list) or not all(isinstance(a, str) for a in args):
+            msg = "JSON records must be arrays of strings."
+            raise ValueError(msg)
+        return args
+    args = shlex.split(strip_comment(record))
+    return args if args else None
+
+
+@contextmanager
+def isolated_loggers() -> Iterator[None]:
+    """Restore the level, handlers and flags of all loggers on exit.
+
+    Loggers created in the meantime are reset to their pristine state.
+    """
+    manager = logging.root.manager
+    loggers = [logging.root] + [
+        logger
+        for logger in manager.loggerDict.values()
+        if isinstance(logger, logging.Logger)
+    ]
+    snapshot = {
+        logger.name: (logger.level, list(logger.handlers), logger.propagate)
+        for logger in loggers
+    }
+    disabled = {logger.name: logger.disabled for logger in loggers}
+    try:
+        yield
+    finally:
+        for logger in [logging.root, *manager.loggerDict.values()]:
+            if not isinstance(logger, logging.Logger):
+                continue
+            level, handlers, propagate = snapshot.get(
+                logger.name,
+                (logging.NOTSET, [], True),
+            )
+            logger.setLevel(level)
+            logger.handlers[:] = handlers
+            logger.propagate = propagate
+            logger.disabled = disabled.get(logger.name, False)
+
+
+@contextmanager
+def isolated_environ() -> Iterator[None]:
+    """Restore environment variables on exit."""
+    environ = os.environ.copy()
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(environ)
+
+
+@contextmanager
+def captured_streams() -> Iterator[tuple[io.BytesIO, io.BytesIO]]:
+    """Replace the standard streams with in-memory ones, and yield the buffers of
+    ``<stdout>`` and ``<stderr>``.
+
+    ``<stdin>`` is empty, so records do not consume the input of the batch.
+    """
+    stdout, stderr = io.BytesIO(), io.BytesIO()
+    original_streams = sys.stdin, sys.stdout, sys.stderr
+    sys.stdin = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+    sys.stdout = io.TextIOWrapper(stdout, encoding="utf-8", write_through=True)
+    sys.stderr = io.TextIOWrapper(
+        stderr, encoding="utf-8", errors="backslashreplace", write_through=True
+    )
+    try:
+        yield stdout, stderr
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        sys.stdin, sys.stdout, sys.stderr = original_streams
+
+
+def invoke_cli(cli: click.Command, args: list[str], color: bool = False) -> int:
+    """Run the CLI in non-standalone mode, and returns its exit code.
+
+    Errors are reported on ``<stderr>`` like in standalone mode.
+
+    .. caution::
+        Click returns the exit code of explicit exits like ``ctx.exit(3)`` in
+        non-standalone mode, but also the value returned by the command. Integers
+        returned by commands are therefore taken as exit codes.
+    """
+    try:
+        rv = cli.main(args, prog_name=cli.name, standalone_mode=False, color=color)
+    except click.ClickException as ex:
+        ex.show()
+        return ex.exit_code
+    except click.Abort:
+        click.echo("Aborted!", err=True)
+        return 1
+    except SystemExit as ex:
+        if ex.code is None:
+            return 0
+        if isinstance(ex.code, int):
+            return ex.code
+        print(ex.code, file=sys.stderr)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+    if isinstance(rv, int) and not isinstance(rv, bool):
+        return rv
+    return 0
+
+
+def run_record(
+    cli: click.Command,
+    line: int,
+    record: str,
+    color: bool = False,
+) -> BatchResult:
+    """Run a record against the CLI, with isolated streams, environment and loggers."""
+    try:
+        args = parse_record(record) or []
+    except ValueError as ex:
+        return BatchResult(line, [], 2, "", f"Error: Invalid record: {ex}\n")
+
+    with isolated_loggers(), isolated_environ(), captured_streams() as streams:
+        exit_code = invoke_cli(cli, args, color=color)
+        stdout, stderr = (
+            stream.getvalue().decode("utf-8", "replace") for stream in streams
+        )
+
+    # Output not going through Click, like print(), keeps its colors.
+    if not color:
+        stdout, stderr = strip_ansi(stdout), strip_ansi(stderr)
+    return BatchResult(line, args, exit_code, stdout, stderr)
+
+
+def iter_records(records: Iterable[str]) -> Iterator[tuple[int, str]]:
+    """Number records and skip blank ones and comments."""
+    for line, record in enumerate(records, start=1):
+        stripped = record.strip()
+        if stripped and not stripped.startswith("#"):
+            yield line, record
+
+
+_worker_cli: click.Command | None = None
+"""CLI run by the current worker process."""
+
+
+def _init_worker(cli: click.Command | str) -> None:
+    global _worker_cli
+    _worker_cli = load_cli(cli) if isinstance(cli, str) else cli
+
+
+def _run_in_worker(chunk: list[tuple[int, str]], color: bool) -> list[BatchResult]:
+    cli = cast(click.Command, _worker_cli)
+    return [run_record(cli, line, record, color=color) for line, record in chunk]
+
+
+def iter_chunks(
+    items: Iterable[tuple[int, str]],
+    size: int,
+) -> Iterator[list[tuple[int, str]]]:
+    """Group items into lists of ``size`` items, the last one being shorter."""
+    iterator = iter(items)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def run_batch(
+    cli: click.Command | str,
+    records: Iterable[str],
+    workers: int = 1,
+    color: bool = False,
+) -> Iterator[BatchResult]:
+    """Run each of the ``records`` against ``cli`` and yield their results in order.
+
+    ``cli`` is a command, or the import path of a command like ``package.module:cli``.
+
+    With more than one of ``workers``, records are dispatched to a pool of processes,
+    in chunks of ``CHUNK_SIZE`` records. Only ``MAX_PENDING_CHUNKS`` chunks per worker
+    are submitted ahead of the results yielded, so ``records`` are read as they are
+    run. On platforms not supporting ``fork()``, ``cli`` has to be an import path so
+    workers can import it.
+    """
+    if workers <= 1:
+        command = load_cli(cli) if isinstance(cli, str) else cli
+        for line, record in iter_records(records):
+            yield run_record(command, line, record, color=color)
+        return
+
+    mp_context = None
+    if "fork" in multiprocessing.get_all_start_methods():
+        mp_context = multiprocessing.get_context("fork")
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp_context,
+        initializer=_init_worker,
+        initargs=(cli,),
+    ) as executor:
+        pending: deque[Future[list[BatchResult]]] = deque()
+        for chunk in iter_chunks(iter_records(records), CHUNK_SIZE):
+            if len(pending) >= MAX_PENDING_CHUNKS * workers:
+                yield from pending.popleft().result()
+            pending.append(executor.submit(_run_in_worker, chunk, color))
+        while pending:
+            yield from pending.popleft().result()
+
+
+@click.command()
+@click.argument("import_path")
+@click.argument("records", type=click.File("r"), default="-")
+@click.option(
+    "-w",
+    "--workers",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="Number of processes running records in parallel.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(["text", "json"]),
+    default="text",
+    show_default=True,
+    help="Print the output of records as-is, or one JSON object per record.",
+)
+@click.option("--color/--no-color", default=False, help="Keep colors of records.")
+def batch(
+    import_path: str,
+    records: IO[str],
+    workers: int,
+    output_format: str,
+    color: bool,
+) -> None:
+    """Run the command lines read from RECORDS against the CLI at IMPORT_PATH.
+
+    RECORDS has one command line per line, shell-quoted or as a JSON array of strings.
+    Reads from <stdin> by default. Exits with 1 if any record failed.
+    """
+    failed = 0
+    for result in run_batch(import_path, records, workers=workers, color=color):
+        if result.exit_code:
+            failed += 1
+        if output_format == "json":
+            click.echo(json.dumps(asdict(result)))
+        else:
+            click.echo(result.stdout, nl=False, color=color)
+            click.echo(result.stderr, nl=False, err=True, color=color)
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    batch()
@@ -20,16 +20,30 @@ from __future__ import annotations
 import dataclasses
 import os
 import re
+import sys
+from collections import OrderedDict
 from configparser import RawConfigParser
+from contextlib import suppress
 from dataclasses import dataclass
+from functools import cached_property, partial
 from gettext import gettext as _
-from operator import getitem
-from typing import Sequence, cast
+from pathlib import Path
+from queue import Full, Queue
+from threading import Event, Thread
+from typing import (
+    Callable,
+    Hashable,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Sequence,
+    cast,
+)
 
 import click
 import cloup
 import regex as re3
-from boltons.strutils import complement_int_list, int_ranges_from_int_list
+from click.globals import pop_context, push_context
 from cloup._util import identity
 from cloup.styling import Color, IStyle
 
@@ -41,12 +55,48 @@ from . import (
     Parameter,
     ParameterSource,
     Style,
-    cache,
     echo,
+    echo_via_pager,
     get_current_context,
 )
 from .parameters import ExtraOption
 
+_STYLE_PROBE = "\x00"
+"""Placeholder text styled once to extract the ANSI codes surrounding it."""
+
+
+def compile_style(style: IStyle | None) -> tuple[str, str] | None:
+    """Returns the ANSI ``(prefix, suffix)`` pair a style wraps its text with.
+
+    Returns ``None`` for arbitrary callables, which might transform the text itself and
+    have to be called on each string.
+
+    The pair of a Cloup ``Style`` is computed once and kept on the style instance, so
+    it is shared by all themes and options referencing that style.
+    """
+    if style is None or style is identity:
+        return "", ""
+    if not isinstance(style, Style) or style.text_transform is not None:
+        return None
+    codes = style.__dict__.get("_ansi_codes")
+    if codes is None:
+        prefix, _sep, suffix = style(_STYLE_PROBE).partition(_STYLE_PROBE)
+        codes = prefix, suffix
+        # Styles are frozen dataclasses: bypass their __setattr__ like Cloup does.
+        object.__setattr__(style, "_ansi_codes", codes)
+    return codes
+
+
+def apply_style(style: IStyle | None, text: str) -> str:
+    """Styles ``text`` by concatenating the precompiled ANSI codes of ``style``.
+
+    Falls back to calling ``style`` if it cannot be compiled.
+    """
+    codes = compile_style(style)
+    if codes is None:
+        return cast("IStyle", style)(text)
+    return codes[0] + text + codes[1]
+
 
 @dataclass(frozen=True)
 class HelpExtraTheme(cloup.HelpTheme):
@@ -109,6 +159,25 @@ class HelpExtraTheme(cloup.HelpTheme):
         # No new styles, return the same instance.
         return self
 
+    @cached_property
+    def ansi_table(self) -> dict[str, tuple[str, str] | None]:
+        """Table of ANSI ``(prefix, suffix)`` pairs of each style of the theme.
+
+        Compiled on first access and kept for the lifetime of the theme. Styles which
+        cannot be compiled by ``compile_style()`` are mapped to ``None``.
+        """
+        return {
+            field.name: compile_style(getattr(self, field.name))
+            for field in dataclasses.fields(self)
+        }
+
+    def render(self, style_id: str, text: str) -> str:
+        """Apply the style ``style_id`` of the theme to ``text``."""
+        codes = self.ansi_table[style_id]
+        if codes is None:
+            return cast("IStyle", getattr(self, style_id))(text)
+        return codes[0] + text + codes[1]
+
     @staticmethod
     def dark() -> HelpExtraTheme:
         """A theme assuming a dark terminal background color."""
@@ -236,9 +305,19 @@ class ColorOption(ExtraOption):
                 # One env var is enough to activate colorization.
                 value = True in colorize_from_env
 
+        # Colors are only forced by default if neither the user, the environment nor
+        # the context asked for them.
+        color_forced = bool(
+            value
+            and not colorize_from_env
+            and ctx.get_parameter_source(param.name) == ParameterSource.DEFAULT
+            and (ctx.color is None or ctx.meta.get("click_extra.color_forced"))
+        )
+
         # There is an undocumented color flag in context:
         # https://github.com/pallets/click/blob/65eceb0/src/click/globals.py#L56-L69
         ctx.color = value
+        ctx.meta["click_extra.color_forced"] = color_forced
 
         if not value:
 
@@ -323,10 +402,81 @@ class HelpOption(ExtraOption):
         but forces the closing of the context before exiting.
         """
         if value and not ctx.resilient_parsing:
-            echo(ctx.get_help(), color=ctx.color)
+            command = ctx.command
+            if getattr(command, "help_pager", False):
+                echo_via_pager(command.iter_help(ctx), color=ctx.color)
+            elif getattr(command, "help_stream", False):
+                command.stream_help(ctx, partial(echo, nl=False, color=ctx.color))
+                echo(color=ctx.color)
+            else:
+                echo(ctx.get_help(), color=ctx.color)
             ctx.exit()
 
 
+class _HelpStreamClosed(Exception):
+    """Raised in the rendering thread of a help screen no longer consumed."""
+
+
+class HelpCache:
+    """A bounded LRU cache of rendered help screens.
+
+    Help screens are kept in memory. If a ``path`` is provided, each newly rendered help
+    screen is also written to a plain text file in that directory, so it can be printed
+    by shell wrappers without importing the CLI. Files are named after the command
+    path, the rendering width and the color flag, like ``my-cli.subcommand.80.ansi``
+    or ``my-cli.subcommand.80.txt``.
+    """
+
+    def __init__(self, max_size: int = 128, path: str | Path | None = None) -> None:
+        self.max_size = max_size
+        self.path = Path(path).expanduser() if path is not None else None
+        self._entries: OrderedDict[Hashable, str] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> str | None:
+        """Returns the help screen stored under ``key``, or ``None``."""
+        help_text = self._entries.get(key)
+        if help_text is not None:
+            self._entries.move_to_end(key)
+        return help_text
+
+    def set(self, key: Hashable, help_text: str, filename: str | None = None) -> None:
+        """Store the help screen under ``key``, and evict the least recently used
+        entries beyond ``max_size``.
+
+        The help screen is written to ``filename`` in the cache directory, if set.
+        """
+        self._entries[key] = help_text
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+        if self.path and filename:
+            self.path.mkdir(parents=True, exist_ok=True)
+            self.path.joinpath(filename).write_text(help_text, encoding="utf-8")
+
+    def clear(self) -> None:
+        """Drop all help screens kept in memory."""
+        self._entries.clear()
+
+
+def color_enabled(ctx: Context) -> bool:
+    """Resolve the color setting of the context.
+
+    If ``ctx.color`` is not set, or only forced to ``True`` by default, follows Click's
+    auto-detection, in which colors are only kept if the standard output is a
+    terminal.
+    """
+    if ctx.color is not None and not (
+        ctx.color and ctx.meta.get("click_extra.color_forced")
+    ):
+        return ctx.color
+    # Look up the function at call time, as it is patched by Click's CliRunner.
+    return not click.utils.should_strip_ansi(sys.stdout)
+
+
 class ExtraHelpColorsMixin:  # (Command)??
     """Adds extra-keywords highlighting to Click commands.
 
@@ -444,13 +594,161 @@ class ExtraHelpColorsMixin:  # (Command)??
         # Return our own help option.
         return HelpOption(param_decls=help_option.opts)
 
+    help_cache: HelpCache | None = None
+    """Opt-in cache of rendered help screens.
+
+    Set it on a command instance, or on a class to share a cache between all its
+    commands.
+    """
+
+    help_stream: bool = False
+    """Stream the help screen to the terminal section by section, instead of rendering
+    it in full before printing it."""
+
+    help_pager: bool = False
+    """Stream the help screen through the system pager. Implies ``help_stream``."""
+
+    help_stream_buffer: int = 8
+    """Maximum number of rendered chunks waiting to be consumed by the pager."""
+
+    def stream_help(self, ctx: Context, write: Callable[[str], None]) -> None:
+        """Render the help screen chunk by chunk and pass each chunk to ``write``.
+
+        Chunks are highlighted as soon as they are formatted, so the memory used is
+        bounded by the size of a chunk rather than the whole help screen. Their
+        concatenation is the same as ``self.get_help(ctx)``.
+
+        If a ``help_cache`` is set, the help screen is rendered in full by
+        ``get_help()`` instead, to be kept in the cache.
+        """
+        if self.help_cache is not None:
+            write(self.get_help(ctx))
+            return
+        ctx.formatter_class = HelpExtraFormatter
+        formatter = cast(HelpExtraFormatter, ctx.make_formatter())
+        formatter.stream = write
+        self.format_help(ctx, formatter)
+        formatter.flush(final=True)
+
+    def iter_help(self, ctx: Context) -> Iterator[str]:
+        """Generator of the chunks produced by ``stream_help()``.
+
+        The help screen is rendered in a background thread, which is paused as long as
+        ``help_stream_buffer`` chunks are waiting to be consumed. Suitable for
+        ``click.echo_via_pager()``, which displays the first screen as soon as it is
+        rendered.
+        """
+        chunks: Queue[str | BaseException | None] = Queue(self.help_stream_buffer)
+        closed = Event()
+
+        def put(item: str | BaseException | None) -> None:
+            while not closed.is_set():
+                try:
+                    chunks.put(item, timeout=0.1)
+                except Full:
+                    continue
+                return
+            raise _HelpStreamClosed
+
+        def render() -> None:
+            # The context is made current in the thread without being entered, to not
+            # close it on exit.
+            push_context(ctx)
+            try:
+                self.stream_help(ctx, put)
+                put(None)
+            except _HelpStreamClosed:
+                pass
+            except BaseException as ex:
+                with suppress(_HelpStreamClosed):
+                    put(ex)
+            finally:
+                pop_context()
+
+        thread = Thread(target=render, name="click-extra-help", daemon=True)
+        thread.start()
+        try:
+            while (item := chunks.get()) is not None:
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            closed.set()
+            thread.join()
+
+    def help_cache_key(self, ctx: Context) -> tuple[Hashable, ...]:
+        """Returns the key under which the help screen of the command is cached.
+
+        It is made of all the parameters influencing the rendering: command identity,
+        width, color flag, theme and context settings. Parameters and subcommands are
+        part of the key too, so adding any of them invalidates the cached screen.
+
+        Themes are not hashable, so the theme is represented by its table of ANSI
+        codes, and by the style itself for styles that cannot be compiled. Uncolored
+        screens do not depend on the theme.
+        """
+        commands = getattr(self, "commands", {})
+        formatter = ctx.make_formatter()
+        color = color_enabled(ctx)
+        theme_key = None
+        if color:
+            theme = cast(HelpExtraFormatter, formatter).theme
+            theme_key = tuple(
+                (style_id, codes if codes is not None else getattr(theme, style_id))
+                for style_id, codes in theme.ansi_table.items()
+            )
+        return (
+            self,
+            ctx.command_path,
+            formatter.width,
+            color,
+            theme_key,
+            repr(ctx.formatter_settings),
+            tuple(ctx.help_option_names),
+            ctx.show_default,
+            ctx.auto_envvar_prefix,
+            repr(ctx.default_map),
+            tuple(self.params),  # type: ignore[attr-defined]
+            tuple(commands.items()),
+        )
+
     def get_help(self, ctx: Context) -> str:
-        """Replace default formatter by our own."""
+        """Replace default formatter by our own.
+
+        Returns the help screen from the ``help_cache`` if enabled.
+        """
         ctx.formatter_class = HelpExtraFormatter
-        return super().get_help(ctx)  # type: ignore[no-any-return,misc]
+        if self.help_cache is None:
+            return super().get_help(ctx)  # type: ignore[no-any-return,misc]
+
+        key = self.help_cache_key(ctx)
+        help_text = self.help_cache.get(key)
+        if help_text is None:
+            help_text = cast(str, super().get_help(ctx))  # type: ignore[misc]
+            _, command_path, width, color = key[:4]
+            filename = (
+                f"{cast(str, command_path).replace(' ', '.')}.{width}."
+                f"{'ansi' if color else 'txt'}"
+            )
+            self.help_cache.set(key, help_text, filename)
+        return help_text
 
     def format_help(self, ctx: Context, formatter: HelpExtraFormatter) -> None:
-        """Feed our custom formatter instance with the keywords to highlight."""
+        """Feed our custom formatter instance with the keywords to highlight.
+
+        Regular expressions matching the keywords are compiled once and cached on the
+        command. They are only recompiled if the collected keywords change, like when
+        parameters are added to the command.
+        """
+        # Skip keyword collection and highlighting altogether if colors are disabled:
+        # all ANSI codes would be stripped on output anyway.
+        if not color_enabled(ctx):
+            formatter.theme = nocolor_theme
+            formatter.no_color = True
+            super().format_help(ctx, formatter)  # type: ignore[misc]
+            return
+
+        keywords = self._collect_keywords(ctx)
         (
             formatter.cli_names,
             formatter.subcommands,
@@ -461,7 +759,14 @@ class ExtraHelpColorsMixin:  # (Command)??
             formatter.metavars,
             formatter.envvars,
             formatter.defaults,
-        ) = self._collect_keywords(ctx)
+        ) = keywords
+
+        cached = getattr(self, "_keyword_patterns", None)
+        if cached is None or cached[0] != keywords:
+            cached = (keywords, formatter.compile_keyword_patterns())
+            self._keyword_patterns = cached
+        formatter.keyword_patterns = cached[1]
+
         super().format_help(ctx, formatter)  # type: ignore[misc]
 
 
@@ -480,6 +785,107 @@ def escape_for_help_screen(text: str) -> str:
     return re.escape(text).replace("-", "-\\s*").replace("\\ ", "\\s+")
 
 
+DEPRECATED_REGEX = re.compile(
+    rf"""
+    (\s)                                         # Any blank char.
+    (?P<deprecated>{re.escape("(Deprecated)")})  # The flag string.
+    """,
+    flags=re.VERBOSE,
+)
+"""Matches the ``(Deprecated)`` label of commands and options."""
+
+BRACKETS_REGEX = re.compile(
+    r"""
+    (\ \ )                  # 2 spaces (column spacing or description spacing).
+    (?P<bracket_1>\[)                  # Square brackets opening.
+
+    (?:                         # Non-capturing group.
+        (?P<envvar_label>
+            env\s+var:            # Starting content within the brackets.
+            \s+                 # Any number of blank chars.
+        )
+        (?P<envvar>.+?)  # Greedy-matching of any string and line returns.
+    )?                  # The envvar group is optional.
+
+    (?P<label_sep>
+        ;               # Separator between labels.
+        \s+                 # Any number of blank chars.
+    )?
+
+    (?:                         # Non-capturing group.
+        (?P<default_label>
+            default:            # Starting content within the brackets.
+            \s+                 # Any number of blank chars.
+        )
+        (?P<default>.+?)  # Greedy-matching of any string and line returns.
+    )?                      # The default group is optional.
+
+    (?P<bracket_2>\])     # Square brackets closing.
+    """,
+    flags=re.VERBOSE | re.DOTALL,
+)
+"""Matches environment variables and defaults in the trailing square brackets of
+options."""
+
+
+def keywords_regex(
+    keywords: Iterable[str],
+    escape: Callable[[str], str] = re.escape,
+    reverse: bool = False,
+) -> str:
+    """Produce a regular expression matching any of the ``keywords``.
+
+    Keywords are factored into a trie of characters, which is much faster to match
+    than a flat alternation of hundreds of keywords. Each character is passed through
+    the ``escape`` function.
+
+    Priority between keywords matching at the same position is the same as an
+    alternation of keywords sorted in lexicographic order, or in reverse order if
+    ``reverse`` is ``True``.
+    """
+    trie: dict[str, dict] = {}
+    for keyword in keywords:
+        node = trie
+        for char in keyword:
+            node = node.setdefault(char, {})
+        # An empty key marks the end of a keyword.
+        node[""] = {}
+
+    def walk(node: dict[str, dict]) -> str:
+        # Consume chains of single characters iteratively, to not hit the recursion
+        # limit on long keywords.
+        chain = ""
+        while len(node) == 1 and "" not in node:
+            char, node = next(iter(node.items()))
+            chain += escape(char)
+        if not node:
+            return chain
+
+        branches = [
+            escape(char) + walk(node[char])
+            for char in sorted(filter(None, node), reverse=reverse)
+        ]
+        # A keyword sorts before all the longer keywords it is a prefix of.
+        if "" in node:
+            if reverse:
+                branches.append("")
+            else:
+                branches.insert(0, "")
+        if len(branches) == 1:
+            return chain + branches[0]
+        return f"{chain}(?:{'|'.join(branches)})"
+
+    return walk(trie)
+
+
+class KeywordPattern(NamedTuple):
+    """A regular expression matching all keywords of the same category."""
+
+    style_group_id: str
+    pattern: re.Pattern
+    prefix_len: int
+
+
 class HelpExtraFormatter(HelpFormatter):
     """Extends Cloup's custom HelpFormatter to highlights options, choices, metavars and
     default values.
@@ -515,10 +921,28 @@ class HelpExtraFormatter(HelpFormatter):
     envvars: set[str] = set()
     defaults: set[str] = set()
 
-    # TODO: Highlight extra keywords <stdout> or <stderr>
+    no_color: bool = False
+    """If ``True``, the help screen is rendered as-is, without keyword highlighting."""
+
+    keyword_patterns: list[KeywordPattern] | None = None
+    """Regular expressions compiled from the keywords above.
 
-    # TODO: add collection of regexps as pre-compiled constants, so we can
-    # inspect them and get some performances improvements.
+    Computed on rendering by ``compile_keyword_patterns()`` if not provided.
+    """
+
+    stream: Callable[[str], None] | None = None
+    """If set, the help screen is streamed to this function chunk by chunk.
+
+    Chunks are highlighted and passed to ``stream`` as soon as a slice of a definition
+    list is written, instead of being accumulated in the buffer until ``getvalue()``.
+    """
+
+    stream_rows: int = 200
+    """Maximum number of rows of definition lists in each streamed chunk."""
+
+    _pending_newlines: str = ""
+
+    # TODO: Highlight extra keywords <stdout> or <stderr>
 
     style_aliases = {
         # Layout elements of the square brackets trailing each option.
@@ -539,7 +963,6 @@ class HelpExtraFormatter(HelpFormatter):
     the canonical style to that regex-specific group ID.
     """
 
-    @cache
     def get_style_id(self, group_id: str) -> str:
         """Get the style ID to apply to a group.
 
@@ -548,11 +971,13 @@ class HelpExtraFormatter(HelpFormatter):
         """
         return self.style_aliases.get(group_id, group_id)
 
-    @cache
     def colorize_group(self, str_to_style: str, group_id: str) -> str:
-        """Colorize a string according to the style of the group ID."""
-        style = cast("IStyle", getattr(self.theme, self.get_style_id(group_id)))
-        return style(str_to_style)
+        """Colorize a string according to the style of the group ID.
+
+        Relies on the ANSI table precompiled by the theme, so styling is a plain
+        concatenation shared by all formatters using the same theme.
+        """
+        return self.theme.render(self.get_style_id(group_id), str_to_style)
 
     def colorize(self, match: re.Match) -> str:
         """Colorize all groups with IDs in the provided matching result.
@@ -601,6 +1026,97 @@ class HelpExtraFormatter(HelpFormatter):
 
         return txt
 
+    def compile_keyword_patterns(self) -> list[KeywordPattern]:
+        """Compile each category of keywords into a single regular expression.
+
+        Keywords of the same category are factored into a trie, so each category is
+        highlighted in one pass over the help screen. Surrounding characters are matched
+        with lookarounds, so that contiguous keywords are all highlighted.
+
+        Categories are returned in the order they are applied.
+        """
+        patterns = []
+        for keywords, reverse, escape, style_group_id, prefix, prefix_len, suffix in (
+            # Subcommands are preceded by 2 spaces (i.e. section indentation) and
+            # followed by any blank char.
+            (
+                self.subcommands,
+                True,
+                re.escape,
+                "subcommand",
+                r"(?<=\ \ )",
+                2,
+                r"(?=\s)",
+            ),
+            # CLI names and commands are surrounded by blank chars.
+            (
+                self.cli_names,
+                True,
+                re.escape,
+                "invoked_command",
+                r"(?<=\s)",
+                1,
+                r"(?=\s)",
+            ),
+        ) + tuple(
+            # A keyword is preceded with either a blank char, an opening square bracket
+            # or a pipe (as in choice strings), or an opening parenthesis. And followed
+            # by any character which is not a word character.
+            (
+                matching_keywords,
+                reverse,
+                escape_for_help_screen,
+                style_group_id,
+                r"(?<=[\s\[\|\(])",
+                1,
+                r"(?=\W)",
+            )
+            for matching_keywords, reverse, style_group_id in (
+                (self.long_options, True, "long_option"),
+                (self.short_options, False, "short_option"),
+                (self.choices, True, "choice"),
+                (self.metavars, True, "metavar"),
+            )
+        ):
+            if not keywords:
+                continue
+            patterns.append(
+                KeywordPattern(
+                    style_group_id,
+                    re.compile(
+                        f"{prefix}{keywords_regex(keywords, escape, reverse)}{suffix}",
+                    ),
+                    prefix_len,
+                ),
+            )
+        return patterns
+
+    def highlight_keywords(
+        self,
+        help_text: str,
+        keyword_pattern: KeywordPattern,
+    ) -> str:
+        """Highlight in one pass all keywords matched by the ``keyword_pattern``.
+
+        Mimics the behavior of a dedicated substitution per keyword, in which the
+        characters surrounding a match are consumed. So the same keyword is not
+        highlighted twice if its occurrences are only separated by these characters.
+        """
+        style_group_id, pattern, prefix_len = keyword_pattern
+        # End position of the last highlighted occurrence of each keyword, including
+        # its trailing character.
+        last_ends: dict[str, int] = {}
+
+        def colorize_keyword(match: re.Match) -> str:
+            keyword = match.group()
+            start, end = match.span()
+            if start - prefix_len < last_ends.get(keyword, 0):
+                return keyword
+            last_ends[keyword] = end + 1
+            return self.colorize_group(keyword, style_group_id)
+
+        return pattern.sub(colorize_keyword, help_text)
+
     def highlight_extra_keywords(self, help_text):
         """Highlight extra keywords in help screens based on the theme.
 
@@ -609,8 +1125,9 @@ class HelpExtraFormatter(HelpFormatter):
         designed for humans.
 
         .. danger::
-            All the regular expressions below are designed to match its original string
-            into a sequence of contiguous groups.
+            The regular expressions of the deprecated flag and the trailing square
+            brackets below are designed to match its original string into a sequence
+            of contiguous groups.
 
             This means each part of the matching result must be encapsulated in a group.
             And subgroups are not allowed (unless their are explicitly set as
@@ -618,78 +1135,23 @@ class HelpExtraFormatter(HelpFormatter):
 
             Groups with a name must have a corresponding style.
         """
+        if self.keyword_patterns is None:
+            self.keyword_patterns = self.compile_keyword_patterns()
+        keyword_patterns = iter(self.keyword_patterns)
+        next_pattern = next(keyword_patterns, None)
+
         # Highlight " (Deprecated)" label, as set by either Click or Cloup:
         # https://github.com/pallets/click/blob/8.0.0rc1/tests/test_commands.py#L322
         # https://github.com/janluke/cloup/blob/v2.1.0/cloup/formatting/_formatter.py#L190
-        help_text = re.sub(
-            rf"""
-            (\s)                                         # Any blank char.
-            (?P<deprecated>{re.escape("(Deprecated)")})  # The flag string.
-            """,
-            self.colorize,
-            help_text,
-            flags=re.VERBOSE,
-        )
+        help_text = DEPRECATED_REGEX.sub(self.colorize, help_text)
 
         # Highlight subcommands.
-        for subcommand in self.subcommands:
-            help_text = re.sub(
-                rf"""
-                (\ \ )                        # 2 spaces (i.e. section indentation).
-                (?P<subcommand>{re.escape(subcommand)})
-                (\s)                          # Any blank char.
-                """,
-                self.colorize,
-                help_text,
-                flags=re.VERBOSE,
-            )
+        if next_pattern and next_pattern.style_group_id == "subcommand":
+            help_text = self.highlight_keywords(help_text, next_pattern)
+            next_pattern = next(keyword_patterns, None)
 
         # Highlight environment variables and defaults in trailing square brackets.
-        help_text = re.sub(
-            r"""
-            (\ \ )                  # 2 spaces (column spacing or description spacing).
-            (?P<bracket_1>\[)                  # Square brackets opening.
-
-            (?:                         # Non-capturing group.
-                (?P<envvar_label>
-                    env\s+var:            # Starting content within the brackets.
-                    \s+                 # Any number of blank chars.
-                )
-                (?P<envvar>.+?)  # Greedy-matching of any string and line returns.
-            )?                  # The envvar group is optional.
-
-            (?P<label_sep>
-                ;               # Separator between labels.
-                \s+                 # Any number of blank chars.
-            )?
-
-            (?:                         # Non-capturing group.
-                (?P<default_label>
-                    default:            # Starting content within the brackets.
-                    \s+                 # Any number of blank chars.
-                )
-                (?P<default>.+?)  # Greedy-matching of any string and line returns.
-            )?                      # The default group is optional.
-
-            (?P<bracket_2>\])     # Square brackets closing.
-            """,
-            self.colorize,
-            help_text,
-            flags=re.VERBOSE | re.DOTALL,
-        )
-
-        # Highlight CLI names and commands.
-        for cli_name in self.cli_names:
-            help_text = re.sub(
-                rf"""
-                (\s)                                        # Any blank char.
-                (?P<invoked_command>{re.escape(cli_name)})  # The CLI name.
-                (\s)                                        # Any blank char.
-                """,
-                self.colorize,
-                help_text,
-                flags=re.VERBOSE,
-            )
+        help_text = BRACKETS_REGEX.sub(self.colorize, help_text)
 
         # Highlight sections.
         # XXX Duplicates Cloup's job, with the only subtlety of not highlighting the
@@ -706,30 +1168,10 @@ class HelpExtraFormatter(HelpFormatter):
         #     flags=re.VERBOSE | re.MULTILINE,
         # )
 
-        # Highlight keywords.
-        for matching_keywords, style_group_id in (
-            (sorted(self.long_options, reverse=True), "long_option"),
-            (sorted(self.short_options), "short_option"),
-            (sorted(self.choices, reverse=True), "choice"),
-            (sorted(self.metavars, reverse=True), "metavar"),
-        ):
-            for keyword in matching_keywords:
-                keyword = escape_for_help_screen(keyword)
-                help_text = re.sub(
-                    rf"""
-                    ([               # A keyword is preceded with either:
-                        \s           # - a blank char
-                        \[           # - an opening square bracket (as in choice string)
-                        \|           # - a pipe (again like in choice strings)
-                        \(           # - an opening parenthesis
-                    ])
-                    (?P<{style_group_id}>{keyword})
-                    (\W)             # Any character which is not a word character.
-                    """,
-                    self.colorize,
-                    help_text,
-                    flags=re.VERBOSE,
-                )
+        # Highlight CLI names and commands, then options, choices and metavars.
+        while next_pattern:
+            help_text = self.highlight_keywords(help_text, next_pattern)
+            next_pattern = next(keyword_patterns, None)
 
         return help_text
 
@@ -737,38 +1179,113 @@ class HelpExtraFormatter(HelpFormatter):
         """Wrap original `Click.HelpFormatter.getvalue()` to force extra-colorization on
         rendering."""
         help_text = super().getvalue()
+        if self.no_color:
+            return help_text
         return self.highlight_extra_keywords(help_text)
 
+    def write_dl(
+        self,
+        rows: Sequence[tuple[str, str]],
+        col_max: int | None = None,
+        col_spacing: int | None = None,
+        col1_width: int | None = None,
+    ) -> None:
+        """Write a definition list, then flush it to the ``stream`` if set.
+
+        Large definition lists are written by slices of ``stream_rows`` rows sharing the
+        same layout, each slice being flushed on its own. Lists separated by
+        ``row_sep`` are always written in one go.
+        """
+        if (
+            self.stream is None
+            or len(rows) <= self.stream_rows
+            or self.row_sep is not None
+        ):
+            super().write_dl(rows, col_max, col_spacing, col1_width)
+            self.flush()
+            return
+
+        # Compute the layout of the whole list once, like the parent method does.
+        col1_max_width = min(col_max or self.col1_max_width, self.available_width)
+        col1_width = min(
+            col1_width or self.compute_col1_width(rows, col1_max_width),
+            col1_max_width,
+        )
+        col2_width = self.available_width - col1_width - (
+            col_spacing or self.col_spacing
+        )
+        linear = col2_width < self.col2_min_width
+
+        for start in range(0, len(rows), self.stream_rows):
+            # Linear lists have their last line return removed by the parent method.
+            if start and linear:
+                self.write("\n")
+            super().write_dl(
+                rows[start : start + self.stream_rows],
+                col_max,
+                col_spacing,
+                col1_width,
+            )
+            self.flush()
+
+    def flush(self, final: bool = False) -> None:
+        """Highlight the content of the buffer and pass it to the ``stream``.
+
+        Trailing line returns are held back until more content is flushed, and dropped
+        on the ``final`` flush, like ``Command.get_help()`` does.
+        """
+        if self.stream is None:
+            return
+        text = self._pending_newlines + self.getvalue()
+        self.buffer = []
+        chunk = text.rstrip("\n")
+        self._pending_newlines = "" if final else text[len(chunk) :]
+        if chunk:
+            self.stream(chunk)
+
 
 def highlight(string, substrings, styling_method, ignore_case=False):
     """Highlights parts of the ``string`` that matches ``substrings``.
 
     Takes care of overlapping parts within the ``string``.
+
+    Match positions are collected as ``(start, end)`` pairs, then sorted and merged
+    into disjoint intervals. Contiguous and overlapping matches are styled as a single
+    segment, and the result is assembled with a single join.
     """
-    # Ranges of character indices flagged for highlighting.
-    ranges = set()
+    flags = re3.IGNORECASE if ignore_case else 0
 
-    for part in set(substrings):
+    # Ranges of character indices flagged for highlighting, as (start, end) pairs with
+    # an exclusive end. Empty matches do not flag any character.
+    ranges = [
+        match.span()
+        for part in set(substrings)
         # Search for occurrences of query parts in original string.
-        flags = re3.IGNORECASE if ignore_case else 0
-        ranges |= {
-            f"{match.start()}-{match.end() - 1}"
-            for match in re3.finditer(part, string, flags=flags, overlapped=True)
-        }
-
-    # Reduce ranges, compute complement ranges, transform them to list of integers.
-    ranges = ",".join(ranges)
-    highlight_ranges = int_ranges_from_int_list(ranges)
-    untouched_ranges = int_ranges_from_int_list(
-        complement_int_list(ranges, range_end=len(string)),
-    )
-
-    # Apply style to range of characters flagged as matching.
-    styled_str = ""
-    for i, j in sorted(highlight_ranges + untouched_ranges):
-        segment = getitem(string, slice(i, j + 1))
-        if (i, j) in highlight_ranges:
-            segment = styling_method(segment)
-        styled_str += segment
-
-    return styled_str
+        for match in re3.finditer(part, string, flags=flags, overlapped=True)
+        if match.end() > match.start()
+    ]
+    if not ranges:
+        return string
+
+    # Merge overlapping and contiguous ranges.
+    ranges.sort()
+    merged = [list(ranges[0])]
+    for start, end in ranges[1:]:
+        last = merged[-1]
+        if start <= last[1]:
+            if end > last[1]:
+                last[1] = end
+        else:
+            merged.append([start, end])
+
+    # Interleave untouched segments with styled ones.
+    segments = []
+    position = 0
+    for start, end in merged:
+        if start > position:
+            segments.append(string[position:start])
+        segments.append(styling_method(string[start:end]))
+        position = end
+    segments.append(string[position:])
+
+    return "".join(segments)
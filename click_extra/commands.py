@@ -23,19 +23,30 @@ leverage the mixins in here to build up your own custom variants.
 from __future__ import annotations
 
 import logging
-from typing import TYPE_CHECKING, Any, cast
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from difflib import get_close_matches
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, Iterable, cast
 
 import click
 import cloup
 
 from . import Command, Group
-from .colorize import ColorOption, ExtraHelpColorsMixin, HelpExtraFormatter, HelpOption
+from .colorize import (
+    ColorOption,
+    ExtraHelpColorsMixin,
+    HelpCache,
+    HelpExtraFormatter,
+    HelpOption,
+)
 from .config import ConfigOption
 from .logging import VerbosityOption
 from .parameters import (
     ExtraOption,
     ShowParamsOption,
     all_envvars,
+    invalidate_params_index,
     normalize_envvar,
     search_params,
 )
@@ -52,6 +63,7 @@ class ExtraContext(cloup.Context):
 
     Also inherits ``color`` property from parent context. And sets it to `True` for
     parentless contexts at instantiatiom, so we can always have colorized output.
+    This forced default is flagged in ``ctx.meta["click_extra.color_forced"]``.
 
     .. todo::
         Propose addition of ``meta`` keyword upstream to Click.
@@ -80,6 +92,7 @@ class ExtraContext(cloup.Context):
         # colorized output.
         if not self.parent and self._color is None:
             self._color = True
+            self._meta["click_extra.color_forced"] = True
 
     @property
     def color(self) -> bool | None:
@@ -174,6 +187,9 @@ class ExtraCommand(ExtraHelpColorsMixin, Command):  # type: ignore[misc]
         version: str | None = None,
         extra_option_at_end: bool = True,
         populate_auto_envvars: bool = True,
+        help_cache: HelpCache | None = None,
+        help_stream: bool | None = None,
+        help_pager: bool | None = None,
         **kwargs: Any,
     ) -> None:
         """List of extra parameters:
@@ -190,6 +206,11 @@ class ExtraCommand(ExtraHelpColorsMixin, Command):  # type: ignore[misc]
             which only evaluates them dynamiccaly. By forcing their registration, the
             auto-generated environment variables gets displayed in the help screen,
             fixing `click#2483 issue <https://github.com/pallets/click/issues/2483>`_.
+        :param help_cache: a ``HelpCache`` instance in which to keep the rendered help
+            screens of the command.
+        :param help_stream: print the help screen section by section as it is
+            rendered, instead of all at once.
+        :param help_pager: stream the help screen through the system pager.
 
         By default, these `Click context settings
         <https://click.palletsprojects.com/en/8.1.x/api/#click.Context>`_ are applied:
@@ -314,6 +335,13 @@ class ExtraCommand(ExtraHelpColorsMixin, Command):  # type: ignore[misc]
             for param in self.params:
                 param.envvar = all_envvars(param, self.context_settings)
 
+        if help_cache is not None:
+            self.help_cache = help_cache
+        if help_stream is not None:
+            self.help_stream = help_stream
+        if help_pager is not None:
+            self.help_pager = help_pager
+
         if version:
             version_param = search_params(self.params, ExtraVersionOption)
             if version_param:
@@ -369,7 +397,7 @@ class ExtraCommand(ExtraHelpColorsMixin, Command):  # type: ignore[misc]
         issues.
         """
         logger = logging.getLogger("click_extra")
-        if logger.getEffectiveLevel() == logging.DEBUG:
+        if logger.isEnabledFor(logging.DEBUG):
             # Look for a ``--version`` parameter.
             version_opt = cast(
                 "ExtraVersionOption | None",
@@ -394,6 +422,75 @@ class ExtraCommand(ExtraHelpColorsMixin, Command):  # type: ignore[misc]
         return super().invoke(ctx)
 
 
+class CommandIndex:
+    """Lookup index of the subcommand names and aliases of a group.
+
+    Names are kept sorted to find all names starting with a prefix by bisection. They
+    are also indexed by their trigrams, to only compare a mistyped name with the names
+    sharing the most trigrams with it when looking for suggestions.
+    """
+
+    ngram_size: int = 3
+    """Length of the character n-grams indexing names."""
+
+    shortlist_size: int = 32
+    """Minimal number of names sharing the most n-grams with a mistyped name, to rank
+    as suggestions."""
+
+    def __init__(self, names: Iterable[str]) -> None:
+        self.names = sorted(set(names))
+        self.ngrams: dict[str, list[str]] = defaultdict(list)
+        for name in self.names:
+            for ngram in self.split_ngrams(name):
+                self.ngrams[ngram].append(name)
+
+    def split_ngrams(self, name: str) -> set[str]:
+        """Returns the n-grams of a name, padded to index its first and last chars."""
+        padded = f"\0{name}\0"
+        return {
+            padded[i : i + self.ngram_size]
+            for i in range(len(padded) - self.ngram_size + 1)
+        }
+
+    def prefix_matches(self, prefix: str) -> list[str]:
+        """Returns all names starting with ``prefix``, in lexicographic order."""
+        matches = []
+        for name in self.names[bisect_left(self.names, prefix) :]:
+            if not name.startswith(prefix):
+                break
+            matches.append(name)
+        return matches
+
+    def suggest(self, name: str, n: int = 3, cutoff: float = 0.6) -> list[str]:
+        """Returns the names closest to a mistyped ``name``, best match first.
+
+        Candidates are ranked with ``difflib.get_close_matches()``, like Cloup does,
+        but only among the ``shortlist_size`` names sharing the most n-grams with
+        ``name``, and those tied with them. Suggestions are therefore an approximation
+        of Cloup's: a name scoring above ``cutoff`` with few n-grams in common with
+        ``name`` may be left out.
+
+        Names shorter than ``ngram_size``, or sharing no n-gram with any indexed name,
+        are compared to all names.
+        """
+        shared_ngrams: Counter[str] = Counter()
+        if len(name) >= self.ngram_size:
+            for ngram in self.split_ngrams(name):
+                shared_ngrams.update(self.ngrams.get(ngram, ()))
+        if not shared_ngrams:
+            return get_close_matches(name, self.names, n, cutoff)
+        # Keep all the names tied with the last one of the shortlist, so the ranking
+        # does not depend on the order of the index.
+        top = shared_ngrams.most_common(self.shortlist_size)
+        min_shared = top[-1][1]
+        shortlist = [
+            candidate
+            for candidate, count in shared_ngrams.items()
+            if count >= min_shared
+        ]
+        return get_close_matches(name, shortlist, n, cutoff)
+
+
 class ExtraGroup(ExtraCommand, Group):  # type: ignore[misc]
     """Like``cloup.Group``, with sane defaults and extra help screen colorization."""
 
@@ -411,3 +508,232 @@ class ExtraGroup(ExtraCommand, Group):  # type: ignore[misc]
 
     See: https://click.palletsprojects.com/en/8.1.x/api/#click.Group.group_class
     """
+
+    prefix_matching: bool = False
+    """Resolve subcommands from any unambiguous prefix of their names or aliases."""
+
+    def __init__(
+        self,
+        *args,
+        prefix_matching: bool | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """:param prefix_matching: resolve subcommands from unambiguous prefixes."""
+        super().__init__(*args, **kwargs)
+        if prefix_matching is not None:
+            self.prefix_matching = prefix_matching
+
+    _command_index: tuple[tuple[int, int], CommandIndex] | None = None
+
+    @property
+    def command_index(self) -> CommandIndex:
+        """Index of subcommand names and aliases, rebuilt after new registrations.
+
+        Subcommands added with ``add_command()`` invalidate the index. Its size is also
+        checked against the group's to catch direct changes to ``commands``.
+        """
+        size = (len(self.commands), len(self.alias2name))
+        if self._command_index is None or self._command_index[0] != size:
+            index = CommandIndex([*self.commands, *self.alias2name])
+            self._command_index = (size, index)
+        return self._command_index[1]
+
+    def add_command(self, *args, **kwargs) -> None:
+        """Register a subcommand, and invalidate the shared parameter indexes to let
+        options pick up the new subcommand's parameters."""
+        super().add_command(*args, **kwargs)
+        self._command_index = None
+        invalidate_params_index()
+
+    def resolve_command_name(self, ctx: click.Context, name: str) -> str | None:
+        """Map a command name, an alias or, if ``prefix_matching`` is enabled, an
+        unambiguous prefix of them to a command name."""
+        cmd_name = super().resolve_command_name(ctx, name)
+        if cmd_name is not None or not self.prefix_matching:
+            return cmd_name
+        if ctx.token_normalize_func:
+            name = ctx.token_normalize_func(name)
+        targets = {
+            self.alias2name.get(match, match)
+            for match in self.command_index.prefix_matches(name)
+        }
+        if len(targets) == 1:
+            return targets.pop()
+        return None
+
+    def handle_bad_command_name(
+        self,
+        bad_name: str,
+        valid_names: list[str],
+        error: click.UsageError,
+    ) -> click.UsageError:
+        """Suggest the closest names from the ``command_index``.
+
+        Ambiguous prefixes are reported with the first 3 names they match. Other names
+        get suggestions ranked like Cloup's, but only compared to the shortlist of
+        ``valid_names`` provided by ``CommandIndex.suggest()``.
+        """
+        matches = []
+        if self.prefix_matching:
+            ctx = error.ctx
+            if ctx and ctx.token_normalize_func:
+                bad_name = ctx.token_normalize_func(bad_name)
+            matches = self.command_index.prefix_matches(bad_name)[:3]
+        if not matches:
+            matches = self.command_index.suggest(bad_name)
+        if not matches:
+            return error
+        if len(matches) == 1:
+            extra_msg = f"Did you mean '{matches[0]}'?"
+        else:
+            matches_list = "\n".join("   " + match for match in matches)
+            extra_msg = "Did you mean one of these?\n" + matches_list
+        return click.UsageError(f"{error} {extra_msg}", error.ctx)
+
+
+class LazyCommand(click.Command):
+    """Placeholder of a subcommand registered in a ``LazyGroup``.
+
+    Only carries the metadata needed to render the help screen of its parent group, and
+    to complete its name in the shell. The real command is imported from
+    ``import_path`` the first time it is invoked.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        import_path: str,
+        short_help: str | None = None,
+        aliases: Iterable[str] | None = None,
+        hidden: bool = False,
+    ) -> None:
+        """:param import_path: location of the command, either in the
+        ``package.module:attribute`` or ``package.module.attribute`` form.
+        """
+        super().__init__(name, short_help=short_help, hidden=hidden)
+        self.import_path = import_path
+        self.aliases: list[str] = list(aliases) if aliases else []
+
+    def load(self) -> click.Command:
+        """Import and return the real command."""
+        if ":" in self.import_path:
+            module_path, attr_path = self.import_path.split(":", 1)
+        else:
+            module_path, attr_path = self.import_path.rsplit(".", 1)
+        cmd = import_module(module_path)
+        for attr in attr_path.split("."):
+            cmd = getattr(cmd, attr)
+        if not isinstance(cmd, click.Command):
+            msg = f"{self.import_path} is not a command: {cmd!r}"
+            raise TypeError(msg)
+        return cmd
+
+
+class LazyGroup(ExtraGroup):
+    """Like ``ExtraGroup``, but subcommands can be registered by their import path.
+
+    Lazy subcommands are represented by a ``LazyCommand`` placeholder. The help screen,
+    keyword highlighting and shell completion only rely on the placeholder's metadata.
+    The module of a lazy subcommand is only imported when that subcommand is invoked.
+
+    .. caution::
+        Parameters of lazy subcommands are unknown until they are loaded. So they are
+        not part of the parameter structure used by ``--show-params``, and their
+        configuration is only applied once they are invoked.
+    """
+
+    def __init__(
+        self,
+        *args,
+        lazy_subcommands: Iterable[LazyCommand] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """:param lazy_subcommands: ``LazyCommand`` placeholders to register."""
+        super().__init__(*args, **kwargs)
+        for lazy_cmd in lazy_subcommands or ():
+            self.add_command(lazy_cmd)
+
+    def add_lazy_command(
+        self,
+        import_path: str,
+        name: str,
+        short_help: str | None = None,
+        aliases: Iterable[str] | None = None,
+        hidden: bool = False,
+        section: cloup.Section | None = None,
+    ) -> LazyCommand:
+        """Register the command located at ``import_path`` as a lazy subcommand."""
+        lazy_cmd = LazyCommand(
+            name,
+            import_path,
+            short_help=short_help,
+            aliases=aliases,
+            hidden=hidden,
+        )
+        self.add_command(lazy_cmd, section=section)
+        return lazy_cmd
+
+    def load_command(self, name: str) -> click.Command | None:
+        """Returns the subcommand registered as ``name``, imported if it is lazy.
+
+        The placeholder is replaced by the real command in the group and its sections.
+        """
+        cmd = self.commands.get(name)
+        if not isinstance(cmd, LazyCommand):
+            return cmd
+
+        real_cmd = cmd.load()
+        self.commands[name] = real_cmd
+        for section in self._section_set:
+            if section.commands.get(name) is cmd:
+                section.commands[name] = real_cmd
+        invalidate_params_index()
+        return real_cmd
+
+    def resolve_command(
+        self,
+        ctx: click.Context,
+        args: list[str],
+    ) -> tuple[str | None, click.Command | None, list[str]]:
+        """Import the lazy subcommand about to be invoked."""
+        cmd_name, cmd, args = super().resolve_command(ctx, args)
+        if isinstance(cmd, LazyCommand) and cmd_name:
+            cmd = self.load_command(cmd_name)
+            self.apply_conf(ctx, cmd_name)
+        return cmd_name, cmd, args
+
+    def apply_conf(self, ctx: click.Context, cmd_name: str) -> None:
+        """Set the configuration of a freshly loaded subcommand in the ``default_map``
+        of the group's context.
+
+        The section of a lazy subcommand is dropped while the configuration is loaded,
+        as its parameters are not known yet. It is filtered again from the full user
+        configuration, against the parameter structure refreshed with the loaded
+        subcommand.
+        """
+        root_ctx = ctx.find_root()
+        user_conf = ctx.meta.get("click_extra.conf_full")
+        config_option = search_params(root_ctx.command.params, ConfigOption)
+        if not user_conf or not isinstance(config_option, ConfigOption):
+            return
+
+        # Keys leading to the configuration of the subcommand.
+        keys = [cmd_name]
+        parent_ctx = ctx
+        while parent_ctx.parent is not None:
+            keys.insert(0, cast(str, parent_ctx.info_name))
+            parent_ctx = parent_ctx.parent
+        keys.insert(0, cast(str, root_ctx.command.name))
+
+        sub_conf: Any = config_option.filter_conf(
+            config_option.params_template,
+            user_conf,
+        )
+        for key in keys:
+            sub_conf = sub_conf.get(key) if isinstance(sub_conf, dict) else None
+        if not sub_conf:
+            return
+
+        if ctx.default_map is None:
+            ctx.default_map = {}
+        ctx.default_map[cmd_name] = {**ctx.default_map.get(cmd_name, {}), **sub_conf}
@@ -17,26 +17,23 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 import logging
 import os
+import pickle
+import re
 import sys
+import warnings
 from configparser import ConfigParser, ExtendedInterpolation
 from enum import Enum
+from functools import partial
 from gettext import gettext as _
-from pathlib import Path
-from typing import Any, Iterable, Sequence
+from pathlib import Path, PurePosixPath
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Sequence
 from unittest.mock import patch
 
-if sys.version_info >= (3, 11):
-    import tomllib
-else:
-    import tomli as tomllib  # type: ignore[import]
-
-import commentjson as json
-import requests
-import xmltodict
-import yaml
-from boltons.iterutils import flatten, remap
+from boltons.iterutils import flatten
 from boltons.pathutils import shrinkuser
 from boltons.urlutils import URL
 from mergedeep import merge
@@ -48,12 +45,16 @@ from wcmatch.glob import (
     GLOBTILDE,
     IGNORECASE,
     NODIR,
+    globmatch,
     iglob,
+    is_magic,
 )
 
 from . import (
     STRING,
     ParameterSource,
+    __version__,
+    cache,
     echo,
     get_app_dir,
     get_current_context,
@@ -61,6 +62,9 @@ from . import (
 from .parameters import ExtraOption, ParamStructure
 from .platforms import is_windows
 
+if TYPE_CHECKING:
+    import requests
+
 
 class Formats(Enum):
     """Supported configuration formats and the list of their default extensions.
@@ -76,16 +80,196 @@ class Formats(Enum):
     XML = ("xml",)
 
 
+CONTENT_TYPES: dict[str, Formats] = {
+    "application/toml": Formats.TOML,
+    "application/yaml": Formats.YAML,
+    "application/x-yaml": Formats.YAML,
+    "text/yaml": Formats.YAML,
+    "text/x-yaml": Formats.YAML,
+    "application/json": Formats.JSON,
+    "text/json": Formats.JSON,
+    "application/xml": Formats.XML,
+    "text/xml": Formats.XML,
+}
+"""Mapping of MIME types to the format of remote configuration served with them.
+
+Used to select the parser of URLs whose path has no recognizable extension.
+"""
+
+
+Parser = Callable[[str], Any]
+"""A parser takes the raw text of a configuration file and returns its content."""
+
+
+def _toml_parser() -> Parser:
+    if sys.version_info >= (3, 11):
+        import tomllib
+    else:
+        import tomli as tomllib  # type: ignore[import]
+    return tomllib.loads
+
+
+def _yaml_parser() -> Parser:
+    import yaml
+
+    # Use the C implementation of the loader if PyYAML has been built with libyaml.
+    try:
+        from yaml import CSafeLoader as SafeLoader
+    except ImportError:
+        from yaml import SafeLoader  # type: ignore[assignment]
+
+    return partial(yaml.load, Loader=SafeLoader)
+
+
+_json_comments = re.compile(r'("(?:\\.|[^"\\])*")|(?:#|//)[^\n]*')
+"""Matches Python-style ``#`` and Javascript-style ``//`` comments in JSON.
+
+Strings are matched first and captured, so comment markers they contain are left
+untouched.
+"""
+
+
+def _parse_json(conf_text: str) -> Any:
+    """Parse JSON with the standard library, and supports comments.
+
+    Strict JSON is tried first. On failure, comments are stripped and parsing is tried
+    again. ``commentjson`` is only used as a last resort, as its pure-Python grammar is
+    orders of magnitude slower.
+    """
+    try:
+        return json.loads(conf_text)
+    except ValueError:
+        pass
+    try:
+        return json.loads(_json_comments.sub(r"\1", conf_text))
+    except ValueError:
+        pass
+
+    import commentjson
+
+    return commentjson.loads(conf_text)
+
+
+def _json_parser() -> Parser:
+    return _parse_json
+
+
+def _xml_parser() -> Parser:
+    import xmltodict
+
+    return xmltodict.parse
+
+
+parser_loaders: dict[Enum, Callable[[], Parser]] = {
+    Formats.TOML: _toml_parser,
+    Formats.YAML: _yaml_parser,
+    Formats.JSON: _json_parser,
+    Formats.XML: _xml_parser,
+}
+"""Registry of functions returning the parser of each format.
+
+Loaders are only called the first time a format is tried, so the library backing it is
+not imported unless a configuration file in that format is actually parsed.
+
+.. note::
+    ``Formats.INI`` is not in there: its parser needs the types of the CLI parameters.
+    It is handled by :py:meth:`ConfigOption.load_ini_config`.
+"""
+
+_parsers: dict[Enum, Parser] = {}
+"""Cache of parsers already resolved by their loader."""
+
+
+def register_format(conf_format: Enum, loader: Callable[[], Parser]) -> None:
+    """Register the parser ``loader`` of a configuration format.
+
+    ``conf_format`` is expected to be an ``Enum`` member shaped like those of
+    :py:class:`Formats`: its name is the ID of the format and its value is the tuple of
+    file extensions associated with it. This allows for new formats to be supported
+    without subclassing ``ConfigOption``:
+
+    .. code-block:: python
+
+        class MyFormats(Enum):
+            HJSON = ("hjson",)
+
+        def hjson_parser():
+            import hjson
+
+            return hjson.loads
+
+        register_format(MyFormats.HJSON, hjson_parser)
+
+        @config_option(formats=(*Formats, MyFormats.HJSON))
+        ...
+
+    Registering a loader for an existing format replaces its parser.
+    """
+    parser_loaders[conf_format] = loader
+    _parsers.pop(conf_format, None)
+
+
+def get_parser(conf_format: Enum) -> Parser:
+    """Returns the parser of ``conf_format``, and resolves it on first call."""
+    parser = _parsers.get(conf_format)
+    if parser is None:
+        try:
+            loader = parser_loaders[conf_format]
+        except KeyError:
+            msg = f"No parser registered for {conf_format.name} format."
+            raise ValueError(msg) from None
+        parser = _parsers[conf_format] = loader()
+    return parser
+
+
+@cache
+def http_session() -> requests.Session:
+    """Returns the HTTP session shared by all remote configuration downloads.
+
+    Reusing the same session keeps connections to the same host alive between
+    requests.
+    """
+    import requests
+
+    return requests.Session()
+
+
 class ConfigOption(ExtraOption, ParamStructure):
     """A pre-configured option adding ``--config``/``-C`` option."""
 
-    formats: Sequence[Formats]
+    formats: Sequence[Enum]
 
     roaming: bool
     force_posix: bool
 
     strict: bool
 
+    cache: bool
+    cache_max_size: int
+
+    timeout: float | None
+
+    search_max_depth: int | None
+    pruned_dirs: Iterable[str]
+
+    DEFAULT_PRUNED_DIRS: Iterable[str] = (
+        ".git",
+        ".hg",
+        ".svn",
+        "__pycache__",
+        "node_modules",
+    )
+    """Directories never traversed by recursive ``**`` patterns by default.
+
+    These are version control metadata and dependency folders, which are large and
+    not expected to host the CLI configuration.
+    """
+
+    GLOB_FLAGS: int = (
+        NODIR | GLOBSTAR | DOTGLOB | GLOBTILDE | BRACE | FOLLOW | IGNORECASE
+    )
+    """Flags of ``wcmatch.glob`` patterns matching configuration files."""
+
     def __init__(
         self,
         param_decls: Sequence[str] | None = None,
@@ -102,6 +286,11 @@ class ConfigOption(ExtraOption, ParamStructure):
         force_posix=False,
         excluded_params=None,
         strict=False,
+        cache=False,
+        cache_max_size=16 * 1024 * 1024,
+        timeout=10,
+        search_max_depth=None,
+        pruned_dirs=None,
         **kwargs,
     ) -> None:
         """Takes as input a glob pattern or an URL.
@@ -114,7 +303,8 @@ class ConfigOption(ExtraOption, ParamStructure):
           other options use them.
 
         - ``formats`` is the ordered list of formats that the configuration
-          file will be tried to be read with. Can be a single one.
+          file will be tried to be read with. Can be a single one. Formats beyond
+          those of ``Formats`` can be added with :py:func:`register_format`.
 
         - ``roaming`` and ``force_posix`` are `fed to click.get_app_dir()
           <https://click.palletsprojects.com/en/8.1.x/api/#click.get_app_dir>`_
@@ -128,12 +318,34 @@ class ConfigOption(ExtraOption, ParamStructure):
             - If ``True``, raise an error if the configuration file contain
               unrecognized content.
             - If ``False``, silently ignore unsupported configuration option.
+
+        - ``cache``
+            - If ``True``, keep a copy of parsed local configuration files in the
+              folder returned by :py:meth:`cache_dir`, so subsequent invocations
+              can skip parsing as long as the files are not modified. Remote
+              configuration is cached there too, and only downloaded again if
+              modified. Its cached copy is used if the remote host can't be reached.
+            - If ``False``, always parse and download configuration files.
+
+        - ``cache_max_size`` is the total size in bytes above which the least recently
+          used cache entries are evicted.
+
+        - ``timeout`` is the number of seconds to wait for the remote host when
+          downloading configuration from an URL. ``None`` waits forever.
+
+        - ``search_max_depth`` is the maximum number of directory levels to descend
+          into when a pattern contains a recursive ``**`` wildcard. ``None`` sets no
+          limit.
+
+        - ``pruned_dirs`` is the list of directory names not to descend into when a
+          pattern contains a recursive ``**`` wildcard. Defaults to
+          ``ConfigOption.DEFAULT_PRUNED_DIRS``.
         """
         if not param_decls:
             param_decls = ("--config", "-C")
 
         # Make sure formats ends up as an iterable.
-        if isinstance(formats, Formats):
+        if isinstance(formats, Enum):
             formats = (formats,)
         self.formats = formats
 
@@ -147,6 +359,16 @@ class ConfigOption(ExtraOption, ParamStructure):
 
         self.strict = strict
 
+        self.cache = cache
+        self.cache_max_size = cache_max_size
+
+        self.timeout = timeout
+
+        self.search_max_depth = search_max_depth
+        self.pruned_dirs = (
+            self.DEFAULT_PRUNED_DIRS if pruned_dirs is None else pruned_dirs
+        )
+
         kwargs.setdefault("callback", self.load_conf)
 
         super().__init__(
@@ -159,14 +381,27 @@ class ConfigOption(ExtraOption, ParamStructure):
             **kwargs,
         )
 
+    def app_dir(self) -> Path:
+        """Returns the application folder of the CLI.
+
+        It is produced by the `click.get_app_dir() method
+        <https://click.palletsprojects.com/en/8.1.x/api/#click.get_app_dir>`_. The
+        result depends on OS and is influenced by the ``roaming`` and ``force_posix``
+        properties of this instance.
+        """
+        ctx = get_current_context()
+        cli_name = ctx.find_root().info_name
+        if not cli_name:
+            raise ValueError
+        return Path(
+            get_app_dir(cli_name, roaming=self.roaming, force_posix=self.force_posix),
+        ).resolve()
+
     def default_pattern(self) -> str:
         """Returns the default pattern used to search for the configuration file.
 
         Defaults to ``/<app_dir>/*.{toml,yaml,yml,json,ini,xml}``. Where
-        ``<app_dir>`` is produced by the `clickget_app_dir() method
-        <https://click.palletsprojects.com/en/8.1.x/api/#click.get_app_dir>`_.
-        The result depends on OS and is influenced by the ``roaming`` and
-        ``force_posix`` properties of this instance.
+        ``<app_dir>`` is produced by :py:meth:`app_dir`.
 
         In that folder, we're looking for any file matching the extensions
         derived from the ``self.formats`` property:
@@ -174,13 +409,6 @@ class ConfigOption(ExtraOption, ParamStructure):
         - a simple ``*.ext`` pattern if only one format is set
         - an expanded ``*.{ext1,ext2,...}`` pattern if multiple formats are set
         """
-        ctx = get_current_context()
-        cli_name = ctx.find_root().info_name
-        if not cli_name:
-            raise ValueError
-        app_dir = Path(
-            get_app_dir(cli_name, roaming=self.roaming, force_posix=self.force_posix),
-        ).resolve()
         # Build the extension matching pattern.
         extensions = flatten(f.value for f in self.formats)
         if len(extensions) == 1:
@@ -188,7 +416,7 @@ class ConfigOption(ExtraOption, ParamStructure):
         else:
             # Use brace notation for multiple extension matching.
             ext_pattern = f"{{{','.join(extensions)}}}"
-        return f"{app_dir}{os.path.sep}*.{ext_pattern}"
+        return f"{self.app_dir()}{os.path.sep}*.{ext_pattern}"
 
     def get_help_record(self, ctx):
         """Replaces the default value by the pretty version of the configuration
@@ -209,18 +437,30 @@ class ConfigOption(ExtraOption, ParamStructure):
         Returns an iterator of the normalized configuration location and its textual
         content, for each file/URL matching the pattern.
         """
+        for location, conf_text, _ in self.search_and_read_conf_with_type(pattern):
+            yield location, conf_text
+
+    def search_and_read_conf_with_type(
+        self,
+        pattern: str,
+    ) -> Iterable[tuple[Path | URL, str, str | None]]:
+        """Like ``search_and_read_conf()``, but also returns the MIME type of each
+        configuration.
+
+        The MIME type is the ``Content-Type`` header of remote files, and ``None`` for
+        local files.
+        """
         logger = logging.getLogger("click_extra")
 
         # Check if the pattern is an URL.
         location = URL(pattern)
         location.normalize()
         if location and location.scheme in ("http", "https"):
-            logger.debug(f"Download configuration from URL: {location}")
-            with requests.get(location) as response:
-                if response.ok:
-                    yield location, response.text
-                    return
-                logger.warning(f"Can't download {location}: {response.reason}")
+            logger.debug("Download configuration from URL: %s", location)
+            remote_conf = self.download_conf(location)
+            if remote_conf:
+                yield location, *remote_conf
+                return
 
         logger.debug("Pattern is not an URL: search local file system.")
         # wcmatch expect patterns to be written with Unix-like syntax by default, even
@@ -229,18 +469,275 @@ class ConfigOption(ExtraOption, ParamStructure):
         # https://github.com/facelessuser/wcmatch/issues/194
         if is_windows():
             pattern = pattern.replace("\\", "/")
-        for file in iglob(
-            pattern,
-            flags=NODIR | GLOBSTAR | DOTGLOB | GLOBTILDE | BRACE | FOLLOW | IGNORECASE,
-        ):
-            file_path = Path(file).resolve()
-            logger.debug(f"Configuration file found at {file_path}")
-            yield file_path, file_path.read_text()
+        for file in self.search_files(pattern):
+            file_path = file.resolve()
+            logger.debug("Configuration file found at %s", file_path)
+            yield file_path, file_path.read_text(), None
+
+    def search_files(self, pattern: str) -> Iterator[Path]:
+        """Search the local file system for files matching the ``pattern``.
+
+        Patterns without a recursive ``**`` wildcard are directly handled by
+        ``wcmatch.glob.iglob``.
+
+        Recursive patterns are matched while walking the tree from their base
+        directories, i.e. the directories matching the leading part of the pattern with
+        no wildcard. That walk:
+
+        - stops at ``self.search_max_depth`` levels below the base directory,
+        - skips directories whose name is in ``self.pruned_dirs``,
+        - follows symlinks, but never visits the same directory twice to not get
+          caught in loops,
+        - reuses, if ``self.cache`` is set, the listing of directories whose
+          modification time didn't change since the last search.
+
+        Like ``wcmatch.glob.iglob``, names are compared case-insensitively if
+        ``IGNORECASE`` is part of ``self.GLOB_FLAGS``, and ``.`` segments of the
+        pattern are ignored.
+        """
+        if "**" not in pattern:
+            for file in iglob(pattern, flags=self.GLOB_FLAGS):
+                yield Path(file)
+            return
+
+        pattern = os.path.expanduser(pattern)
+        parts = PurePosixPath(pattern).parts
+        base_parts: list[str] = []
+        for part in parts:
+            if is_magic(part, flags=self.GLOB_FLAGS):
+                break
+            base_parts.append(part)
+        # Files are matched relative to their base directory.
+        relative_pattern = "/".join(parts[len(base_parts) :])
+
+        index = self.load_dir_index() if self.cache else None
+        original_index = dict(index) if index is not None else None
+
+        for base_dir in self.match_base_dirs(base_parts):
+            for file in self.walk_dir(base_dir, index):
+                relative_path = file.relative_to(base_dir).as_posix()
+                if globmatch(relative_path, relative_pattern, flags=self.GLOB_FLAGS):
+                    yield file
+
+        if index is not None and index != original_index:
+            self.save_dir_index(index)
+
+    def match_base_dirs(self, base_parts: Sequence[str]) -> list[Path]:
+        """Returns the existing directories matching the literal ``base_parts`` of a
+        pattern.
+
+        If ``IGNORECASE`` is part of ``self.GLOB_FLAGS``, parts are compared
+        case-insensitively to the entries of their parent directory, so several
+        directories can match on case-sensitive file systems.
+        """
+        ignore_case = bool(self.GLOB_FLAGS & IGNORECASE)
+
+        dirs = [Path()]
+        for position, part in enumerate(base_parts):
+            # Roots and drives are taken as-is.
+            if position == 0 and (os.path.isabs(part) or os.path.splitdrive(part)[0]):
+                dirs = [Path(part)]
+                continue
+            if not ignore_case or part in (".", ".."):
+                dirs = [directory / part for directory in dirs]
+                continue
+            folded = part.casefold()
+            matches = []
+            for directory in dirs:
+                try:
+                    names = sorted(os.listdir(directory))
+                except OSError:
+                    continue
+                matches.extend(
+                    directory / name for name in names if name.casefold() == folded
+                )
+            dirs = matches
+
+        return [directory for directory in dirs if directory.is_dir()]
+
+    def walk_dir(
+        self,
+        base_dir: Path,
+        index: dict[str, tuple[int, list[str], list[str]]] | None = None,
+    ) -> Iterator[Path]:
+        """Produce all files found under ``base_dir``, depth-first and sorted by name.
+
+        ``index`` maps directories to their modification time, sub-directories and
+        files. Listings are taken from it as long as the modification time of the
+        directory is unchanged, and updated otherwise.
+        """
+        logger = logging.getLogger("click_extra")
+
+        ignore_case = bool(self.GLOB_FLAGS & IGNORECASE)
+        pruned_dirs = {
+            name.casefold() if ignore_case else name for name in self.pruned_dirs
+        }
+
+        visited: set[tuple[int, int]] = set()
+        stack = [(base_dir, 0)]
+        while stack:
+            directory, depth = stack.pop()
+            try:
+                dir_stat = directory.stat()
+            except OSError:
+                continue
+
+            # Resolved directories are identified by their device and inode.
+            dir_id = (dir_stat.st_dev, dir_stat.st_ino)
+            if dir_id in visited:
+                logger.debug("Skip %s: already visited.", directory)
+                continue
+            visited.add(dir_id)
 
-    def parse_conf(self, conf_text: str) -> dict | None:
+            listing = index.get(str(directory)) if index is not None else None
+            if listing and listing[0] == dir_stat.st_mtime_ns:
+                _, subdirs, files = listing
+            else:
+                subdirs, files = [], []
+                try:
+                    with os.scandir(directory) as entries:
+                        for entry in entries:
+                            try:
+                                is_dir = entry.is_dir()
+                            except OSError:
+                                continue
+                            (subdirs if is_dir else files).append(entry.name)
+                except OSError:
+                    continue
+                subdirs.sort()
+                files.sort()
+                if index is not None:
+                    index[str(directory)] = (dir_stat.st_mtime_ns, subdirs, files)
+
+            for name in files:
+                yield directory / name
+
+            if self.search_max_depth is not None and depth >= self.search_max_depth:
+                continue
+            stack.extend(
+                (directory / name, depth + 1)
+                for name in reversed(subdirs)
+                if (name.casefold() if ignore_case else name) not in pruned_dirs
+            )
+
+    def load_dir_index(self) -> dict[str, tuple[int, list[str], list[str]]]:
+        """Load the index of directory listings from the cache."""
+        index = self.load_cached_conf(self.cache_dir() / "dir-index.pickle", "index")
+        return index if index is not None else {}
+
+    def save_dir_index(self, index: dict[str, tuple[int, list[str], list[str]]]):
+        """Save the index of directory listings to the cache."""
+        self.save_cached_conf(self.cache_dir() / "dir-index.pickle", "index", index)
+
+    def download_conf(self, location: URL) -> tuple[str, str | None] | None:
+        """Download the configuration at ``location``.
+
+        If ``self.cache`` is set, a copy of the configuration is kept along its
+        ``ETag`` and ``Last-Modified`` headers. These are sent back on subsequent
+        downloads as ``If-None-Match`` and ``If-Modified-Since`` headers, and the
+        cached copy is reused if the server replies with a ``304 Not Modified``
+        status. The cached copy is also used if the server can't be reached, or
+        replies with an error status.
+
+        Returns the textual content of the configuration and its MIME type, or
+        ``None`` if the download failed and no cached copy is available.
+        """
+        import requests
+
+        logger = logging.getLogger("click_extra")
+
+        cache_entry = None
+        cached: dict[str, Any] | None = None
+        headers = {}
+        if self.cache:
+            cache_entry = self.cache_entry(location)
+            cached = self.load_cached_conf(cache_entry, str(location))
+            if cached:
+                if cached["etag"]:
+                    headers["If-None-Match"] = cached["etag"]
+                if cached["last_modified"]:
+                    headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            response = http_session().get(
+                location,
+                headers=headers,
+                timeout=self.timeout,
+            )
+        except requests.RequestException as ex:
+            if not cached:
+                raise
+            logger.warning("Can't reach %s, use cached copy: %s", location, ex)
+            return cached["text"], cached["content_type"]
+
+        with response:
+            if cached and response.status_code == 304:
+                logger.debug("Configuration cache hit: %s", cache_entry)
+                return cached["text"], cached["content_type"]
+
+            if not response.ok:
+                if cached:
+                    logger.warning(
+                        "Can't download %s, use cached copy: %s",
+                        location,
+                        response.reason,
+                    )
+                    return cached["text"], cached["content_type"]
+                logger.warning("Can't download %s: %s", location, response.reason)
+                return None
+
+            remote_conf = {
+                "text": response.text,
+                "content_type": response.headers.get("Content-Type"),
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+        if cache_entry:
+            self.save_cached_conf(cache_entry, str(location), remote_conf)
+        return remote_conf["text"], remote_conf["content_type"]
+
+    def guess_formats(
+        self,
+        location: Path | URL,
+        content_type: str | None = None,
+    ) -> Sequence[Enum]:
+        """Returns the formats with which the configuration at ``location`` is expected
+        to be parsed.
+
+        Candidates are restricted to the formats of ``self.formats``:
+
+        - whose extensions match the one of the file or the path of the URL,
+        - or else, the one associated to the ``content_type`` of a remote file in
+          :py:data:`CONTENT_TYPES`.
+
+        All formats are returned in the order provided by the user if none of these
+        hints match, as is the case with extension-less files.
+        """
+        path = PurePosixPath(location.path) if isinstance(location, URL) else location
+        extension = path.suffix[1:].lower()
+        if extension:
+            matching_formats = [f for f in self.formats if extension in f.value]
+            if matching_formats:
+                return matching_formats
+
+        if content_type:
+            mime_type = content_type.split(";", 1)[0].strip().lower()
+            conf_format = CONTENT_TYPES.get(mime_type)
+            if conf_format in self.formats:
+                return (conf_format,)  # type: ignore[return-value]
+
+        return self.formats
+
+    def parse_conf(
+        self,
+        conf_text: str,
+        formats: Sequence[Enum] | None = None,
+    ) -> dict | None:
         """Try to parse the provided content with each format in the order provided by
         the user.
 
+        ``formats`` restricts the formats to try. Defaults to ``self.formats``.
+
         A successful parsing in any format is supposed to return a ``dict``. Any other
         result, including any raised exception, is considered a failure and the next
         format is tried.
@@ -248,24 +745,14 @@ class ConfigOption(ExtraOption, ParamStructure):
         logger = logging.getLogger("click_extra")
 
         user_conf = None
-        for conf_format in self.formats:
-            logger.debug(f"Parse configuration as {conf_format.name}...")
+        for conf_format in self.formats if formats is None else formats:
+            logger.debug("Parse configuration as %s...", conf_format.name)
 
             try:
-                if conf_format == Formats.TOML:
-                    user_conf = tomllib.loads(conf_text)
-
-                elif conf_format == Formats.YAML:
-                    user_conf = yaml.full_load(conf_text)
-
-                elif conf_format == Formats.JSON:
-                    user_conf = json.loads(conf_text)
-
-                elif conf_format == Formats.INI:
+                if conf_format == Formats.INI:
                     user_conf = self.load_ini_config(conf_text)
-
-                elif conf_format == Formats.XML:
-                    user_conf = xmltodict.parse(conf_text)
+                else:
+                    user_conf = get_parser(conf_format)(conf_text)
 
             except Exception as ex:
                 logger.debug(ex)
@@ -274,22 +761,146 @@ class ConfigOption(ExtraOption, ParamStructure):
             if isinstance(user_conf, dict):
                 return user_conf
             else:
-                logger.debug(f"{conf_format.name} parsing failed.")
+                logger.debug("%s parsing failed.", conf_format.name)
 
         return None
 
+    def cache_dir(self) -> Path:
+        """Returns the folder in which parsed configuration files are cached.
+
+        Defaults to a ``cache`` subfolder of :py:meth:`app_dir`.
+        """
+        return self.app_dir() / "cache"
+
+    def cache_key(
+        self,
+        conf_path: Path,
+        conf_text: str,
+        formats: Sequence[Enum],
+    ) -> tuple:
+        """Produce the key identifying a specific version of a configuration file.
+
+        The key is made of the resolved path of the file, its modification time, its
+        size and a digest of its content. The formats it is parsed with and the
+        version of Click Extra are added so a change in parsers invalidates the key.
+
+        Results of the ``INI`` parser depends on the types of the CLI parameters, so
+        these are added to the key if that format is involved.
+        """
+        stat = conf_path.stat()
+        digest = hashlib.blake2b(conf_text.encode(), digest_size=16).hexdigest()
+        key = (
+            str(conf_path),
+            stat.st_mtime_ns,
+            stat.st_size,
+            digest,
+            tuple(f.name for f in formats),
+            __version__,
+        )
+        if Formats.INI in formats:
+            key += (repr(self.flatten_tree_dict(self.params_types)),)
+        return key
+
+    def cache_entry(self, location: Path | URL) -> Path:
+        """Location of the cache entry of a configuration file or URL.
+
+        There is only one entry per location, so the entry of a modified
+        configuration is replaced on the next parsing or download.
+        """
+        location_digest = hashlib.blake2b(str(location).encode(), digest_size=16)
+        return self.cache_dir() / f"{location_digest.hexdigest()}.pickle"
+
+    def load_cached_conf(self, entry: Path, key: Any) -> dict[str, Any] | None:
+        """Returns the configuration cached in ``entry`` if it was saved with ``key``.
+
+        Returns ``None`` if the entry doesn't exist, is stale or can't be read.
+        """
+        try:
+            with entry.open("rb") as cache_file:
+                cached_key, user_conf = pickle.load(cache_file)
+        except FileNotFoundError:
+            return None
+        except Exception as ex:
+            logging.getLogger("click_extra").debug(
+                "Discard cache entry %s: %s", entry, ex
+            )
+            entry.unlink(missing_ok=True)
+            return None
+        if cached_key != key:
+            return None
+        # Refresh the entry's timestamp to keep track of the least recently used ones.
+        os.utime(entry)
+        return user_conf  # type: ignore[no-any-return]
+
+    def save_cached_conf(self, entry: Path, key: Any, user_conf: dict) -> None:
+        """Save the configuration and its ``key`` to ``entry``.
+
+        The least recently used entries are then evicted until the total size of the
+        cache is below ``self.cache_max_size``.
+        """
+        logger = logging.getLogger("click_extra")
+        try:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            # Write to a temporary file first so concurrent invocations never read a
+            # partial entry.
+            tmp_entry = entry.with_suffix(f".{os.getpid()}.tmp")
+            with tmp_entry.open("wb") as cache_file:
+                pickle.dump((key, user_conf), cache_file, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_entry, entry)
+        except Exception as ex:
+            logger.debug("Can't cache configuration to %s: %s", entry, ex)
+            return
+
+        entries = []
+        for cached in entry.parent.glob("*.pickle"):
+            try:
+                entries.append((cached.stat(), cached))
+            except FileNotFoundError:
+                continue
+        total_size = sum(stat.st_size for stat, _ in entries)
+        for stat, cached in sorted(entries, key=lambda e: e[0].st_mtime_ns):
+            if total_size <= self.cache_max_size:
+                break
+            logger.debug("Evict cache entry %s", cached)
+            cached.unlink(missing_ok=True)
+            total_size -= stat.st_size
+
     def read_and_parse_conf(
         self,
         pattern: str,
     ) -> tuple[Path | URL, dict[str, Any]] | tuple[None, None]:
         """Search for a configuration file matching the provided pattern.
 
+        Each file is only parsed with the formats matching its extension or MIME type.
+        Trial parsing with all formats is reserved to sources that have none of these
+        hints.
+
+        If ``self.cache`` is set, local files are first looked up in the cache.
+
         Returns the location and parsed content of the first valid configuration file
         that is not blank, or `(None, None)` if no file was found.
         """
-        for conf_path, conf_text in self.search_and_read_conf(pattern):
-            user_conf = self.parse_conf(conf_text)
+        logger = logging.getLogger("click_extra")
+
+        for conf_path, conf_text, content_type in self.search_and_read_conf_with_type(
+            pattern,
+        ):
+            formats = self.guess_formats(conf_path, content_type)
+
+            cache_entry = key = None
+            if self.cache and isinstance(conf_path, Path):
+                cache_entry = self.cache_entry(conf_path)
+                key = self.cache_key(conf_path, conf_text, formats)
+                user_conf = self.load_cached_conf(cache_entry, key)
+                if user_conf is not None:
+                    logger.debug("Configuration cache hit: %s", cache_entry)
+                    return conf_path, user_conf
+                logger.debug("Configuration cache miss: %s", cache_entry)
+
+            user_conf = self.parse_conf(conf_text, formats)
             if user_conf is not None:
+                if cache_entry and key:
+                    self.save_cached_conf(cache_entry, key, user_conf)
                 return conf_path, user_conf
         return None, None
 
@@ -331,7 +942,9 @@ class ConfigOption(ExtraOption, ParamStructure):
                 # Types not natively supported by INI format are loaded as
                 # JSON-serialized strings.
                 elif target_type in (list, tuple, set, frozenset, dict):
-                    value = json.loads(ini_config.get(section_id, option_id))
+                    value = get_parser(Formats.JSON)(
+                        ini_config.get(section_id, option_id),
+                    )
 
                 else:
                     msg = (
@@ -347,47 +960,86 @@ class ConfigOption(ExtraOption, ParamStructure):
 
         return conf
 
+    @classmethod
+    def _drop_blanks(cls, value: Any) -> Any:
+        """Recursively remove ``None`` values and empty ``dict`` from a configuration
+        value."""
+        if isinstance(value, dict):
+            return {
+                k: v
+                for k, v in ((k, cls._drop_blanks(v)) for k, v in value.items())
+                if v is not None and v != {}
+            }
+        if isinstance(value, list):
+            return [
+                v
+                for v in (cls._drop_blanks(v) for v in value)
+                if v is not None and v != {}
+            ]
+        return value
+
+    def filter_conf(
+        self,
+        template: dict[str, Any],
+        user_conf: dict[str, Any],
+    ) -> dict[str, Any]:
+        """Returns the sparse subset of ``user_conf`` whose keys are registered in the
+        ``template`` structure.
+
+        Neither ``template`` nor ``user_conf`` are modified. Only the keys of the user
+        configuration are visited, so this runs in time proportional to the size of the
+        configuration, not of the CLI. ``None`` values and empty ``dict`` are skipped.
+
+        Raises a ``ValueError`` on unrecognized keys in strict mode, else ignore them.
+        """
+        filtered_conf = {}
+        for key, value in user_conf.items():
+            # Ignore elements unregistered in the template structure.
+            if key not in template:
+                if self.strict:
+                    msg = f"Parameter {key!r} is not allowed in configuration file."
+                    raise ValueError(msg)
+                continue
+
+            sub_template = template[key]
+            if isinstance(value, dict) and isinstance(sub_template, dict):
+                value = self.filter_conf(sub_template, value)
+            else:
+                value = self._drop_blanks(value)
+
+            if value is not None and value != {}:
+                filtered_conf[key] = value
+        return filtered_conf
+
     def recursive_update(self, a, b):
-        """Like standard ``dict.update()``, but recursive so sub-dict gets updated.
+        """Returns the ``a`` structure updated with the values of ``b``.
 
         Ignore elements present in ``b`` but not in ``a``.
+
+        .. deprecated::
+            Use the non-mutating :meth:`filter_conf` instead. ``a`` is no longer
+            modified in place.
         """
-        for k, v in b.items():
-            if isinstance(v, dict) and isinstance(a.get(k), dict):
-                a[k] = self.recursive_update(a[k], v)
-            # Ignore elements unregistered in the template structure.
-            elif k in a:
-                a[k] = b[k]
-            elif self.strict:
-                msg = f"Parameter {k!r} is not allowed in configuration file."
-                raise ValueError(msg)
-        return a
+        warnings.warn(
+            "ConfigOption.recursive_update() is deprecated, use filter_conf() instead.",
+            FutureWarning,
+            stacklevel=2,
+        )
+        return merge({}, a, self.filter_conf(a, b))
 
     def merge_default_map(self, ctx, user_conf):
         """Save the user configuration into the context's ``default_map``.
 
-        Merge the user configuration into the pre-computed template structure, which
-        will filter out all unrecognized options not supported by the command. Then
-        cleans up blank values and update the context's ``default_map``.
+        Filter the user configuration against the pre-computed template structure,
+        which drops all unrecognized options not supported by the command. Then update
+        the context's ``default_map`` with the result.
         """
-        filtered_conf = self.recursive_update(self.params_template, user_conf)
-
-        def visit(path, key, value):
-            """Skip `None` values and empty `dict`."""
-            if value is None:
-                return False
-            if isinstance(value, dict) and not len(value):
-                return False
-            return True
-
-        # Clean-up the conf by removing all blank values left-over by the template
-        # structure.
-        clean_conf = remap(filtered_conf, visit=visit)
+        filtered_conf = self.filter_conf(self.params_template, user_conf)
 
         # Update the default_map.
         if ctx.default_map is None:
             ctx.default_map = {}
-        ctx.default_map.update(clean_conf.get(ctx.find_root().command.name, {}))
+        ctx.default_map.update(filtered_conf.get(ctx.find_root().command.name, {}))
 
     def load_conf(self, ctx, param, path_pattern):
         """Fetch parameters values from configuration file and sets them as defaults.
@@ -408,14 +1060,13 @@ class ConfigOption(ExtraOption, ParamStructure):
             ParameterSource.PROMPT,
         )
 
-        message = f"Load configuration matching {path_pattern}"
         # Force printing of configuration location if the user explicitly set it.
         if explicit_conf:
             # We have can't simply use logger.info() here as the defaults have not been
             # loaded yet and the logger is stuck to its default WARNING level.
-            echo(message, err=True)
+            echo(f"Load configuration matching {path_pattern}", err=True)
         else:
-            logger.debug(message)
+            logger.debug("Load configuration matching %s", path_pattern)
 
         # Read configuration file.
         conf_path, user_conf = self.read_and_parse_conf(path_pattern)
@@ -432,9 +1083,9 @@ class ConfigOption(ExtraOption, ParamStructure):
                 logger.debug(message)
 
         else:
-            logger.debug(f"Parsed user configuration: {user_conf}")
-            logger.debug(f"Initial defaults: {ctx.default_map}")
+            logger.debug("Parsed user configuration: %s", user_conf)
+            logger.debug("Initial defaults: %s", ctx.default_map)
             self.merge_default_map(ctx, user_conf)
-            logger.debug(f"New defaults: {ctx.default_map}")
+            logger.debug("New defaults: %s", ctx.default_map)
 
         return path_pattern
@@ -20,9 +20,9 @@ from functools import wraps
 import cloup
 
 from .colorize import ColorOption, HelpOption
-from .commands import ExtraCommand, ExtraGroup, default_extra_params
+from .commands import ExtraCommand, ExtraGroup, LazyGroup, default_extra_params
 from .config import ConfigOption
-from .logging import VerbosityOption
+from .logging import LogFileOption, LogFormatOption, VerbosityOption
 from .parameters import ShowParamsOption
 from .tabulate import TableFormatOption
 from .telemetry import TelemetryOption
@@ -95,12 +95,19 @@ extra_group = decorator_factory(
     cls=ExtraGroup,
     params=default_extra_params,
 )
+lazy_group = decorator_factory(
+    dec=cloup.group,
+    cls=LazyGroup,
+    params=default_extra_params,
+)
 extra_version_option = decorator_factory(dec=cloup.option, cls=ExtraVersionOption)
 
 # New option decorators provided by Click Extra.
 color_option = decorator_factory(dec=cloup.option, cls=ColorOption)
 config_option = decorator_factory(dec=cloup.option, cls=ConfigOption)
 help_option = decorator_factory(dec=cloup.option, cls=HelpOption)
+log_file_option = decorator_factory(dec=cloup.option, cls=LogFileOption)
+log_format_option = decorator_factory(dec=cloup.option, cls=LogFormatOption)
 show_params_option = decorator_factory(dec=cloup.option, cls=ShowParamsOption)
 table_format_option = decorator_factory(dec=cloup.option, cls=TableFormatOption)
 telemetry_option = decorator_factory(dec=cloup.option, cls=TelemetryOption)
@@ -17,24 +17,41 @@
 
 from __future__ import annotations
 
+import gzip
 import logging
+import os
+import re
+import shutil
 import sys
+import time
+from copy import copy
+from functools import partial
 from gettext import gettext as _
+from json.encoder import encode_basestring  # type: ignore[attr-defined]
 from logging import (
+    NOTSET,
     WARNING,
     Formatter,
     Handler,
     Logger,
     LogRecord,
+    PercentStyle,
+    StrFormatStyle,
+    StringTemplateStyle,
     _levelToName,
 )
-from typing import TYPE_CHECKING, Literal, TypeVar
+from queue import Empty, Queue
+from string import Template
+from threading import Event, Thread
+from typing import IO, TYPE_CHECKING, Literal, TypeVar, Union
+from weakref import WeakSet
 
 import click
+from click.globals import resolve_color_default
 
 from . import Choice
-from .colorize import default_theme
-from .parameters import ExtraOption
+from .colorize import HelpExtraTheme, default_theme
+from .parameters import ExtraOption, search_params
 
 if TYPE_CHECKING:
     from collections.abc import Generator, Iterable, Sequence
@@ -82,6 +99,10 @@ Are ignored:
 """
 
 
+LOG_FORMATS: tuple[str, ...] = ("text", "json")
+"""IDs of the formats supported by the ``--log-format`` option."""
+
+
 DEFAULT_LEVEL: int = WARNING
 DEFAULT_LEVEL_NAME: str = _levelToName[DEFAULT_LEVEL]
 """``WARNING`` is the default level we expect any loggers to starts their lives at.
@@ -113,15 +134,539 @@ class ExtraLogHandler(Handler):
             self.handleError(record)
 
 
+class AsyncLogHandler(ExtraLogHandler):
+    """A handler writing logs to ``<stderr>`` from a background thread.
+
+    In the spirit of ``QueueHandler`` and ``QueueListener``, records are formatted in
+    the thread emitting them, then queued. A writer thread drains the queue and
+    coalesces all pending messages into a single write, instead of one write per
+    record.
+
+    Pending messages are written on :meth:`flush`, which is called on the closing of
+    the context by :class:`VerbosityOption`, and at interpreter exit by
+    ``logging.shutdown()``.
+
+    The queue holds at most ``max_queue_size`` messages. Once full, emitting a record
+    blocks until the writer thread catches up, so no message is lost and memory stays
+    bounded when records are produced faster than they are written.
+    """
+
+    batch_size: int = 1024
+    """Maximum number of messages coalesced into one write."""
+
+    def __init__(
+        self,
+        level: int = logging.NOTSET,
+        max_queue_size: int = 10_000,
+    ) -> None:
+        """Set up the handler.
+
+        :param max_queue_size: Maximum number of messages waiting for the writer
+            thread. Emitting a record blocks while the queue is full.
+        """
+        super().__init__(level)
+        self.max_queue_size = max_queue_size
+        self._queue: Queue[_QueueItem] = Queue(max_queue_size)
+        self._writer: Thread | None = None
+        _async_handlers.add(self)
+
+    def emit(self, record: LogRecord) -> None:
+        """Format the record and queue the message for the writer thread.
+
+        The stream and color settings are resolved here, as they depend on the
+        context of the emitting thread.
+        """
+        try:
+            msg = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        if self._writer is None:
+            self._writer = Thread(
+                target=self._write,
+                name="click-extra-log-writer",
+                daemon=True,
+            )
+            self._writer.start()
+        self._queue.put((sys.stderr, resolve_color_default(), msg, record))
+
+    def _write(self) -> None:
+        """Drain the queue and write pending messages in batches."""
+        queue = self._queue
+        while True:
+            items = [queue.get()]
+            try:
+                while len(items) < self.batch_size:
+                    items.append(queue.get_nowait())
+            except Empty:
+                pass
+
+            # Group consecutive messages sharing the same stream and color setting.
+            lines: list[str] = []
+            target: tuple[IO[str], bool | None] | None = None
+            record: LogRecord | None = None
+            for item in items:
+                if isinstance(item, tuple):
+                    stream, color, msg, record = item
+                    if (stream, color) != target:
+                        self._echo(lines, target, record)
+                        lines, target = [], (stream, color)
+                    lines.append(msg)
+                    continue
+                self._echo(lines, target, record)
+                lines, target = [], None
+                # Stop signal.
+                if item is None:
+                    return
+                # Flush marker.
+                item.set()
+            self._echo(lines, target, record)
+
+    def _echo(
+        self,
+        lines: list[str],
+        target: tuple[IO[str], bool | None] | None,
+        record: LogRecord | None,
+    ) -> None:
+        if not lines or target is None:
+            return
+        try:
+            click.echo("\n".join(lines), file=target[0], color=target[1])
+        except Exception:
+            self.handleError(record)  # type: ignore[arg-type]
+
+    def flush(self) -> None:
+        """Block until all messages queued so far are written."""
+        writer = self._writer
+        if writer is None or not writer.is_alive():
+            return
+        written = Event()
+        self._queue.put(written)
+        written.wait()
+
+    def close(self) -> None:
+        """Write pending messages and stop the writer thread."""
+        writer = self._writer
+        if writer is not None and writer.is_alive():
+            self._queue.put(None)
+            writer.join()
+        self._writer = None
+        super().close()
+
+    def _reset(self) -> None:
+        """Drop the writer thread and queue inherited from a parent process."""
+        self._queue = Queue(self.max_queue_size)
+        self._writer = None
+
+
+class BufferedFileHandler(Handler):
+    """A handler appending logs to a file, in large chunks written from a background
+    thread.
+
+    Formatted messages are buffered in memory. The buffer is handed over to a writer
+    thread once it holds ``capacity`` characters, or if no chunk has been written for
+    ``flush_interval`` seconds. The writer thread also strips ANSI codes from messages,
+    and opens, rotates and compresses files, so the thread emitting records never
+    waits on disk I/O.
+
+    Pending messages are written on :meth:`flush`, which is called on the closing of
+    the context by :class:`VerbosityOption`, and at interpreter exit by
+    ``logging.shutdown()``.
+
+    At most ``max_queue_size`` chunks wait for the writer thread. Once the queue is
+    full, emitting a record blocks until the writer thread catches up, so no message
+    is lost and memory stays bounded on slow disks.
+    """
+
+    def __init__(
+        self,
+        filename: str | os.PathLike[str],
+        capacity: int = 64 * 1024,
+        flush_interval: float = 1.0,
+        max_bytes: int = 0,
+        backup_count: int = 5,
+        compress: bool = False,
+        encoding: str = "utf-8",
+        level: int = NOTSET,
+        max_queue_size: int = 16,
+    ) -> None:
+        """Set up the handler.
+
+        :param filename: Path of the log file. Messages are appended to it.
+        :param capacity: Number of buffered characters triggering a write.
+        :param flush_interval: Maximum delay in seconds before buffered messages are
+            written.
+        :param max_bytes: Rotate the log file before it exceeds this size. Files are
+            rotated between two chunks, so a single chunk larger than ``max_bytes``
+            still ends up in a file of its own. Rotation is disabled if ``0``.
+        :param backup_count: Number of rotated files to keep, named
+            ``<filename>.1``, ``<filename>.2``, and so on, from the most recent to the
+            oldest. If ``0``, rotated files are deleted.
+        :param compress: Compress rotated files with gzip, and add the ``.gz``
+            extension to their names.
+        :param max_queue_size: Maximum number of chunks waiting for the writer
+            thread. Emitting a record blocks while the queue is full.
+        """
+        super().__init__(level)
+        self.filename = os.path.abspath(filename)
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+        self.encoding = encoding
+        self.max_queue_size = max_queue_size
+        self._buffer: list[str] = []
+        self._buffer_size = 0
+        self._queue: Queue[str | Event | None] = Queue(max_queue_size)
+        self._writer: Thread | None = None
+        self._stream: IO[bytes] | None = None
+        _async_handlers.add(self)
+
+    def emit(self, record: LogRecord) -> None:
+        """Format the record and buffer the message.
+
+        Hands the buffer over to the writer thread if it reached ``capacity``.
+        """
+        try:
+            msg = self.format(record)
+        except Exception:
+            self.handleError(record)
+            return
+        self._buffer.append(msg)
+        self._buffer_size += len(msg) + 1
+        if self._writer is None:
+            self._start()
+        if self._buffer_size >= self.capacity:
+            self._queue.put(self._take())
+
+    def _start(self) -> None:
+        self._writer = Thread(
+            target=self._write,
+            name="click-extra-log-file-writer",
+            daemon=True,
+        )
+        self._writer.start()
+
+    def _take(self) -> str:
+        """Empty the buffer and returns its content as a single chunk.
+
+        Callers are expected to hold the lock of the handler.
+        """
+        chunk = "\n".join(self._buffer) + "\n" if self._buffer else ""
+        self._buffer = []
+        self._buffer_size = 0
+        return chunk
+
+    def _write(self) -> None:
+        """Write the chunks handed over, and the buffer if it has not been written for
+        ``flush_interval`` seconds."""
+        queue = self._queue
+        while True:
+            item: str | Event | None
+            try:
+                item = queue.get(timeout=self.flush_interval)
+            except Empty:
+                # Skip this round if the lock is held, as its holder might be waiting
+                # for this thread, like logging.shutdown() flushing the handler.
+                if self.lock is None or not self.lock.acquire(blocking=False):
+                    continue
+                try:
+                    item = self._take()
+                finally:
+                    self.lock.release()
+
+            if isinstance(item, str):
+                if item:
+                    self._write_chunk(item)
+            # Stop signal.
+            elif item is None:
+                if self._stream is not None:
+                    self._stream.close()
+                    self._stream = None
+                return
+            # Flush marker.
+            else:
+                item.set()
+
+    def _write_chunk(self, chunk: str) -> None:
+        data = click.unstyle(chunk).encode(self.encoding, "backslashreplace")
+        try:
+            if self._stream is None:
+                self._stream = open(self.filename, "ab")  # noqa: SIM115
+            if self.max_bytes:
+                size = self._stream.tell()
+                if size and size + len(data) > self.max_bytes:
+                    self.rotate()
+                    self._stream = open(self.filename, "ab")  # noqa: SIM115
+            self._stream.write(data)
+            self._stream.flush()
+        except Exception:
+            self.handleError(
+                logging.makeLogRecord(
+                    {"msg": "Cannot write logs to %s.", "args": (self.filename,)},
+                ),
+            )
+
+    def rotated_name(self, index: int) -> str:
+        """Returns the name of the ``index``-th most recent rotated file."""
+        name = f"{self.filename}.{index}"
+        return f"{name}.gz" if self.compress else name
+
+    def rotate(self) -> None:
+        """Close the log file, and move it in place of the most recent rotated file.
+
+        Older rotated files are shifted, and the oldest one beyond ``backup_count`` is
+        overwritten.
+        """
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+        if not os.path.exists(self.filename):
+            return
+        if not self.backup_count:
+            os.remove(self.filename)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            if os.path.exists(self.rotated_name(index)):
+                os.replace(self.rotated_name(index), self.rotated_name(index + 1))
+        if self.compress:
+            with open(self.filename, "rb") as source:
+                with gzip.open(self.rotated_name(1), "wb") as target:
+                    shutil.copyfileobj(source, target)
+            os.remove(self.filename)
+        else:
+            os.replace(self.filename, self.rotated_name(1))
+
+    def flush(self) -> None:
+        """Hand the buffer over to the writer thread, and block until all messages
+        buffered so far are written."""
+        writer = self._writer
+        if writer is None or not writer.is_alive():
+            return
+        self.acquire()
+        try:
+            self._queue.put(self._take())
+        finally:
+            self.release()
+        written = Event()
+        self._queue.put(written)
+        written.wait()
+
+    def close(self) -> None:
+        """Write pending messages, close the file and stop the writer thread."""
+        writer = self._writer
+        if writer is not None and writer.is_alive():
+            self.acquire()
+            try:
+                self._queue.put(self._take())
+            finally:
+                self.release()
+            self._queue.put(None)
+            writer.join()
+        self._writer = None
+        super().close()
+
+    def _reset(self) -> None:
+        """Drop the writer thread, queue, buffer and file inherited from a parent
+        process."""
+        self._buffer = []
+        self._buffer_size = 0
+        self._queue = Queue(self.max_queue_size)
+        self._writer = None
+        self._stream = None
+
+
+_QueueItem = Union[tuple, Event, None]
+"""Messages, flush markers and stop signals consumed by the writer thread."""
+
+_async_handlers: WeakSet[AsyncLogHandler | BufferedFileHandler] = WeakSet()
+"""Live handlers writing from a background thread."""
+
+
+def _reset_async_handlers() -> None:
+    for handler in _async_handlers:
+        handler._reset()
+
+
+# Threads do not survive a fork: children start their own writer on first emit.
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_async_handlers)
+
+
+class JSONLogFormatter(Formatter):
+    """Formatter rendering each record as a JSON object on a single line.
+
+    Objects have the ``timestamp``, ``level``, ``logger``, ``message`` and ``command``
+    keys, and ``exc_info`` and ``stack_info`` if the record carries them.
+    ``command`` is the command path of the current context, or ``null`` outside of a
+    CLI.
+
+    Lines are assembled from individually encoded strings, without serializing an
+    intermediate ``dict`` for each record.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._second: tuple[int, str] = (-1, "")
+
+    def formatTime(self, record: LogRecord, datefmt: str | None = None) -> str:
+        """Render the creation time of the record in ISO 8601 format, in UTC and with
+        milliseconds.
+
+        The date and time part is cached, as it is shared by all records created
+        within the same second.
+        """
+        if datefmt:
+            return super().formatTime(record, datefmt)
+        seconds = int(record.created)
+        if self._second[0] != seconds:
+            self._second = (
+                seconds,
+                time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)),
+            )
+        return f"{self._second[1]}.{int(record.msecs):03d}Z"
+
+    def format(self, record: LogRecord) -> str:
+        ctx = click.get_current_context(silent=True)
+        line = (
+            '{"timestamp": %s, "level": %s, "logger": %s, "message": %s, '
+            '"command": %s'
+        ) % (
+            encode_basestring(self.formatTime(record, self.datefmt)),
+            encode_basestring(record.levelname),
+            encode_basestring(record.name),
+            encode_basestring(record.getMessage()),
+            encode_basestring(ctx.command_path) if ctx else "null",
+        )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            line += ', "exc_info": ' + encode_basestring(record.exc_text)
+        if record.stack_info:
+            line += ', "stack_info": ' + encode_basestring(record.stack_info)
+        return line + "}"
+
+
+_LEVELNAME_FIELDS: dict[type[PercentStyle], re.Pattern] = {
+    StringTemplateStyle: re.compile(r"\$(?:levelname\b|\{levelname\})"),
+    StrFormatStyle: re.compile(r"\{levelname(?:![rsa])?(?::[^{}]*)?\}"),
+    PercentStyle: re.compile(r"%\(levelname\)[#0+ -]*\d*(?:\.\d+)?[rsa]"),
+}
+"""Regular expressions matching the ``levelname`` field in each style of templates."""
+
+
 class ExtraLogFormatter(Formatter):
+    """Formatter colorizing the level name of records.
+
+    For each level, the styled level name is rendered once into a copy of the format
+    template, which is then used for all records of that level. Records are never
+    modified, so other handlers still get their original level name.
+    """
+
+    theme: HelpExtraTheme = default_theme
+    """Theme used to style level names."""
+
+    def __init__(self, *args, color: bool | None = None, **kwargs) -> None:
+        """Set up the formatter.
+
+        :param color: Force the styling of level names on or off. If ``None``, level
+            names are styled unless colors are disabled in the current context.
+        """
+        super().__init__(*args, **kwargs)
+        self.color = color
+        self.json_formatter = JSONLogFormatter()
+        self._level_styles: dict[bool, dict[str, PercentStyle]] = {}
+        self._level_styles_theme: HelpExtraTheme | None = None
+
+    def level_name(self, levelname: str, color: bool = True) -> str:
+        """Returns the level name to print for ``levelname``.
+
+        Levels known to the theme are lower-cased, and styled if ``color`` is set.
+        Others are left untouched.
+        """
+        level = levelname.lower()
+        if level not in self.theme.ansi_table:
+            return levelname
+        return self.theme.render(level, level) if color else level
+
+    def level_style(self, levelname: str, color: bool = True) -> PercentStyle:
+        """Returns the formatting style of records with the ``levelname`` level.
+
+        The printed level name is substituted in the template of the formatter's own
+        style. Styles are cached per color state, and reset if the theme changes.
+        """
+        # Themes are not hashable: drop all styles if the theme has been replaced.
+        if self._level_styles_theme is not self.theme:
+            self._level_styles = {}
+            self._level_styles_theme = self.theme
+        styles = self._level_styles.setdefault(color, {})
+
+        style = styles.get(levelname)
+        if style is None:
+            style = self._style
+            name = self.level_name(levelname, color)
+            if name != levelname:
+                style = copy(self._style)
+                style._fmt = self._substitute_level(name)
+                if isinstance(style, StringTemplateStyle):
+                    style._tpl = Template(style._fmt)
+            styles[levelname] = style
+        return style
+
+    def _substitute_level(self, name: str) -> str:
+        """Render ``name`` in place of the ``levelname`` fields of the template."""
+        style_class = next(c for c in _LEVELNAME_FIELDS if isinstance(self._style, c))
+
+        def render(match: re.Match) -> str:
+            field = match.group()
+            if style_class is StringTemplateStyle:
+                return name.replace("$", "$$")
+            if style_class is StrFormatStyle:
+                rendered = field.format(levelname=name)
+                return rendered.replace("{", "{{").replace("}", "}}")
+            return (field % {"levelname": name}).replace("%", "%%")
+
+        return _LEVELNAME_FIELDS[style_class].sub(render, self._style._fmt)
+
+    def format(self, record: LogRecord) -> str:
+        """Render the record as a JSON object if the ``json`` log format has been
+        selected by :class:`LogFormatOption` in the current context.
+
+        Otherwise, format the record like ``logging.Formatter.format()`` does, but with
+        the style of its level. Level names are not styled if colors are disabled in
+        the current context.
+        """
+        ctx = click.get_current_context(silent=True)
+        color = self.color
+        if ctx is not None:
+            if ctx.meta.get("click_extra.log_format") == "json":
+                return self.json_formatter.format(record)
+            if color is None:
+                color = ctx.color is not False
+
+        record.message = record.getMessage()
+        if self.usesTime():
+            record.asctime = self.formatTime(record, self.datefmt)
+        s = self.level_style(record.levelname, color is not False).format(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            if s[-1:] != "\n":
+                s += "\n"
+            s += record.exc_text
+        if record.stack_info:
+            if s[-1:] != "\n":
+                s += "\n"
+            s += self.formatStack(record.stack_info)
+        return s
+
     def formatMessage(self, record: LogRecord) -> str:
-        """Colorize the record's log level name before calling the strandard
-        formatter."""
-        level = record.levelname.lower()
-        level_style = getattr(default_theme, level, None)
-        if level_style:
-            record.levelname = level_style(level)
-        return super().formatMessage(record)
+        """Format the record with the style of its level."""
+        color = self.color
+        if color is None:
+            color = resolve_color_default() is not False
+        return self.level_style(record.levelname, color).format(record)
 
 
 def extra_basic_config(
@@ -247,9 +792,26 @@ class VerbosityOption(ExtraOption):
         """
         for logger in list(self.all_loggers)[::-1]:
             logging.getLogger("click_extra").debug(
-                f"Reset {logger} to {DEFAULT_LEVEL_NAME}.",
+                "Reset %s to %s.",
+                logger,
+                DEFAULT_LEVEL_NAME,
             )
             logger.setLevel(DEFAULT_LEVEL)
+        self.flush_handlers()
+
+    def flush_handlers(self):
+        """Flush the handlers of all loggers managed by the option, and of their
+        parents they propagate to.
+
+        Required by handlers writing asynchronously, like :class:`AsyncLogHandler`,
+        to not lose messages once the CLI is done.
+        """
+        for logger in self.all_loggers:
+            current: Logger | None = logger
+            while current:
+                for handler in current.handlers:
+                    handler.flush()
+                current = current.parent if current.propagate else None
 
     def set_levels(self, ctx, param, value):
         """Set level of all loggers configured on the option.
@@ -263,7 +825,7 @@ class VerbosityOption(ExtraOption):
 
         for logger in self.all_loggers:
             logger.setLevel(LOG_LEVELS[value])
-            logging.getLogger("click_extra").debug(f"Set {logger} to {value}.")
+            logging.getLogger("click_extra").debug("Set %s to %s.", logger, value)
 
         ctx.call_on_close(self.reset_loggers)
 
@@ -277,6 +839,7 @@ class VerbosityOption(ExtraOption):
         expose_value=False,
         help=_("Either {log_levels}.").format(log_levels=", ".join(LOG_LEVELS)),
         is_eager=True,
+        handler_class: type[Handler] | None = None,
         **kwargs,
     ) -> None:
         """Set up the verbosity option.
@@ -288,6 +851,10 @@ class VerbosityOption(ExtraOption):
             If not provided or ``None``, the `default Python root logger
             <https://github.com/python/cpython/blob/2b5dbd1/Lib/logging/__init__.py#L1945>`_
             is used.
+        :param handler_class: If provided, the logger is set up by
+            :func:`extra_basic_config` with a new handler of this class, like
+            :class:`AsyncLogHandler`. The root logger used by default is always set up,
+            with an :class:`ExtraLogHandler` if no class is provided.
 
         .. todo::
             Write more documentation to detail in which case the user is responsible
@@ -304,7 +871,16 @@ class VerbosityOption(ExtraOption):
             logger = logging.getLogger(default_logger)
         # ``None`` will produce a default root logger.
         else:
-            logger = extra_basic_config(default_logger)
+            logger = logging.getLogger()
+            handler_class = handler_class or ExtraLogHandler
+
+        # Set up the logger with a new handler of the requested class. The root logger
+        # is referred to as ``None``, as Python 3.8 does not resolve its ``root`` name.
+        if handler_class is not None:
+            logger = extra_basic_config(
+                None if logger is logging.getLogger() else logger.name,
+                handler_class=handler_class,
+            )
 
         # Store the logger name for later use.
         self.logger_name = logger.name
@@ -321,3 +897,180 @@ class VerbosityOption(ExtraOption):
             is_eager=is_eager,
             **kwargs,
         )
+
+
+class LogFormatOption(ExtraOption):
+    """A pre-configured ``--log-format`` option, companion of
+    :class:`VerbosityOption`.
+
+    With ``json``, handlers formatted by :class:`ExtraLogFormatter` render records as
+    JSON lines with :class:`JSONLogFormatter`, as long as the context is alive.
+
+    The selected format is made available in the context in
+    ``ctx.meta["click_extra.log_format"]``.
+    """
+
+    def set_format(self, ctx, param, value):
+        """Save the log format in the context."""
+        ctx.meta["click_extra.log_format"] = value
+
+    def __init__(
+        self,
+        param_decls: Sequence[str] | None = None,
+        default: str = "text",
+        metavar="FORMAT",
+        type=Choice(LOG_FORMATS, case_sensitive=False),
+        expose_value=False,
+        help=_("Either {log_formats}.").format(log_formats=", ".join(LOG_FORMATS)),
+        is_eager=True,
+        **kwargs,
+    ) -> None:
+        if not param_decls:
+            param_decls = ("--log-format",)
+
+        kwargs.setdefault("callback", self.set_format)
+
+        super().__init__(
+            param_decls=param_decls,
+            default=default,
+            metavar=metavar,
+            type=type,
+            expose_value=expose_value,
+            help=help,
+            is_eager=is_eager,
+            **kwargs,
+        )
+
+
+class LogFileOption(ExtraOption):
+    """A pre-configured ``--log-file`` option, companion of :class:`VerbosityOption`.
+
+    Attaches a :class:`BufferedFileHandler` appending logs to the provided file, as
+    long as the context is alive. Messages are formatted by an
+    :class:`ExtraLogFormatter` without colors, so the file follows the format
+    selected by :class:`LogFormatOption`.
+
+    The path of the log file is made available in the context in
+    ``ctx.meta["click_extra.log_file"]``.
+    """
+
+    logger_name: str | None
+    """The ID of the logger the handler is attached to.
+
+    If ``None``, the handler is attached to the loggers managed by the
+    :class:`VerbosityOption` of the command.
+    """
+
+    file_format: str = "{asctime} {levelname}: {message}"
+    """Format of the messages written to the file, in ``{`` style."""
+
+    def set_log_file(self, ctx, param, value):
+        """Attach a handler writing to the log file, and detach it on the closing of
+        the context."""
+        if not value:
+            return
+        ctx.meta["click_extra.log_file"] = value
+
+        handler = BufferedFileHandler(
+            value,
+            capacity=self.capacity,
+            flush_interval=self.flush_interval,
+            max_bytes=self.max_bytes,
+            backup_count=self.backup_count,
+            compress=self.compress,
+        )
+        handler.setFormatter(
+            ExtraLogFormatter(fmt=self.file_format, style="{", color=False),
+        )
+        loggers = self.target_loggers(ctx)
+        for logger in loggers:
+            logger.addHandler(handler)
+        ctx.call_on_close(partial(self.remove_handler, loggers, handler))
+
+    def target_loggers(self, ctx: click.Context) -> list[Logger]:
+        """Returns the loggers to attach the handler to.
+
+        Defaults to the loggers of the :class:`VerbosityOption` of the command, or to
+        the root logger like :class:`VerbosityOption` if the command has none. Loggers
+        propagating their records to another logger of the list are skipped, so
+        records are not written twice.
+        """
+        if self.logger_name is not None:
+            return [logging.getLogger(self.logger_name)]
+
+        verbosity_option = search_params(ctx.command.params, VerbosityOption)
+        if verbosity_option is None:
+            return [logging.getLogger()]
+
+        all_loggers = verbosity_option.all_loggers  # type: ignore[union-attr]
+        loggers = list(dict.fromkeys(all_loggers))
+
+        def propagates_to_others(logger: Logger) -> bool:
+            current = logger
+            while current.propagate and current.parent:
+                current = current.parent
+                if current in loggers:
+                    return True
+            return False
+
+        return [logger for logger in loggers if not propagates_to_others(logger)]
+
+    @staticmethod
+    def remove_handler(loggers: Iterable[Logger], handler: Handler) -> None:
+        """Detach the handler from the loggers, then write its pending messages and
+        close it."""
+        for logger in loggers:
+            logger.removeHandler(handler)
+        handler.close()
+
+    def __init__(
+        self,
+        param_decls: Sequence[str] | None = None,
+        default_logger: Logger | str | None = None,
+        capacity: int = 64 * 1024,
+        flush_interval: float = 1.0,
+        max_bytes: int = 0,
+        backup_count: int = 5,
+        compress: bool = False,
+        default: str | None = None,
+        metavar="LOG_PATH",
+        type=click.Path(dir_okay=False, writable=True),
+        expose_value=False,
+        help=_("Append logs to this file."),
+        is_eager=True,
+        **kwargs,
+    ) -> None:
+        """Set up the log file option.
+
+        :param default_logger: Logger instance or ID to attach the handler to. If not
+            provided or ``None``, the handler is attached to the same loggers as the
+            :class:`VerbosityOption` of the command.
+
+        Other parameters are passed to :class:`BufferedFileHandler`.
+        """
+        if not param_decls:
+            param_decls = ("--log-file",)
+
+        if isinstance(default_logger, Logger):
+            self.logger_name = default_logger.name
+        else:
+            self.logger_name = default_logger
+
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.compress = compress
+
+        kwargs.setdefault("callback", self.set_log_file)
+
+        super().__init__(
+            param_decls=param_decls,
+            default=default,
+            metavar=metavar,
+            type=type,
+            expose_value=expose_value,
+            help=help,
+            is_eager=is_eager,
+            **kwargs,
+        )
@@ -25,6 +25,7 @@ import logging
 import re
 from collections.abc import Iterable, MutableMapping, Sequence
 from contextlib import nullcontext
+from dataclasses import dataclass
 from functools import cached_property, reduce
 from gettext import gettext as _
 from operator import getitem, methodcaller
@@ -38,7 +39,6 @@ from unittest.mock import patch
 
 import click
 from boltons.iterutils import unique
-from mergedeep import merge
 from tabulate import tabulate
 
 from . import (
@@ -173,6 +173,49 @@ def search_params(
     return param_list
 
 
+@dataclass(frozen=True)
+class ParamEntry:
+    """Metadata of a parameter, as registered in the parameter index shared by all
+    the options of a CLI."""
+
+    keys: tuple[str, ...]
+    """IDs of the commands and of the parameter, locating it in the parameter trees.
+
+    Kept as-is from ``ParamStructure.walk_params()``, as IDs may contain the
+    ``ParamStructure.SEP`` separator of the flat index.
+    """
+
+    param: click.Parameter
+    """The parameter object itself."""
+
+    python_type: type
+    """Python type of the parameter, as guessed by
+    ``ParamStructure.get_param_type()``."""
+
+    excluded: bool
+    """``True`` if the parameter is part of the default
+    ``ParamStructure.DEFAULT_EXCLUDED_PARAMS`` blocklist."""
+
+    envvars: tuple[str, ...]
+    """All environment variables of the parameter, including the auto-generated one."""
+
+
+_params_index_generation = 0
+"""Counter incremented on each invalidation of the shared parameter indexes."""
+
+
+def invalidate_params_index() -> None:
+    """Invalidate all shared parameter indexes.
+
+    The index of a CLI is computed once and attached to its root command. It is
+    automatically invalidated when a subcommand is added to an ``ExtraGroup``. Call this
+    function if you alter the parameters or subcommands of a CLI in any other way
+    after its first invocation.
+    """
+    global _params_index_generation
+    _params_index_generation += 1
+
+
 class ExtraOption(Option):
     """All new options implemented by ``click-extra`` inherits this class.
 
@@ -461,56 +504,139 @@ class ParamStructure:
         cli = ctx.find_root().command
         return [f"{cli.name}{self.SEP}{p}" for p in self.DEFAULT_EXCLUDED_PARAMS]
 
+    @property
+    def shared_params_index(self) -> dict[str, ParamEntry]:
+        """Returns the parameter index shared by all options of the current CLI.
+
+        This is a flat dictionary whose keys are the fully-qualified IDs of all the
+        parameters of the CLI, and values are ``ParamEntry`` instances. The index is
+        unfiltered: excluded parameters are flagged, not removed.
+
+        The index is computed once and stored on the root command, so it is reused
+        across all options and invocations until ``invalidate_params_index()`` is
+        called. Environment variables depend on the ``auto_envvar_prefix`` of the
+        context, so the index is also recomputed if the prefix changes.
+        """
+        root_ctx = get_current_context().find_root()
+        cli = root_ctx.command
+        cache_key = (_params_index_generation, root_ctx.auto_envvar_prefix)
+
+        cached = getattr(cli, "_click_extra_params_index", None)
+        if cached is not None and cached[0] == cache_key:
+            return cast("dict[str, ParamEntry]", cached[1])
+
+        default_excluded = {
+            f"{cli.name}{self.SEP}{p}" for p in self.DEFAULT_EXCLUDED_PARAMS
+        }
+        index = {}
+        for keys, param in self.walk_params():
+            path = self.SEP.join(keys)
+            index[path] = ParamEntry(
+                keys=tuple(keys),
+                param=param,
+                python_type=self.get_param_type(param),
+                excluded=path in default_excluded,
+                envvars=all_envvars(param, root_ctx),
+            )
+
+        cli._click_extra_params_index = (cache_key, index)  # type: ignore[attr-defined]
+        return index
+
+    @staticmethod
+    def _insert_leaf(tree: dict[str, Any], keys: Sequence[str], leaf: Any) -> None:
+        """Set the ``leaf`` at the location of ``keys`` in ``tree``, by creating all
+        intermediate levels on the way.
+
+        Existing leaves are overwritten by intermediate levels, and vice versa.
+        """
+        for key in keys[:-1]:
+            level = tree.get(key)
+            if not isinstance(level, dict):
+                level = tree[key] = {}
+            tree = level
+        tree[keys[-1]] = leaf
+
+    _params_source: dict[str, ParamEntry] | None = None
+    """The shared index from which the current parameter trees were built."""
+
     def build_param_trees(self) -> None:
         """Build all parameters tree structure in one go and cache them.
 
+        Each parameter of the shared index is inserted in a single pass into the
+        template, types and objects trees, as well as the flat ``params_index``.
+
         This removes parameters whose fully-qualified IDs are in the ``excluded_params``
         blocklist.
         """
+        shared_index = self.shared_params_index
+
         template: dict[str, Any] = {}
         types: dict[str, Any] = {}
         objects: dict[str, Any] = {}
+        index: dict[str, click.Parameter] = {}
 
-        for keys, param in self.walk_params():
-            if self.SEP.join(keys) in self.excluded_params:
+        excluded_params = set(self.excluded_params)
+        for path, entry in shared_index.items():
+            if path in excluded_params:
                 continue
-            merge(template, self.init_tree_dict(*keys))
-            merge(types, self.init_tree_dict(*keys, leaf=self.get_param_type(param)))
-            merge(objects, self.init_tree_dict(*keys, leaf=param))
+            self._insert_leaf(template, entry.keys, None)
+            self._insert_leaf(types, entry.keys, entry.python_type)
+            self._insert_leaf(objects, entry.keys, entry.param)
+            index[path] = entry.param
 
-        self.params_template = template
-        self.params_types = types
-        self.params_objects = objects
+        self._params_trees = (template, types, objects, index)
+        self._params_source = shared_index
 
-    @cached_property
-    def params_template(self):
+    def _get_params_trees(
+        self,
+    ) -> tuple[dict[str, Any], dict[str, Any], dict[str, Any], dict[str, Any]]:
+        """Returns the parameter trees, and rebuild them if the shared index changed.
+
+        Outside of a context, the last trees built are returned as-is.
+        """
+        if (
+            self._params_source is None
+            or get_current_context(silent=True) is not None
+            and self.shared_params_index is not self._params_source
+        ):
+            self.build_param_trees()
+        return self._params_trees
+
+    @property
+    def params_template(self) -> dict[str, Any]:
         """Returns a tree-like dictionary whose keys shadows the CLI options and
         subcommands and values are ``None``.
 
         Perfect to serve as a template for configuration files.
         """
-        self.build_param_trees()
-        return self.params_template
+        return self._get_params_trees()[0]
 
-    @cached_property
-    def params_types(self):
+    @property
+    def params_types(self) -> dict[str, Any]:
         """Returns a tree-like dictionary whose keys shadows the CLI options and
         subcommands and values are their expected Python type.
 
         Perfect to parse configuration files and user-provided parameters.
         """
-        self.build_param_trees()
-        return self.params_types
+        return self._get_params_trees()[1]
 
-    @cached_property
-    def params_objects(self):
+    @property
+    def params_objects(self) -> dict[str, Any]:
         """Returns a tree-like dictionary whose keys shadows the CLI options and
         subcommands and values are parameter objects.
 
         Perfect to parse configuration files and user-provided parameters.
         """
-        self.build_param_trees()
-        return self.params_objects
+        return self._get_params_trees()[2]
+
+    @property
+    def params_index(self) -> dict[str, click.Parameter]:
+        """Returns a flat dictionary whose keys are the fully-qualified IDs of the
+        parameters, and values are parameter objects.
+
+        Perfect to iterate over all parameters without walking the trees.
+        """
+        return self._get_params_trees()[3]
 
 
 class ShowParamsOption(ExtraOption, ParamStructure):
@@ -584,7 +710,7 @@ class ShowParamsOption(ExtraOption, ParamStructure):
             a ``click_extra.raw_args`` metadata entry to the context.
         """
         # Imported here to avoid circular imports.
-        from .colorize import KO, OK, default_theme
+        from .colorize import KO, OK, apply_style, default_theme
         from .config import ConfigOption
 
         # Exit early if the callback was processed but the option wasn't set.
@@ -597,7 +723,7 @@ class ShowParamsOption(ExtraOption, ParamStructure):
 
         if "click_extra.raw_args" in ctx.meta:
             raw_args = ctx.meta.get("click_extra.raw_args", [])
-            logger.debug(f"click_extra.raw_args: {raw_args}")
+            logger.debug("click_extra.raw_args: %s", raw_args)
 
             # Mimics click.core.Command.parse_args() so we can produce the list of
             # parsed options values.
@@ -612,10 +738,11 @@ class ShowParamsOption(ExtraOption, ParamStructure):
             get_param_value = methodcaller("consume_value", ctx, opts)
 
         else:
-            logger.debug(f"click_extra.raw_args not in {ctx.meta}")
+            logger.debug("click_extra.raw_args not in %s", ctx.meta)
             logger.warning(
-                f"Cannot extract parameters values: "
-                f"{ctx.command} does not inherits from ExtraCommand.",
+                "Cannot extract parameters values: "
+                "%s does not inherits from ExtraCommand.",
+                ctx.command,
             )
 
             def vanilla_getter(p):
@@ -646,17 +773,13 @@ class ShowParamsOption(ExtraOption, ParamStructure):
                 str | None,
             ]
         ] = []
-        for path, param_type in self.flatten_tree_dict(self.params_types).items():
-            # Get the parameter instance.
-            tree_keys = path.split(self.SEP)
-            par = cast(
-                "click.Parameter",
-                self.get_tree_value(self.params_objects, *tree_keys),
-            )
-            assert par.name == tree_keys[-1]
+        shared_index = self.shared_params_index
+        for path, par in self.params_index.items():
+            entry = shared_index[path]
+            param_type = entry.python_type
 
             param_value, source = get_param_value(par)
-            param_class = self.get_tree_value(self.params_objects, *tree_keys).__class__
+            param_class = par.__class__
 
             # Collect param's spec and hidden status.
             hidden = None
@@ -687,15 +810,17 @@ class ShowParamsOption(ExtraOption, ParamStructure):
                 allowed_in_conf = KO if path in config_option.excluded_params else OK
 
             line = (
-                default_theme.invoked_command(path),
+                default_theme.render("invoked_command", path),
                 f"{param_class.__module__}.{param_class.__qualname__}",
                 param_spec,
                 param_type.__name__,
                 hidden,
                 OK if par.expose_value is True else KO,
                 allowed_in_conf,
-                ", ".join(map(default_theme.envvar, all_envvars(par, ctx))),
-                default_theme.default(str(par.get_default(ctx))),
+                ", ".join(
+                    default_theme.render("envvar", envvar) for envvar in entry.envvars
+                ),
+                default_theme.render("default", str(par.get_default(ctx))),
                 param_value,
                 source._name_ if source else None,
             )
@@ -709,7 +834,9 @@ class ShowParamsOption(ExtraOption, ParamStructure):
             return len(tree_keys), param_path
 
         header_style = Style(bold=True)
-        header_labels = tuple(map(header_style, self.TABLE_HEADERS))
+        header_labels = tuple(
+            apply_style(header_style, label) for label in self.TABLE_HEADERS
+        )
 
         output = tabulate(
             sorted(table, key=sort_by_depth),
@@ -0,0 +1,458 @@
+# Copyright Kevin Deldycke <kevin@deldycke.com> and contributors.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+"""Warm-process server mode, to skip the startup cost of short-lived invocations.
+
+A daemon imports the CLI once, then listens on a Unix socket. A thin client forwards
+its arguments, environment, working directory and standard streams to it. The daemon
+forks a child per invocation, which runs the CLI in isolation with the client's
+context, then sends the exit code back.
+
+Only relies on the standard library, so the client does not import the CLI.
+"""
+
+from __future__ import annotations
+
+import array
+import hashlib
+import json
+import os
+import re
+import signal
+import socket
+import struct
+import subprocess
+import sys
+import tempfile
+import traceback
+from contextlib import suppress
+from importlib import import_module
+from pathlib import Path
+from typing import TYPE_CHECKING, Sequence
+
+if TYPE_CHECKING:
+    from typing import NoReturn
+
+    import click
+
+DEFAULT_IDLE_TIMEOUT = 600
+"""Number of seconds after which a daemon without any request shuts itself down."""
+
+STDIO_FDS = (0, 1, 2)
+"""File descriptors of the client's ``<stdin>``, ``<stdout>`` and ``<stderr>``."""
+
+_HEADER = struct.Struct("!I")
+"""Length of the JSON request following the header."""
+
+_INT = struct.Struct("!i")
+"""PID of the child handling the request, then its exit code."""
+
+
+def server_supported() -> bool:
+    """``True`` if the platform supports Unix sockets, file descriptors passing and
+    ``fork()``."""
+    return all(
+        (
+            hasattr(socket, "AF_UNIX"),
+            hasattr(socket, "SCM_RIGHTS"),
+            hasattr(os, "fork"),
+        ),
+    )
+
+
+def socket_dir() -> Path:
+    """Returns the private directory holding the sockets of the current user.
+
+    Defaults to ``$XDG_RUNTIME_DIR/click-extra``, or to a ``click-extra-<uid>`` folder
+    in the temporary directory. The directory is created with ``0700`` permissions.
+
+    Raises ``PermissionError`` if it exists but is not private to the current user.
+    """
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        path = Path(runtime_dir) / "click-extra"
+    else:
+        path = Path(tempfile.gettempdir()) / f"click-extra-{os.getuid()}"
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+
+    stat = path.lstat()
+    if stat.st_uid != os.getuid() or stat.st_mode & 0o077:
+        msg = f"{path} must be a directory owned by and only accessible to the user."
+        raise PermissionError(msg)
+    return path
+
+
+def default_socket_path(import_path: str) -> Path:
+    """Returns the path of the socket of the CLI located at ``import_path``.
+
+    The socket name is derived from a hash of ``import_path``, to stay within the
+    length limit of Unix socket paths.
+    """
+    digest = hashlib.sha256(import_path.encode()).hexdigest()[:16]
+    prefix = re.sub(r"[^\w.-]", "_", import_path)[:32]
+    return socket_dir() / f"{prefix}-{digest}.sock"
+
+
+def load_cli(import_path: str) -> click.Command:
+    """Import the CLI from an ``import_path`` like ``package.module:cli``."""
+    module_path, _, attr = import_path.partition(":")
+    cli = import_module(module_path)
+    for part in attr.split(".") if attr else ():
+        cli = getattr(cli, part)
+    return cli  # type: ignore[return-value]
+
+
+def source_files(import_path: str) -> dict[str, float]:
+    """Modification times of the source files of the CLI's top-level package.
+
+    Only covers modules already imported.
+    """
+    package = import_path.partition(":")[0].split(".", 1)[0]
+    mtimes = {}
+    for name, module in list(sys.modules.items()):
+        if name != package and not name.startswith(f"{package}."):
+            continue
+        filepath = getattr(module, "__file__", None)
+        if filepath:
+            try:
+                mtimes[filepath] = os.stat(filepath).st_mtime
+            except OSError:
+                mtimes[filepath] = -1
+    return mtimes
+
+
+def _send_request(sock: socket.socket, payload: bytes, fds: Sequence[int]) -> None:
+    """Send the header of the request with file descriptors, then its payload."""
+    sock.sendmsg(
+        [_HEADER.pack(len(payload))],
+        [(socket.SOL_SOCKET, socket.SCM_RIGHTS, array.array("i", fds))],
+    )
+    sock.sendall(payload)
+
+
+def _recv_exactly(sock: socket.socket, size: int) -> bytes | None:
+    """Read ``size`` bytes from ``sock``, or return ``None`` if it is closed before."""
+    data = b""
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def _recv_request(sock: socket.socket) -> tuple[dict, list[int]]:
+    """Receive the file descriptors and the payload sent by ``_send_request()``."""
+    fds = array.array("i")
+    header, ancdata, _flags, _addr = sock.recvmsg(
+        _HEADER.size,
+        socket.CMSG_LEN(len(STDIO_FDS) * fds.itemsize),
+    )
+    for level, kind, data in ancdata:
+        if level == socket.SOL_SOCKET and kind == socket.SCM_RIGHTS:
+            fds.frombytes(data[: len(data) - (len(data) % fds.itemsize)])
+    if len(header) < _HEADER.size:
+        header += _recv_exactly(sock, _HEADER.size - len(header)) or b""
+    (size,) = _HEADER.unpack(header)
+    payload = _recv_exactly(sock, size)
+    if payload is None:
+        msg = "Connection closed before the end of the request."
+        raise ConnectionError(msg)
+    return json.loads(payload), list(fds)
+
+
+def forward(
+    socket_path: str | Path,
+    args: Sequence[str],
+    prog_name: str,
+    env: dict[str, str] | None = None,
+    cwd: str | None = None,
+    fds: Sequence[int] = STDIO_FDS,
+) -> int | None:
+    """Run the CLI in the daemon listening on ``socket_path``.
+
+    Forwards ``args``, ``prog_name``, ``env``, ``cwd`` and the ``fds`` standard streams,
+    which default to those of the current process. ``SIGINT`` received while waiting is
+    relayed to the child running the CLI.
+
+    Returns the exit code of the CLI, or ``None`` if no daemon accepted the request, in
+    which case the CLI has not been run.
+    """
+    request = {
+        "args": list(args),
+        "prog_name": prog_name,
+        "env": dict(os.environ if env is None else env),
+        "cwd": os.getcwd() if cwd is None else cwd,
+    }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(socket_path))
+            _send_request(sock, json.dumps(request).encode(), fds)
+            data = _recv_exactly(sock, _INT.size)
+        except OSError:
+            return None
+        # The daemon closed the connection without starting a child: it is stale.
+        if data is None:
+            return None
+
+        (child_pid,) = _INT.unpack(data)
+
+        def relay_sigint(signum, frame):
+            os.kill(child_pid, signal.SIGINT)
+
+        # Signal handlers can only be installed from the main thread.
+        previous_handler = None
+        with suppress(ValueError):
+            previous_handler = signal.signal(signal.SIGINT, relay_sigint)
+        try:
+            data = _recv_exactly(sock, _INT.size)
+        finally:
+            if previous_handler is not None:
+                signal.signal(signal.SIGINT, previous_handler)
+
+    # The child died before reporting its exit code.
+    if data is None:
+        return 1
+    return _INT.unpack(data)[0]
+
+
+def spawn_server(
+    import_path: str,
+    socket_path: str | Path,
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+) -> subprocess.Popen:
+    """Start a daemon serving the CLI in the background, detached from the terminal."""
+    return subprocess.Popen(
+        (
+            sys.executable,
+            "-m",
+            __name__,
+            import_path,
+            str(socket_path),
+            str(idle_timeout),
+        ),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        close_fds=True,
+    )
+
+
+def run(
+    import_path: str,
+    args: Sequence[str] | None = None,
+    prog_name: str | None = None,
+    socket_path: str | Path | None = None,
+    idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+) -> NoReturn:
+    """Entry point running the CLI at ``import_path`` through its warm daemon.
+
+    If no daemon is available, the CLI is run in the current process and a daemon is
+    started in the background for the next invocations. Platforms without Unix sockets
+    always run the CLI in the current process.
+    """
+    if args is None:
+        args = sys.argv[1:]
+    if prog_name is None:
+        prog_name = os.path.basename(sys.argv[0])
+
+    if server_supported():
+        if socket_path is None:
+            socket_path = default_socket_path(import_path)
+        exit_code = forward(socket_path, args, prog_name)
+        if exit_code is not None:
+            sys.exit(exit_code)
+        spawn_server(import_path, socket_path, idle_timeout)
+
+    load_cli(import_path).main(args=list(args), prog_name=prog_name)
+    sys.exit(0)
+
+
+class CommandServer:
+    """Daemon serving a CLI on a Unix socket, one forked child per request."""
+
+    def __init__(
+        self,
+        import_path: str,
+        socket_path: str | Path | None = None,
+        idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+    ) -> None:
+        self.import_path = import_path
+        self.socket_path = Path(
+            socket_path if socket_path else default_socket_path(import_path),
+        )
+        self.idle_timeout = idle_timeout
+
+        # Warm the process up.
+        self.cli = load_cli(import_path)
+        self.sources = source_files(import_path)
+
+    def sources_changed(self) -> bool:
+        """``True`` if source files of the CLI were modified since the daemon
+        started."""
+        return any(
+            self._mtime(filepath) != mtime for filepath, mtime in self.sources.items()
+        )
+
+    @staticmethod
+    def _mtime(filepath: str) -> float:
+        try:
+            return os.stat(filepath).st_mtime
+        except OSError:
+            return -1
+
+    def bind(self) -> socket.socket | None:
+        """Create the listening socket, only accessible to the current user.
+
+        The socket is bound and listening on a temporary path before being linked to
+        its final path, so clients never connect to a socket not accepting
+        connections yet.
+
+        Returns ``None`` if another daemon is already listening on the same path.
+        """
+        tmp_path = self.socket_path.with_name(
+            f"{self.socket_path.name}.{os.getpid()}.tmp",
+        )
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        old_umask = os.umask(0o177)
+        try:
+            if tmp_path.exists():
+                tmp_path.unlink()
+            server.bind(str(tmp_path))
+        finally:
+            os.umask(old_umask)
+        try:
+            os.chmod(tmp_path, 0o600)
+            server.listen()
+            while True:
+                try:
+                    os.link(tmp_path, self.socket_path)
+                    return server
+                except FileExistsError:
+                    pass
+                # Reclaim the socket left behind by a dead daemon.
+                with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                    try:
+                        probe.connect(str(self.socket_path))
+                    except OSError:
+                        if self.socket_path.exists():
+                            self.socket_path.unlink()
+                    else:
+                        server.close()
+                        return None
+        finally:
+            tmp_path.unlink()
+
+    def serve(self) -> None:
+        """Serve requests until the daemon is idle for ``idle_timeout`` seconds, or
+        until the source files of the CLI change."""
+        server = self.bind()
+        if server is None:
+            return
+        # Let the kernel reap children.
+        signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+        server.settimeout(self.idle_timeout)
+        try:
+            while True:
+                try:
+                    conn, _addr = server.accept()
+                except socket.timeout:
+                    break
+                # Stop serving stale code. The socket is released before the client
+                # sees its connection closed without response, so it can start a new
+                # daemon on the same path.
+                if self.sources_changed():
+                    self.socket_path.unlink(missing_ok=True)
+                    server.close()
+                    conn.close()
+                    return
+                if os.fork() == 0:
+                    server.close()
+                    self.handle(conn)
+                conn.close()
+        finally:
+            if server.fileno() != -1:
+                self.socket_path.unlink(missing_ok=True)
+                server.close()
+
+    def peer_allowed(self, conn: socket.socket) -> bool:
+        """Checks the client runs as the same user as the daemon, if the platform can
+        tell."""
+        if not hasattr(socket, "SO_PEERCRED"):
+            return True
+        creds = conn.getsockopt(
+            socket.SOL_SOCKET,
+            socket.SO_PEERCRED,
+            struct.calcsize("3i"),
+        )
+        _pid, uid, _gid = struct.unpack("3i", creds)
+        return uid == os.getuid()
+
+    def handle(self, conn: socket.socket) -> NoReturn:
+        """Run the CLI in the forked child with the client's context, then exit."""
+        exit_code = 1
+        try:
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.default_int_handler)
+            conn.settimeout(None)
+            if not self.peer_allowed(conn):
+                os._exit(exit_code)
+            request, fds = _recv_request(conn)
+
+            os.chdir(request["cwd"])
+            os.environ.clear()
+            os.environ.update(request["env"])
+            for stream in sys.stdout, sys.stderr:
+                stream.flush()
+            for target_fd, client_fd in zip(STDIO_FDS, fds):
+                os.dup2(client_fd, target_fd)
+                os.close(client_fd)
+            # Line-buffer output to terminals, like Python does at startup.
+            for stream in sys.stdout, sys.stderr:
+                stream.reconfigure(  # type: ignore[attr-defined]
+                    line_buffering=stream.isatty(),
+                )
+
+            conn.sendall(_INT.pack(os.getpid()))
+            exit_code = self.invoke(request["args"], request["prog_name"])
+        finally:
+            for stream in sys.stdout, sys.stderr:
+                with suppress(Exception):
+                    stream.flush()
+            with suppress(OSError):
+                conn.sendall(_INT.pack(exit_code))
+            os._exit(exit_code)
+
+    def invoke(self, args: list[str], prog_name: str) -> int:
+        """Run the CLI in standalone mode and return its exit code."""
+        try:
+            self.cli.main(args=args, prog_name=prog_name)
+        except SystemExit as ex:
+            if ex.code is None:
+                return 0
+            if isinstance(ex.code, int):
+                return ex.code
+            print(ex.code, file=sys.stderr)
+            return 1
+        except BaseException:
+            traceback.print_exc()
+            return 1
+        return 0
+
+
+if __name__ == "__main__":
+    import_path, socket_path, idle_timeout = sys.argv[1:4]
+    CommandServer(import_path, socket_path, float(idle_timeout)).serve()
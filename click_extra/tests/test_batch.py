@@ -0,0 +1,211 @@
+# Copyright Kevin Deldycke <kevin@deldycke.com> and contributors.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import os
+
+import click
+import pytest
+
+from click_extra import argument, echo, option, pass_context, style
+from click_extra.batch import (
+    CHUNK_SIZE,
+    MAX_PENDING_CHUNKS,
+    BatchResult,
+    batch,
+    parse_record,
+    run_batch,
+)
+from click_extra.decorators import extra_group
+
+
+@pytest.mark.parametrize(
+    ("record", "expected"),
+    (
+        ("", None),
+        ("   \n", None),
+        ("# A comment.", None),
+        ("greet alice\n", ["greet", "alice"]),
+        (
+            "greet 'alice smith' --shout  # Trailing comment.",
+            ["greet", "alice smith", "--shout"],
+        ),
+        ('["greet", "alice # smith"]', ["greet", "alice # smith"]),
+        ("open issue#12 v1#beta  # Comment.", ["open", "issue#12", "v1#beta"]),
+        ("url https://example.com/#anchor", ["url", "https://example.com/#anchor"]),
+        (
+            "echo '# quoted' \"a #b\" \\#escaped #",
+            ["echo", "# quoted", "a #b", "#escaped"],
+        ),
+        ("[]", []),
+    ),
+)
+def test_parse_record(record, expected):
+    assert parse_record(record) == expected
+
+
+@pytest.mark.parametrize("record", ('"unbalanced', "[1, 2]", "[oops"))
+def test_invalid_record(record):
+    with pytest.raises(ValueError):
+        parse_record(record)
+
+
+@pytest.fixture
+def batch_cli():
+    @extra_group(version="1.0.0")
+    def batch_cli():
+        pass
+
+    @batch_cli.command()
+    @argument("name")
+    @option("--shout", is_flag=True)
+    @option("--fail", is_flag=True)
+    @pass_context
+    def greet(ctx, name, shout, fail):
+        logger = logging.getLogger("batch_test")
+        logger.addHandler(logging.NullHandler())
+        logging.getLogger("click_extra").debug("Debug message.")
+        message = f"Hello {name}!"
+        echo(style(message.upper() if shout else message, fg="green"))
+        if fail:
+            ctx.exit(3)
+
+    @batch_cli.command()
+    def crash():
+        raise RuntimeError("Boom.")
+
+    return batch_cli
+
+
+RECORDS = (
+    "greet alice\n",
+    "\n",
+    "# Skipped.\n",
+    '--verbosity DEBUG greet "bob smith" --shout\n',
+    '["greet", "carol", "--fail"]\n',
+    "greet dave\n",
+    "crash\n",
+    "greet 'unbalanced\n",
+)
+
+
+def check_results(results: list[BatchResult]):
+    assert [(r.line, r.args, r.exit_code) for r in results] == [
+        (1, ["greet", "alice"], 0),
+        (4, ["--verbosity", "DEBUG", "greet", "bob smith", "--shout"], 0),
+        (5, ["greet", "carol", "--fail"], 3),
+        (6, ["greet", "dave"], 0),
+        (7, ["crash"], 1),
+        (8, [], 2),
+    ]
+    assert [r.stdout for r in results] == [
+        "Hello alice!\n",
+        "HELLO BOB SMITH!\n",
+        "Hello carol!\n",
+        "Hello dave!\n",
+        "",
+        "",
+    ]
+    # Verbosity does not leak from a record to the next.
+    assert "debug: Debug message.\n" in results[1].stderr
+    assert not results[3].stderr
+    assert "RuntimeError: Boom." in results[4].stderr
+    assert results[5].stderr == "Error: Invalid record: No closing quotation\n"
+
+
+def test_run_batch(batch_cli):
+    check_results(list(run_batch(batch_cli, RECORDS)))
+
+    # Loggers are restored after each record.
+    assert not logging.getLogger("batch_test").handlers
+    assert logging.getLogger("click_extra").level == logging.NOTSET
+
+
+def test_run_batch_isolation(monkeypatch):
+    monkeypatch.delenv("BATCH_TEST_VAR", raising=False)
+
+    @extra_group(version="1.0.0")
+    def isolated_cli():
+        pass
+
+    @isolated_cli.command()
+    def setenv():
+        echo(f"<stdin>: {click.get_text_stream('stdin').read()!r}")
+        echo(f"Previous value: {os.environ.get('BATCH_TEST_VAR')}")
+        os.environ["BATCH_TEST_VAR"] = "leaked"
+
+    results = list(run_batch(isolated_cli, ["setenv", "setenv"]))
+    assert [r.stdout for r in results] == [
+        "<stdin>: ''\nPrevious value: None\n",
+    ] * 2
+    assert "BATCH_TEST_VAR" not in os.environ
+
+
+def test_run_batch_colors(batch_cli):
+    (result,) = run_batch(batch_cli, ["greet alice"], color=True)
+    assert result.stdout == "\x1b[32mHello alice!\x1b[0m\n"
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="fork() required",
+)
+def test_run_batch_workers(batch_cli):
+    check_results(list(run_batch(batch_cli, RECORDS, workers=3)))
+
+
+@pytest.mark.skipif(
+    "fork" not in multiprocessing.get_all_start_methods(),
+    reason="fork() required",
+)
+def test_run_batch_workers_read_ahead(batch_cli):
+    """Records are read as they are run, not all submitted up front."""
+    consumed = 0
+
+    def records():
+        nonlocal consumed
+        for i in range(1000):
+            consumed += 1
+            yield f"greet user-{i}"
+
+    results = run_batch(batch_cli, records(), workers=2)
+    assert next(results).stdout == "Hello user-0!\n"
+    # Chunks in flight, plus the one submitted after the first result was awaited.
+    assert consumed <= (MAX_PENDING_CHUNKS * 2 + 1) * CHUNK_SIZE
+    assert [r.stdout for r in results] == [
+        f"Hello user-{i}!\n" for i in range(1, 1000)
+    ]
+    assert consumed == 1000
+
+
+def test_batch_cli(invoke, batch_cli, monkeypatch):
+    monkeypatch.setattr("click_extra.batch.load_cli", lambda import_path: batch_cli)
+
+    result = invoke(
+        batch, "some.module:cli", "--format", "json", input="".join(RECORDS)
+    )
+    assert result.exit_code == 1
+    check_results(
+        [BatchResult(**json.loads(line)) for line in result.stdout.splitlines()]
+    )
+
+    result = invoke(batch, "some.module:cli", input="greet alice\ngreet bob\n")
+    assert result.exit_code == 0
+    assert result.stdout == "Hello alice!\nHello bob!\n"
@@ -18,12 +18,19 @@ from __future__ import annotations
 
 import logging
 import re
+import threading
 from textwrap import dedent
+from unittest.mock import Mock, patch
 
 import click
 import cloup
 import pytest
-from boltons.strutils import strip_ansi
+import regex as re3
+from boltons.strutils import (
+    complement_int_list,
+    int_ranges_from_int_list,
+    strip_ansi,
+)
 from pytest_cases import parametrize
 
 from click_extra import (
@@ -39,9 +46,15 @@ from click_extra import (
     style,
 )
 from click_extra.colorize import (
+    BRACKETS_REGEX,
+    DEPRECATED_REGEX,
+    ExtraHelpColorsMixin,
+    HelpCache,
     HelpExtraFormatter,
     HelpExtraTheme,
+    apply_style,
     default_theme,
+    escape_for_help_screen,
     highlight,
 )
 from click_extra.decorators import (
@@ -101,6 +114,36 @@ def test_extra_theme():
     assert second_theme is new_theme
 
 
+def test_theme_ansi_table():
+    """Precompiled ANSI codes render the same strings as calling the styles."""
+    table = default_theme.ansi_table
+    assert set(table) == set(HelpExtraTheme.__dataclass_fields__)
+    # The table is compiled once per theme.
+    assert default_theme.ansi_table is table
+
+    for style_id in table:
+        style = getattr(default_theme, style_id)
+        assert default_theme.render(style_id, "text") == style("text")
+        assert apply_style(style, "text") == style("text")
+
+    assert table["info"] == ("", "")
+    assert table["success"] == ("\x1b[32m", "\x1b[0m")
+
+    # Styles are compiled once and shared between themes.
+    new_theme = default_theme.with_(choice=Style(fg=Color.red))
+    assert new_theme.ansi_table is not table
+    assert new_theme.ansi_table["success"] is table["success"]
+    assert new_theme.render("choice", "text") == "\x1b[31mtext\x1b[0m"
+
+    # Arbitrary callables cannot be compiled and are called as-is.
+    upper_theme = default_theme.with_(choice=str.upper)
+    assert upper_theme.ansi_table["choice"] is None
+    assert upper_theme.render("choice", "text") == "TEXT"
+    transform = Style(fg=Color.red, text_transform=str.upper)
+    assert apply_style(transform, "text") == "\x1b[31mTEXT\x1b[0m"
+    assert apply_style(None, "text") == "text"
+
+
 def test_options_highlight():
     formatter = HelpExtraFormatter()
     formatter.write("applies filtering by --manager and --exclude options")
@@ -153,6 +196,253 @@ def test_only_full_word_highlight():
     assert strip_ansi(output) == output
 
 
+def legacy_highlight(formatter, help_text):
+    """Reference implementation running one substitution per keyword."""
+    help_text = DEPRECATED_REGEX.sub(formatter.colorize, help_text)
+    for subcommand in formatter.subcommands:
+        help_text = re.sub(
+            rf"(\ \ )(?P<subcommand>{re.escape(subcommand)})(\s)",
+            formatter.colorize,
+            help_text,
+        )
+    help_text = BRACKETS_REGEX.sub(formatter.colorize, help_text)
+    for cli_name in formatter.cli_names:
+        help_text = re.sub(
+            rf"(\s)(?P<invoked_command>{re.escape(cli_name)})(\s)",
+            formatter.colorize,
+            help_text,
+        )
+    for matching_keywords, style_group_id in (
+        (sorted(formatter.long_options, reverse=True), "long_option"),
+        (sorted(formatter.short_options), "short_option"),
+        (sorted(formatter.choices, reverse=True), "choice"),
+        (sorted(formatter.metavars, reverse=True), "metavar"),
+    ):
+        for keyword in matching_keywords:
+            help_text = re.sub(
+                rf"([\s\[\|\(])(?P<{style_group_id}>"
+                rf"{escape_for_help_screen(keyword)})(\W)",
+                formatter.colorize,
+                help_text,
+            )
+    return help_text
+
+
+@pytest.fixture
+def huge_cli():
+    """A group with 300 subcommands and options with 300 choices."""
+    choices = [f"choice-{i}" for i in range(300)]
+
+    @extra_group(
+        help="Repeated -h -h or --level --level and -a -b, see choice-1 choice-1.",
+    )
+    @option("-a", "--level", type=click.Choice(choices), default="choice-42")
+    @option("-b", "--other-level", type=click.Choice(choices), multiple=True)
+    def huge_cli(level, other_level):
+        pass
+
+    for i in range(300):
+        huge_cli.command(
+            name=f"subcmd-{i}",
+            help=f"Subcommand using --level {choices[i]} and -b LEVEL.",
+        )(lambda: None)
+
+    return huge_cli
+
+
+def test_keyword_patterns_match_legacy(huge_cli):
+    """Single-pass highlighting produces the same output as one pass per keyword."""
+    ctx = huge_cli.make_context("huge-cli", [], resilient_parsing=True, color=True)
+    with ctx:
+        formatter = ctx.make_formatter()
+        huge_cli.format_help(ctx, formatter)
+        raw_help = cloup.HelpFormatter.getvalue(formatter)
+
+        expected = legacy_highlight(formatter, raw_help)
+        output = formatter.highlight_extra_keywords(raw_help)
+        assert output == expected
+
+        # Each category of keywords is compiled into a single pattern, whatever the
+        # number of keywords it holds.
+        assert [p.style_group_id for p in formatter.keyword_patterns] == [
+            "subcommand",
+            "invoked_command",
+            "long_option",
+            "short_option",
+            "choice",
+            "metavar",
+        ]
+
+        # Compiled patterns are cached on the command and reused on the next rendering.
+        cached_patterns = formatter.keyword_patterns
+        formatter = ctx.make_formatter()
+        huge_cli.format_help(ctx, formatter)
+        assert formatter.keyword_patterns is cached_patterns
+
+        # Adding a parameter invalidates the cache.
+        huge_cli.params.append(click.Option(["--new-option"]))
+        formatter = ctx.make_formatter()
+        huge_cli.format_help(ctx, formatter)
+        assert formatter.keyword_patterns is not cached_patterns
+
+
+def test_no_color_help_skips_highlighting(huge_cli):
+    """Uncolored help screens skip keyword collection and highlighting."""
+    ctx = huge_cli.make_context("huge-cli", [], resilient_parsing=True, color=True)
+    with ctx:
+        colored_help = huge_cli.get_help(ctx)
+
+        ctx.color = False
+        with patch.object(
+            ExtraHelpColorsMixin,
+            "_collect_keywords",
+            side_effect=AssertionError("Keywords must not be collected."),
+        ), patch.object(
+            HelpExtraFormatter,
+            "highlight_extra_keywords",
+            side_effect=AssertionError("Keywords must not be highlighted."),
+        ):
+            uncolored_help = huge_cli.get_help(ctx)
+
+    assert colored_help != uncolored_help
+    assert strip_ansi(colored_help) == uncolored_help
+
+
+@pytest.mark.parametrize("terminal_width", (None, 40))
+@pytest.mark.parametrize("color", (True, False))
+def test_stream_help(monkeypatch, huge_cli, terminal_width, color):
+    """Streamed help screens are the same as those rendered in full."""
+    monkeypatch.setattr(HelpExtraFormatter, "stream_rows", 50)
+    ctx = huge_cli.make_context("huge-cli", [], resilient_parsing=True, color=color)
+    ctx.terminal_width = terminal_width
+    with ctx:
+        expected = huge_cli.get_help(ctx)
+
+        chunks: list[str] = []
+        huge_cli.stream_help(ctx, chunks.append)
+        assert "".join(chunks) == expected
+        # Subcommands are split into chunks of 50 rows.
+        assert len(chunks) > 300 / 50
+        assert max(map(len, chunks)) < len(expected) / 2
+
+        assert list(huge_cli.iter_help(ctx)) == chunks
+
+        # The rendering thread stops if the generator is closed early.
+        help_iterator = huge_cli.iter_help(ctx)
+        assert next(help_iterator) == chunks[0]
+        help_iterator.close()
+        assert not any(t.name == "click-extra-help" for t in threading.enumerate())
+
+
+@pytest.mark.parametrize(
+    "params",
+    ({"help_stream": True}, {"help_pager": True}),
+)
+def test_stream_help_option(invoke, params):
+    @extra_group
+    def normal_cli():
+        pass
+
+    @extra_group(**params)
+    def stream_cli():
+        pass
+
+    for group in normal_cli, stream_cli:
+        for i in range(3):
+            group.command(name=f"subcmd-{i}", help=f"Subcommand #{i}.")(
+                lambda: None,
+            )
+
+    for color in True, False:
+        normal = invoke(normal_cli, "--help", color=color)
+        streamed = invoke(stream_cli, "--help", color=color)
+        assert streamed.exit_code == 0
+        assert streamed.stdout == normal.stdout.replace("normal-cli", "stream-cli")
+
+
+def test_help_cache(invoke, tmp_path):
+    help_cache = HelpCache(max_size=2, path=tmp_path)
+
+    @extra_group(help_cache=help_cache)
+    def cached_cli():
+        pass
+
+    @cached_cli.command()
+    def subcmd1():
+        pass
+
+    result = invoke(cached_cli, "--help", color=True)
+    assert result.exit_code == 0
+    colored_help = result.stdout
+    assert len(help_cache) == 1
+
+    # Second rendering is served from the cache.
+    with patch.object(
+        ExtraHelpColorsMixin,
+        "_collect_keywords",
+        side_effect=AssertionError("Help screen must not be rendered."),
+    ):
+        result = invoke(cached_cli, "--help", color=True)
+    assert result.exit_code == 0
+    assert result.stdout == colored_help
+    assert len(help_cache) == 1
+
+    # The color flag is part of the key.
+    result = invoke(cached_cli, "--no-color", "--help", color=True)
+    assert result.exit_code == 0
+    assert result.stdout == strip_ansi(colored_help)
+    assert len(help_cache) == 2
+
+    # Help screens are exported to the cache directory.
+    assert sorted(p.name.rsplit(".", 1)[1] for p in tmp_path.iterdir()) == [
+        "ansi",
+        "txt",
+    ]
+    assert next(tmp_path.glob("cached-cli.*.ansi")).read_text() + "\n" == colored_help
+
+    # Adding a subcommand invalidates the cached help screen. The cache stays
+    # bounded.
+    @cached_cli.command()
+    def subcmd2():
+        pass
+
+    result = invoke(cached_cli, "--help", color=True)
+    assert result.exit_code == 0
+    assert "subcmd2" in result.stdout
+    assert len(help_cache) == 2
+
+    help_cache.clear()
+    assert len(help_cache) == 0
+
+
+def test_help_cache_theme(invoke, monkeypatch):
+    help_cache = HelpCache()
+
+    @extra_command(help_cache=help_cache)
+    def themed_cli():
+        pass
+
+    result = invoke(themed_cli, "--help", color=True)
+    assert result.exit_code == 0
+    default_help = result.stdout
+    assert len(help_cache) == 1
+
+    # Changing the theme invalidates the cached help screen.
+    red_theme = default_theme.with_(option=Style(fg="red"))
+    monkeypatch.setattr("click_extra.colorize.default_theme", red_theme)
+    result = invoke(themed_cli, "--help", color=True)
+    assert result.exit_code == 0
+    assert result.stdout != default_help
+    assert "\x1b[31m--help\x1b[0m" in result.stdout
+    assert len(help_cache) == 2
+
+    # Uncolored help screens do not depend on the theme.
+    invoke(themed_cli, "--no-color", "--help", color=True)
+    monkeypatch.undo()
+    invoke(themed_cli, "--no-color", "--help", color=True)
+    assert len(help_cache) == 3
+
+
 @skip_windows_colors
 def test_keyword_collection(invoke):
     # Create a dummy Click CLI.
@@ -560,6 +850,48 @@ def test_substring_highlighting(substrings, expected, ignore_case):
     assert result == expected
 
 
+def legacy_substring_highlight(string, substrings, styling_method, ignore_case=False):
+    """Reference implementation of ``highlight()`` on ``boltons`` integer lists."""
+    ranges = set()
+    for part in set(substrings):
+        flags = re3.IGNORECASE if ignore_case else 0
+        ranges |= {
+            f"{match.start()}-{match.end() - 1}"
+            for match in re3.finditer(part, string, flags=flags, overlapped=True)
+        }
+    ranges = ",".join(ranges)
+    highlight_ranges = int_ranges_from_int_list(ranges)
+    untouched_ranges = int_ranges_from_int_list(
+        complement_int_list(ranges, range_end=len(string)),
+    )
+    styled_str = ""
+    for i, j in sorted(highlight_ranges + untouched_ranges):
+        segment = string[i : j + 1]
+        if (i, j) in highlight_ranges:
+            segment = styling_method(segment)
+        styled_str += segment
+    return styled_str
+
+
+@pytest.mark.parametrize("ignore_case", (True, False))
+def test_substring_highlighting_match_legacy(ignore_case):
+    """Interval merging produces the same output as integer lists on long strings."""
+    line = "Hey-xx-xxx-heY-xXxXxxxxx-hey-abcdef-" * 500
+    substrings = ("hey", "xx", "xXx", "bcd", "cde", "-a")
+
+    legacy_style = Mock(wraps=default_theme.success)
+    legacy = legacy_substring_highlight(
+        line, substrings, styling_method=legacy_style, ignore_case=ignore_case
+    )
+
+    style = Mock(wraps=default_theme.success)
+    result = highlight(line, substrings, styling_method=style, ignore_case=ignore_case)
+
+    assert result == legacy
+    # Overlapping and contiguous matches are merged into the same styled segments.
+    assert style.call_args_list == legacy_style.call_args_list
+
+
 @parametrize(
     "cmd_decorator, cmd_type",
     # Skip click extra's commands, as help option is already part of the default.
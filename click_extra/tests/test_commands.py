@@ -21,8 +21,12 @@ from __future__ import annotations
 import ast
 import inspect
 import re
+import subprocess
+import sys
+from difflib import get_close_matches
 from pathlib import Path
 from textwrap import dedent
+from unittest.mock import patch
 
 import click
 import cloup
@@ -30,7 +34,9 @@ import pytest
 from pytest_cases import fixture, parametrize
 
 from click_extra import echo, option, option_group, pass_context
-from click_extra.decorators import extra_command, extra_group
+from click_extra.colorize import ExtraHelpColorsMixin
+from click_extra.commands import CommandIndex, LazyCommand
+from click_extra.decorators import extra_command, extra_group, lazy_group
 
 from .conftest import (
     command_decorators,
@@ -87,6 +93,58 @@ def test_module_root_declarations():
     assert expected_members == click_extra_members
 
 
+def test_lazy_module_root():
+    """Importing the package must not load any of Click Extra's submodules, nor their
+    heavy dependencies, until one of their members is accessed."""
+    probe = dedent(
+        """
+        import sys
+        import click_extra
+        loaded = set(sys.modules)
+        print(sorted(m for m in loaded if m.startswith("click_extra.")))
+        print(sorted(m for m in {mods} if m in loaded))
+        click_extra.ExtraCommand
+        print("click_extra.commands" in sys.modules)
+        """,
+    ).format(
+        mods=(
+            "boltons",
+            "commentjson",
+            "mergedeep",
+            "pygments",
+            "pytest",
+            "requests",
+            "tabulate",
+            "wcmatch",
+            "xmltodict",
+            "yaml",
+        ),
+    )
+    result = subprocess.run(
+        (sys.executable, "-c", probe),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout == "[]\n[]\nTrue\n"
+
+
+def test_lazy_member_resolution():
+    import click_extra
+    from click_extra.colorize import HelpOption
+    from click_extra.decorators import command, group, help_option
+
+    # Our members take precedence over the Click and Cloup ones of the same name.
+    assert click_extra.command is command
+    assert click_extra.group is group
+    assert click_extra.help_option is help_option
+    assert click_extra.HelpOption is HelpOption
+
+    assert "ExtraGroup" in dir(click_extra)
+    with pytest.raises(AttributeError, match="has no attribute 'unknown_member'"):
+        click_extra.unknown_member  # noqa: B018
+
+
 @fixture
 def all_command_cli():
     """A CLI that is mixing all variations and flavors of subcommands."""
@@ -196,7 +254,7 @@ def test_help_eagerness(invoke, all_command_cli, params):
 @pytest.mark.parametrize("cmd_id", ("default", "click-extra", "cloup", "click"))
 @pytest.mark.parametrize("param", ("-h", "--help"))
 def test_subcommand_help(invoke, all_command_cli, cmd_id, param):
-    result = invoke(all_command_cli, f"{cmd_id}-subcommand", param)
+    result = invoke(all_command_cli, f"{cmd_id}-subcommand", param, color=True)
     assert result.exit_code == 0
     assert not result.stderr
 
@@ -273,7 +331,7 @@ def test_integrated_version_value(invoke, all_command_cli):
 )
 @pytest.mark.parametrize("param", ("-h", "--help"))
 def test_colored_bare_help(invoke, cmd_decorator, param):
-    """Extra decorators are always colored.
+    """Extra decorators are colored in terminals.
 
     Even when stripped of their default parameters, as reported in:
     https://github.com/kdeldycke/click-extra/issues/534
@@ -284,7 +342,7 @@ def test_colored_bare_help(invoke, cmd_decorator, param):
     def bare_cli():
         pass
 
-    result = invoke(bare_cli, param)
+    result = invoke(bare_cli, param, color=True)
     assert result.exit_code == 0
     assert not result.stderr
     assert (
@@ -293,6 +351,18 @@ def test_colored_bare_help(invoke, cmd_decorator, param):
         "  \x1b[36m-h\x1b[0m, \x1b[36m--help\x1b[0m  Show this message and exit.\n"
     ) in result.stdout
 
+    # Help piped to a non-terminal is not highlighted, as colors were not explicitly
+    # requested.
+    with patch.object(
+        ExtraHelpColorsMixin,
+        "_collect_keywords",
+        side_effect=AssertionError("Keywords must not be collected."),
+    ):
+        result = invoke(bare_cli, param, color=False)
+    assert result.exit_code == 0
+    assert not result.stderr
+    assert "\nOptions:\n  -h, --help  Show this message and exit.\n" in result.stdout
+
 
 def test_no_option_leaks_between_subcommands(invoke):
     """As reported in https://github.com/kdeldycke/click-extra/issues/489."""
@@ -491,3 +561,196 @@ def test_raw_args(invoke):
         Raw parameters: ['--int-param', '33']
         """,
     )
+
+
+def test_lazy_group(invoke, tmp_path, monkeypatch):
+    """Lazy subcommands are only imported on invocation."""
+    tmp_path.joinpath("lazy_subcmd_module.py").write_text(
+        dedent(
+            """\
+            from click_extra import echo
+            from click_extra.decorators import extra_command
+
+            @extra_command
+            def heavy():
+                echo("Heavy subcommand invoked.")
+            """,
+        ),
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_subcmd_module", raising=False)
+
+    @lazy_group
+    def lazy_cli():
+        echo("Lazy group invoked.")
+
+    lazy_cli.add_lazy_command(
+        "lazy_subcmd_module:heavy",
+        "heavy",
+        short_help="Expensive to import.",
+        aliases=["hv"],
+    )
+    lazy_cli.add_lazy_command(
+        "lazy_subcmd_module.heavy",
+        "hidden-heavy",
+        hidden=True,
+    )
+
+    result = invoke(lazy_cli, "--help", color=False)
+    assert result.exit_code == 0
+    assert re.search(r"\n  heavy \(hv\)\s+Expensive to import.\n", result.stdout)
+    assert "hidden-heavy" not in result.stdout
+    assert "lazy_subcmd_module" not in sys.modules
+
+    completions = lazy_cli.shell_complete(click.Context(lazy_cli), "he")
+    assert [(c.value, c.help) for c in completions] == [
+        ("heavy", "Expensive to import."),
+    ]
+    assert "lazy_subcmd_module" not in sys.modules
+
+    # Invocation by alias loads the real command.
+    result = invoke(lazy_cli, "hv", color=False)
+    assert result.exit_code == 0
+    assert result.stdout == "Lazy group invoked.\nHeavy subcommand invoked.\n"
+    assert "lazy_subcmd_module" in sys.modules
+    heavy = sys.modules["lazy_subcmd_module"].heavy
+    assert lazy_cli.commands["heavy"] is heavy
+    assert isinstance(lazy_cli.commands["hidden-heavy"], LazyCommand)
+
+
+def test_lazy_group_conf(invoke, tmp_path, monkeypatch, create_config):
+    """Configuration of lazy subcommands is applied once they are loaded."""
+    tmp_path.joinpath("lazy_conf_module.py").write_text(
+        dedent(
+            """\
+            from click_extra import echo, option
+            from click_extra.decorators import extra_command
+
+            @extra_command
+            @option("--int-param", type=int, default=10)
+            def sub(int_param):
+                echo(f"int_param is {int_param!r}")
+            """,
+        ),
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazy_conf_module", raising=False)
+
+    @lazy_group
+    def lazy_conf_cli():
+        pass
+
+    lazy_conf_cli.add_lazy_command("lazy_conf_module:sub", "sub")
+
+    conf_path = create_config(
+        "conf.toml",
+        "[lazy-conf-cli.sub]\nint_param = 3\nunknown_param = 5\n",
+    )
+    result = invoke(lazy_conf_cli, "--config", str(conf_path), "sub", color=False)
+    assert result.exit_code == 0
+    assert result.stdout == "int_param is 3\n"
+
+    # Command line still takes precedence over configuration.
+    result = invoke(
+        lazy_conf_cli,
+        "--config",
+        str(conf_path),
+        "sub",
+        "--int-param",
+        "7",
+        color=False,
+    )
+    assert result.stdout == "int_param is 7\n"
+
+
+def test_lazy_command_wrong_target():
+    lazy_cmd = LazyCommand("wrong", "click_extra:__version__")
+    with pytest.raises(TypeError, match="click_extra:__version__ is not a command"):
+        lazy_cmd.load()
+
+
+def test_command_suggestions(invoke):
+    @extra_group(prefix_matching=True)
+    def prefix_cli():
+        pass
+
+    for name in ("deploy", "destroy", "status"):
+        prefix_cli.command(name=name)(lambda: None)
+    prefix_cli.add_command(cloup.Command(name="remote", aliases=["rmt"]))
+
+    # Unambiguous prefixes, of names or aliases, resolve to the command.
+    for prefix in ("dep", "st", "rem", "rm"):
+        result = invoke(prefix_cli, prefix, "--help", color=False)
+        assert result.exit_code == 0
+        assert "Usage: prefix-cli " in result.stdout
+
+    # Ambiguous prefixes list their candidates.
+    result = invoke(prefix_cli, "de")
+    assert result.exit_code == 2
+    assert (
+        "Error: No such command 'de'. Did you mean one of these?\n"
+        "   deploy\n"
+        "   destroy\n"
+    ) in result.stderr
+
+    # Typos get suggestions.
+    result = invoke(prefix_cli, "stauts")
+    assert result.exit_code == 2
+    assert "Error: No such command 'stauts'. Did you mean 'status'?" in result.stderr
+
+    # Prefix matching is opt-in.
+    prefix_cli.prefix_matching = False
+    result = invoke(prefix_cli, "dep")
+    assert result.exit_code == 2
+    assert "Error: No such command 'dep'. Did you mean 'deploy'?" in result.stderr
+
+
+def test_command_index_suggest_fallback():
+    """Names without n-grams in common with the index are compared to all names."""
+    index = CommandIndex(["cd", "deploy", "ls", "status"])
+    assert index.suggest("stauts") == ["status"]
+    # Shorter than an n-gram.
+    assert index.suggest("l") == ["ls"]
+    # No n-gram shared with any name.
+    assert index.suggest("d-e-p-l-o-y") == ["deploy"]
+    assert index.suggest("xyz") == []
+
+
+def test_command_index_suggestions():
+    """Suggestions from the index match Cloup's on a 10k-command group."""
+    words = ("deploy", "build", "status", "config", "remote", "branch", "fetch")
+
+    @extra_group
+    def huge_group():
+        pass
+
+    for i in range(10_000):
+        name = f"{words[i % 7]}-{words[i // 7 % 7]}-{i}"
+        huge_group.add_command(click.Command(name))
+
+    index = huge_group.command_index
+    assert len(index.names) == 10_000
+    assert huge_group.command_index is index
+    assert index.prefix_matches("build-fetch-3") == sorted(
+        name for name in huge_group.commands if name.startswith("build-fetch-3")
+    )
+
+    error = click.UsageError("No such command.")
+    valid_names = [*huge_group.commands, *huge_group.alias2name]
+    for typo in ("deplyo-build-42", "status_fetch_1234", "config-remote-999x"):
+        expected = cloup.Group.handle_bad_command_name(
+            huge_group, typo, valid_names, error
+        )
+        with patch(
+            "click_extra.commands.get_close_matches", wraps=get_close_matches
+        ) as spy:
+            result = huge_group.handle_bad_command_name(typo, valid_names, error)
+        assert str(result) == str(expected)
+        # Only a shortlist of the names is ranked.
+        spy.assert_called_once()
+        assert len(spy.call_args.args[1]) < len(valid_names) // 10
+
+    # New subcommands are indexed.
+    huge_group.add_command(click.Command("brand-new"))
+    assert huge_group.command_index is not index
+    assert huge_group.command_index.prefix_matches("brand-") == ["brand-new"]
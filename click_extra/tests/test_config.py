@@ -17,13 +17,19 @@
 from __future__ import annotations
 
 import re
+import subprocess
+import sys
+from enum import Enum
 from pathlib import Path
 from textwrap import dedent
+from unittest.mock import patch
 
 import click
 import pytest
 from boltons.pathutils import shrinkuser
+from boltons.urlutils import URL
 from pytest_cases import fixture, parametrize
+from wcmatch.glob import iglob
 
 from click_extra import (
     command,
@@ -31,13 +37,24 @@ from click_extra import (
     get_app_dir,
     option,
     pass_context,
+    search_params,
 )
 from click_extra.colorize import escape_for_help_screen
+from click_extra.config import (
+    ConfigOption,
+    Formats,
+    _parsers,
+    get_parser,
+    http_session,
+    parser_loaders,
+    register_format,
+)
 from click_extra.decorators import config_option, extra_group
 
 from .conftest import (
     default_debug_uncolored_log_end,
     default_debug_uncolored_log_start,
+    skip_windows,
 )
 
 DUMMY_TOML_FILE, DUMMY_TOML_DATA = (
@@ -588,3 +605,621 @@ def test_conf_metadata(
             "default_map={}\n"
         )
         assert result.stderr == f"Load configuration matching {conf_path}\n"
+
+
+def test_dotted_subcommand_conf(invoke, create_config):
+    """IDs containing the separator of the flat index are kept whole in the trees."""
+
+    @extra_group
+    def dotted_cli():
+        pass
+
+    @dotted_cli.command(name="v1.2")
+    @option("--opt", default="x")
+    def v1_2(opt):
+        echo(f"opt = {opt!r}")
+
+    conf_path = create_config(
+        "dotted.toml",
+        dedent(
+            """
+            [dotted-cli."v1.2"]
+            opt = "y"
+            """,
+        ),
+    )
+    result = invoke(dotted_cli, "--config", str(conf_path), "v1.2", color=False)
+    assert result.exit_code == 0
+    assert result.stdout == "opt = 'y'\n"
+
+    config_opt = search_params(dotted_cli.params, ConfigOption)
+    assert config_opt.params_template["dotted-cli"]["v1.2"] == {"opt": None}
+    assert "v1" not in config_opt.params_template["dotted-cli"]
+
+
+def test_conf_does_not_leak_between_invocations(
+    invoke, simple_config_cli, create_config
+):
+    """Configuration loaded by an invocation must not persist in the next ones."""
+    full_conf = create_config(
+        "full.toml",
+        dedent(
+            """
+            [config-cli1]
+            dummy_flag = true
+            my_list = ["a", "b"]
+
+            [config-cli1.default-command]
+            int_param = 3
+            """,
+        ),
+    )
+    partial_conf = create_config(
+        "partial.toml",
+        dedent(
+            """
+            [config-cli1.default-command]
+            int_param = 7
+            """,
+        ),
+    )
+
+    result = invoke(
+        simple_config_cli, "--config", str(full_conf), "default-command", color=False
+    )
+    assert result.exit_code == 0
+    assert result.stdout == (
+        "dummy_flag = True\nmy_list = ('a', 'b')\nint_parameter = 3\n"
+    )
+
+    result = invoke(
+        simple_config_cli, "--config", str(partial_conf), "default-command", color=False
+    )
+    assert result.exit_code == 0
+    assert result.stdout == "dummy_flag = False\nmy_list = ()\nint_parameter = 7\n"
+
+    # The template structure is left untouched.
+    config_opt = search_params(simple_config_cli.params, ConfigOption)
+    assert config_opt.params_template == {
+        "config-cli1": {
+            "dummy_flag": None,
+            "my_list": None,
+            "default-command": {"int_param": None},
+            "verbosity": None,
+            "color": None,
+            "time": None,
+        },
+    }
+
+
+def test_conf_not_rendered_in_disabled_logs(invoke, simple_config_cli, create_config):
+    """The parsed configuration is only rendered if debug logs are enabled."""
+    renders = []
+
+    class RenderSpy(dict):
+        def __repr__(self):
+            renders.append(True)
+            return super().__repr__()
+
+    read_and_parse_conf = ConfigOption.read_and_parse_conf
+
+    def spy_conf(self, pattern):
+        conf_path, user_conf = read_and_parse_conf(self, pattern)
+        return conf_path, RenderSpy(user_conf)
+
+    conf_path = create_config("conf.toml", "[config-cli1]\ndummy_flag = true\n")
+    with patch.object(ConfigOption, "read_and_parse_conf", spy_conf):
+        result = invoke(
+            simple_config_cli, "--config", str(conf_path), "default-command"
+        )
+        assert result.exit_code == 0
+        assert not renders
+
+        result = invoke(
+            simple_config_cli,
+            "--verbosity",
+            "DEBUG",
+            "--config",
+            str(conf_path),
+            "default-command",
+        )
+        assert result.exit_code == 0
+        assert renders
+
+
+def test_filter_conf():
+    """Only keys of the user configuration registered in the template are kept."""
+    template = {"cli": {"flag": None, "sub": {"int_param": None}, "empty": {}}}
+    user_conf = {
+        "cli": {
+            "flag": True,
+            "unknown": 1,
+            "sub": {"int_param": None, "random": "stuff"},
+            "empty": {},
+        },
+        "other-cli": {"flag": False},
+    }
+    option = ConfigOption()
+    assert option.filter_conf(template, user_conf) == {"cli": {"flag": True}}
+    # Inputs are not modified.
+    assert template == {"cli": {"flag": None, "sub": {"int_param": None}, "empty": {}}}
+    assert user_conf["cli"]["unknown"] == 1
+
+    strict_option = ConfigOption(strict=True)
+    with pytest.raises(
+        ValueError,
+        match="Parameter 'unknown' is not allowed in configuration file.",
+    ):
+        strict_option.filter_conf(template, user_conf)
+
+
+def test_recursive_update():
+    """The deprecated alias returns the template updated with the user config."""
+    template = {"cli": {"flag": None, "sub": {"int_param": None}}}
+    user_conf = {"cli": {"flag": True, "unknown": 1, "sub": {"int_param": 3}}}
+    option = ConfigOption()
+    with pytest.warns(FutureWarning, match=r"recursive_update\(\) is deprecated"):
+        updated = option.recursive_update(template, user_conf)
+    assert updated == {"cli": {"flag": True, "sub": {"int_param": 3}}}
+    # The template is not modified.
+    assert template == {"cli": {"flag": None, "sub": {"int_param": None}}}
+
+
+def test_lazy_format_parsers(tmp_path):
+    """Parsing a TOML file must not import the libraries of the other formats."""
+    conf_path = tmp_path / "conf.toml"
+    conf_path.write_text(DUMMY_TOML_FILE)
+    probe = dedent(
+        f"""
+        import sys
+        from click_extra.config import ConfigOption, Formats
+        option = ConfigOption(formats=(Formats.TOML, Formats.YAML))
+        conf_path, user_conf = option.read_and_parse_conf({str(conf_path)!r})
+        assert user_conf == {DUMMY_TOML_DATA!r}
+        print(sorted({{"commentjson", "xmltodict", "yaml"}} & set(sys.modules)))
+        """,
+    )
+    result = subprocess.run(
+        (sys.executable, "-c", probe),
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout == "[]\n"
+
+
+class CustomFormats(Enum):
+    PROPERTIES = ("properties",)
+
+
+@pytest.fixture
+def properties_format():
+    """Register a minimal format of dot-separated ``key = value`` lines."""
+
+    def properties_parser():
+        def parse(conf_text):
+            conf: dict = {}
+            for line in conf_text.splitlines():
+                path, value = (item.strip() for item in line.split("=", 1))
+                *sections, key = path.split(".")
+                leaf = conf
+                for section in sections:
+                    leaf = leaf.setdefault(section, {})
+                leaf[key] = value
+            return conf
+
+        return parse
+
+    register_format(CustomFormats.PROPERTIES, properties_parser)
+    yield CustomFormats.PROPERTIES
+    # Unregister the format, and its parser cached by a test.
+    parser_loaders.pop(CustomFormats.PROPERTIES, None)
+    _parsers.pop(CustomFormats.PROPERTIES, None)
+
+
+def test_register_format(invoke, create_config, properties_format):
+    @command(context_settings={"show_default": True})
+    @option("--int-param", type=int, default=10)
+    @config_option(formats=(Formats.TOML, properties_format))
+    def custom_format_cli(int_param):
+        echo(f"int_parameter is {int_param!r}")
+
+    result = invoke(custom_format_cli, "--help")
+    assert result.exit_code == 0
+    assert "*.{toml,properties}]" in result.stdout
+
+    conf_path = create_config("conf.properties", "custom-format-cli.int_param = 42")
+    result = invoke(custom_format_cli, "--config", str(conf_path))
+    assert result.exit_code == 0
+    assert result.stdout == "int_parameter is 42\n"
+
+
+@parametrize(
+    ("location, content_type, formats, expected"),
+    (
+        (Path("conf.toml"), None, tuple(Formats), [Formats.TOML]),
+        (Path("conf.YML"), None, tuple(Formats), [Formats.YAML]),
+        (Path(".commandrc"), None, tuple(Formats), tuple(Formats)),
+        (Path("conf.cfg"), None, tuple(Formats), tuple(Formats)),
+        # Forced formats takes precedence over the extension.
+        (Path("conf.json"), None, (Formats.YAML,), (Formats.YAML,)),
+        (URL("https://example.com/conf.xml"), None, tuple(Formats), [Formats.XML]),
+        (
+            URL("https://example.com/conf.json?raw=1"),
+            "text/plain",
+            tuple(Formats),
+            [Formats.JSON],
+        ),
+        (
+            URL("https://example.com/conf"),
+            "application/x-yaml; charset=utf-8",
+            tuple(Formats),
+            (Formats.YAML,),
+        ),
+        (
+            URL("https://example.com/conf"),
+            "application/json",
+            (Formats.TOML,),
+            (Formats.TOML,),
+        ),
+        (URL("https://example.com/conf"), "text/plain", tuple(Formats), tuple(Formats)),
+    ),
+)
+def test_guess_formats(location, content_type, formats, expected):
+    option = ConfigOption(formats=formats)
+    assert option.guess_formats(location, content_type) == expected
+
+
+def test_content_type_dispatch(httpserver):
+    httpserver.expect_request("/conf").respond_with_data(
+        DUMMY_JSON_FILE,
+        content_type="application/json",
+    )
+    conf_url = httpserver.url_for("/conf")
+
+    option = ConfigOption()
+    with patch.object(
+        ConfigOption,
+        "parse_conf",
+        autospec=True,
+        side_effect=ConfigOption.parse_conf,
+    ) as parse_conf:
+        location, user_conf = option.read_and_parse_conf(conf_url)
+
+    assert str(location) == conf_url
+    assert user_conf == DUMMY_JSON_DATA
+    parse_conf.assert_called_once_with(option, DUMMY_JSON_FILE, (Formats.JSON,))
+
+
+def test_search_and_read_conf(tmp_path):
+    conf_path = tmp_path / "conf.toml"
+    conf_path.write_text(DUMMY_TOML_FILE)
+
+    option = ConfigOption()
+    assert list(option.search_and_read_conf(str(conf_path))) == [
+        (conf_path, DUMMY_TOML_FILE),
+    ]
+    assert list(option.search_and_read_conf_with_type(str(conf_path))) == [
+        (conf_path, DUMMY_TOML_FILE, None),
+    ]
+
+
+@parametrize(
+    ("filename", "tried_formats"),
+    (
+        ("conf.xml", [Formats.XML]),
+        ("conf", [Formats.TOML, Formats.YAML, Formats.JSON, Formats.INI, Formats.XML]),
+    ),
+)
+def test_format_dispatch(tmp_path, filename, tried_formats):
+    """Files with an extension are only fed to the parser of their format. Others are
+    successively fed to all parsers."""
+    conf_path = tmp_path / filename
+    conf_path.write_text("<cli>\n<sub><int_param>3</int_param></sub>\n</cli>\n")
+
+    option = ConfigOption()
+    tried = []
+
+    def spy_get_parser(conf_format):
+        tried.append(conf_format)
+        return get_parser(conf_format)
+
+    def spy_load_ini_config(content):
+        tried.append(Formats.INI)
+        return ConfigOption.load_ini_config(option, content)
+
+    with patch("click_extra.config.get_parser", side_effect=spy_get_parser):
+        with patch.object(option, "load_ini_config", side_effect=spy_load_ini_config):
+            location, user_conf = option.read_and_parse_conf(str(conf_path))
+
+    assert location == conf_path
+    assert user_conf == {"cli": {"sub": {"int_param": "3"}}}
+    assert tried == tried_formats
+
+
+def test_yaml_safe_loading():
+    import yaml
+
+    parser = get_parser(Formats.YAML)
+    assert parser("key: [1, 2]\n") == {"key": [1, 2]}
+    # Arbitrary Python objects are not constructed.
+    with pytest.raises(yaml.constructor.ConstructorError):
+        parser("key: !!python/tuple [1, 2]\n")
+
+
+def test_json_fast_path():
+    parser = get_parser(Formats.JSON)
+    conf_text = dedent(
+        """
+        {
+            # Comment markers within strings are preserved.
+            "url": "https://example.com/#anchor",  // Inline comment.
+            "quote": "\\"#not a comment\\"",
+            "items": [1, 2, 3]
+        }
+        """,
+    )
+    expected = {
+        "url": "https://example.com/#anchor",
+        "quote": '"#not a comment"',
+        "items": [1, 2, 3],
+    }
+    # commentjson is not needed to parse JSON with comments.
+    with patch("commentjson.loads", side_effect=AssertionError):
+        assert parser(conf_text) == expected
+        assert parser(DUMMY_JSON_FILE) == DUMMY_JSON_DATA
+
+    # Invalid JSON is still reported as an error.
+    with pytest.raises(ValueError):
+        parser("{'single': 'quotes'}")
+
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    cache_dir = tmp_path / "conf-cache"
+    with patch.object(ConfigOption, "cache_dir", return_value=cache_dir):
+        yield cache_dir
+
+
+def test_conf_cache(invoke, create_config, cache_dir):
+    @command
+    @option("--int-param", type=int, default=10)
+    @config_option(cache=True)
+    def cached_cli(int_param):
+        echo(f"int_parameter is {int_param!r}")
+
+    conf_path = create_config("conf.toml", "[cached-cli]\nint_param = 3\n")
+
+    # Cold run populates the cache.
+    result = invoke(cached_cli, "--config", str(conf_path))
+    assert result.exit_code == 0
+    assert result.stdout == "int_parameter is 3\n"
+    assert len(list(cache_dir.glob("*.pickle"))) == 1
+
+    # Warm run skips parsing.
+    with patch.object(ConfigOption, "parse_conf", side_effect=AssertionError):
+        result = invoke(cached_cli, "--config", str(conf_path))
+    assert result.exit_code == 0
+    assert result.stdout == "int_parameter is 3\n"
+
+    # Modified file invalidates the cache and replaces its entry.
+    conf_path.write_text("[cached-cli]\nint_param = 42\n")
+    result = invoke(cached_cli, "--config", str(conf_path))
+    assert result.exit_code == 0
+    assert result.stdout == "int_parameter is 42\n"
+    assert len(list(cache_dir.glob("*.pickle"))) == 1
+
+
+def test_conf_cache_eviction(tmp_path, cache_dir):
+    conf_text = '{"cli": {"int_param": 3}}'
+    option = ConfigOption(cache=True)
+    entries = []
+    for index in range(3):
+        conf_path = tmp_path / f"conf{index}.json"
+        conf_path.write_text(conf_text)
+        assert option.read_and_parse_conf(str(conf_path)) == (
+            conf_path,
+            {"cli": {"int_param": 3}},
+        )
+        entries.append(option.cache_entry(conf_path))
+        assert entries[-1].exists()
+
+    # Shrink the cache to a single entry: only the most recent one is kept.
+    option.cache_max_size = entries[-1].stat().st_size
+    option.save_cached_conf(
+        entries[-1],
+        option.cache_key(conf_path, conf_text, (Formats.JSON,)),
+        {"cli": {"int_param": 3}},
+    )
+    assert [e.exists() for e in entries] == [False, False, True]
+
+    # Corrupted entries are discarded.
+    entries[-1].write_bytes(b"garbage")
+    with patch.object(ConfigOption, "parse_conf", return_value={}) as parse_conf:
+        option.read_and_parse_conf(str(conf_path))
+    parse_conf.assert_called_once()
+
+
+def test_remote_conf_cache(httpserver, cache_dir):
+    import requests
+
+    httpserver.expect_ordered_request("/conf").respond_with_data(
+        DUMMY_JSON_FILE,
+        headers={"ETag": '"v1"', "Last-Modified": "Mon, 02 Oct 2023 10:00:00 GMT"},
+        content_type="application/json",
+    )
+    httpserver.expect_ordered_request(
+        "/conf",
+        headers={
+            "If-None-Match": '"v1"',
+            "If-Modified-Since": "Mon, 02 Oct 2023 10:00:00 GMT",
+        },
+    ).respond_with_data("", status=304)
+    conf_url = httpserver.url_for("/conf")
+
+    option = ConfigOption(cache=True, timeout=5)
+    # Cold run downloads the configuration, then the warm run gets a 304 and reuses
+    # the cached copy.
+    for _ in range(2):
+        location, user_conf = option.read_and_parse_conf(conf_url)
+        assert str(location) == conf_url
+        assert user_conf == DUMMY_JSON_DATA
+    httpserver.check_assertions()
+
+    # Cached copy is served if the host can't be reached.
+    with patch.object(
+        http_session(),
+        "get",
+        side_effect=requests.ConnectionError("Host unreachable"),
+    ):
+        location, user_conf = option.read_and_parse_conf(conf_url)
+        assert user_conf == DUMMY_JSON_DATA
+
+        # Without cache, the error is propagated.
+        with pytest.raises(requests.ConnectionError):
+            ConfigOption().read_and_parse_conf(conf_url)
+
+    # Cached copy is served if the server replies with an error.
+    httpserver.clear()
+    httpserver.expect_request("/conf").respond_with_data(
+        "Service Unavailable", status=503
+    )
+    assert option.download_conf(URL(conf_url)) == (
+        DUMMY_JSON_FILE,
+        "application/json",
+    )
+    location, user_conf = option.read_and_parse_conf(conf_url)
+    assert str(location) == conf_url
+    assert user_conf == DUMMY_JSON_DATA
+
+    # Without cache, the error is reported and the configuration skipped.
+    assert ConfigOption().download_conf(URL(conf_url)) is None
+
+
+def test_remote_conf_timeout(httpserver):
+    httpserver.expect_request("/conf").respond_with_data(DUMMY_TOML_FILE)
+    option = ConfigOption(timeout=3)
+    with patch.object(
+        http_session(),
+        "get",
+        wraps=http_session().get,
+    ) as session_get:
+        location, user_conf = option.read_and_parse_conf(httpserver.url_for("/conf"))
+    assert user_conf == DUMMY_TOML_DATA
+    assert session_get.call_args.kwargs["timeout"] == 3
+
+
+@pytest.fixture
+def conf_tree(tmp_path):
+    """A tree of configuration files, with pruned folders and a symlink loop."""
+    for conf_file in (
+        "conf.toml",
+        "a/conf.toml",
+        "a/b/conf.toml",
+        "a/b/c/conf.toml",
+        ".git/conf.toml",
+        "node_modules/pkg/conf.toml",
+        "a/ignored.yaml",
+    ):
+        path = tmp_path / "tree" / conf_file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(DUMMY_TOML_FILE)
+    (tmp_path / "tree" / "a" / "b" / "loop").symlink_to(tmp_path / "tree" / "a")
+    return tmp_path / "tree"
+
+
+@skip_windows
+@parametrize(
+    ("search_max_depth", "pruned_dirs", "expected"),
+    (
+        (
+            None,
+            None,
+            ["conf.toml", "a/conf.toml", "a/b/conf.toml", "a/b/c/conf.toml"],
+        ),
+        (1, None, ["conf.toml", "a/conf.toml"]),
+        (0, None, ["conf.toml"]),
+        (
+            None,
+            ("a",),
+            ["conf.toml", ".git/conf.toml", "node_modules/pkg/conf.toml"],
+        ),
+    ),
+)
+def test_search_files(conf_tree, search_max_depth, pruned_dirs, expected):
+    option = ConfigOption(search_max_depth=search_max_depth, pruned_dirs=pruned_dirs)
+    found = option.search_files(f"{conf_tree}/**/*.toml")
+    assert [f.relative_to(conf_tree).as_posix() for f in found] == expected
+
+
+@pytest.fixture
+def mixed_case_tree(tmp_path, monkeypatch):
+    """A tree of configuration files with mixed-case names, set as the working
+    directory."""
+    for conf_file in (
+        "conf.toml",
+        "Sub/conf.toml",
+        "Sub/Deep/CONF.TOML",
+        "Sub/Deep/ignored.yaml",
+        "other/conf.toml",
+        "Node_Modules/pkg/conf.toml",
+    ):
+        path = tmp_path / "tree" / conf_file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(DUMMY_TOML_FILE)
+    monkeypatch.chdir(tmp_path / "tree")
+    return tmp_path / "tree"
+
+
+@skip_windows
+@parametrize(
+    "pattern",
+    (
+        "**/*.toml",
+        "./**/*.toml",
+        "./Sub/./**/*.toml",
+        "SUB/**/*.toml",
+        "sub/../OTHER/**/*.toml",
+        "{tree}/**/*.toml",
+        "{tree}/./SUB/**/*.toml",
+        "{tree}/missing/**/*.toml",
+    ),
+)
+def test_search_files_match_iglob(mixed_case_tree, pattern):
+    """Recursive patterns produce the same files as ``wcmatch.glob.iglob``."""
+    pattern = pattern.format(tree=mixed_case_tree)
+    option = ConfigOption(pruned_dirs=())
+    found = {f.resolve() for f in option.search_files(pattern)}
+    assert found == {
+        Path(f).resolve() for f in iglob(pattern, flags=ConfigOption.GLOB_FLAGS)
+    }
+
+
+@skip_windows
+def test_search_files_pruned_ignorecase(mixed_case_tree):
+    option = ConfigOption(pruned_dirs=("node_modules",))
+    found = option.search_files("./**/*.toml")
+    assert [f.as_posix() for f in found] == [
+        "conf.toml",
+        "Sub/conf.toml",
+        "Sub/Deep/CONF.TOML",
+        "other/conf.toml",
+    ]
+
+
+@skip_windows
+def test_search_files_index(conf_tree, cache_dir):
+    option = ConfigOption(cache=True)
+    pattern = f"{conf_tree}/**/*.toml"
+    expected = list(option.search_files(pattern))
+    assert (cache_dir / "dir-index.pickle").exists()
+
+    # Warm search reuses listings of unchanged directories.
+    with patch("os.scandir", side_effect=AssertionError):
+        assert list(option.search_files(pattern)) == expected
+
+    # A new file changes the modification time of its directory, which is listed
+    # again.
+    new_file = conf_tree / "a" / "b" / "new.toml"
+    new_file.write_text(DUMMY_TOML_FILE)
+    assert list(option.search_files(pattern)) == [*expected[:3], new_file, expected[3]]
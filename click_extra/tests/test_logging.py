@@ -16,17 +16,47 @@
 
 from __future__ import annotations
 
+import ast
+import gzip
+import json
 import logging
+import os
 import random
 import re
+import threading
+import time
+from pathlib import Path
+from typing import Iterator
+from unittest.mock import patch
 
 import click
 import pytest
 from pytest_cases import parametrize
 
+import click_extra
 from click_extra import echo
-from click_extra.decorators import extra_command, verbosity_option
-from click_extra.logging import DEFAULT_LEVEL, LOG_LEVELS
+from click_extra.colorize import default_theme
+from click_extra.config import ConfigOption
+from click_extra.decorators import (
+    extra_command,
+    extra_group,
+    log_file_option,
+    log_format_option,
+    verbosity_option,
+)
+from click_extra.logging import (
+    DEFAULT_LEVEL,
+    LOG_LEVELS,
+    AsyncLogHandler,
+    BufferedFileHandler,
+    ExtraLogFormatter,
+    ExtraLogHandler,
+    JSONLogFormatter,
+    LogFileOption,
+    LogFormatOption,
+    VerbosityOption,
+    extra_basic_config,
+)
 
 from .conftest import (
     command_decorators,
@@ -211,3 +241,629 @@ def test_custom_option_name(invoke):
             ),
             result.stderr,
         )
+
+
+@pytest.mark.parametrize("params", (("--verbosity", "DEBUG"), None))
+def test_async_handler(invoke, params):
+    """Messages queued by the asynchronous handler are all written when the CLI
+    closes."""
+    logger = extra_basic_config("async_app", handler_class=AsyncLogHandler)
+    logger.propagate = False
+
+    @click.command
+    @verbosity_option(default_logger=logger)
+    def async_app():
+        echo("Starting Async App...")
+        for i in range(1000):
+            logger.debug(f"Message #{i}.")
+
+    result = invoke(async_app, params, color=False)
+    assert result.exit_code == 0
+    assert result.stdout == "Starting Async App...\n"
+    if params:
+        # Messages of the internal logger are written synchronously by the root
+        # handler, so they may interleave with the asynchronous ones.
+        lines = result.stderr.splitlines()
+        assert [line for line in lines if "Message" not in line] == [
+            "debug: Set <Logger click_extra (DEBUG)> to DEBUG.",
+            "debug: Set <Logger async_app (DEBUG)> to DEBUG.",
+            "debug: Reset <Logger async_app (DEBUG)> to WARNING.",
+            "debug: Reset <Logger click_extra (DEBUG)> to WARNING.",
+        ]
+        assert [line for line in lines if "Message" in line] == [
+            f"debug: Message #{i}." for i in range(1000)
+        ]
+    else:
+        assert not result.stderr
+
+    # Closing the handler stops its writer thread.
+    (handler,) = logger.handlers
+    logger.removeHandler(handler)
+    handler.close()
+    assert "click-extra-log-writer" not in {t.name for t in threading.enumerate()}
+
+
+def test_async_handler_coalesced_writes():
+    """Messages queued while the writer thread is busy are written in a single
+    call."""
+    first_write = threading.Event()
+    release = threading.Event()
+    writes = []
+
+    def blocking_echo(message, **kwargs):
+        writes.append(click.unstyle(message))
+        first_write.set()
+        assert release.wait(timeout=10)
+
+    logger = extra_basic_config(
+        "coalesced_app", handler_class=AsyncLogHandler, level=logging.DEBUG
+    )
+    logger.propagate = False
+    (handler,) = logger.handlers
+    try:
+        with patch.object(click, "echo", side_effect=blocking_echo):
+            logger.debug("Message #0.")
+            # Queue all other messages while the first one is being written.
+            assert first_write.wait(timeout=10)
+            for i in range(1, 500):
+                logger.debug("Message #%d.", i)
+            release.set()
+            handler.flush()
+    finally:
+        release.set()
+        extra_basic_config("coalesced_app", handlers=(logging.NullHandler(),))
+
+    assert writes == [
+        "debug: Message #0.",
+        "\n".join(f"debug: Message #{i}." for i in range(1, 500)),
+    ]
+
+
+def test_async_handler_bounded_queue():
+    """Emitting records blocks while the queue of the writer thread is full."""
+    release = threading.Event()
+    writes = []
+
+    def blocking_echo(message, **kwargs):
+        assert release.wait(timeout=10)
+        writes.append(click.unstyle(message))
+
+    handler = AsyncLogHandler(max_queue_size=10)
+    logger = extra_basic_config("bounded_app", handlers=(handler,), level=logging.DEBUG)
+    logger.propagate = False
+    producer = threading.Thread(
+        target=lambda: [logger.debug("Message #%d.", i) for i in range(100)],
+    )
+    try:
+        with patch.object(click, "echo", side_effect=blocking_echo):
+            producer.start()
+            deadline = time.monotonic() + 10
+            while not handler._queue.full():
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+            # The producer waits for the writer thread to free some room.
+            producer.join(timeout=0.1)
+            assert producer.is_alive()
+            assert handler._queue.qsize() == 10
+
+            release.set()
+            producer.join(timeout=10)
+            assert not producer.is_alive()
+            handler.flush()
+    finally:
+        release.set()
+        extra_basic_config("bounded_app", handlers=(logging.NullHandler(),))
+
+    assert "\n".join(writes).splitlines() == [
+        f"debug: Message #{i}." for i in range(100)
+    ]
+
+
+def test_verbosity_option_handler_class(invoke):
+    """The verbosity option sets up its logger with the requested handler class."""
+
+    @click.command
+    @verbosity_option(default_logger="handler_app", handler_class=AsyncLogHandler)
+    def handler_app():
+        logging.getLogger("handler_app").info("Hello!")
+
+    logger = logging.getLogger("handler_app")
+    logger.propagate = False
+    (handler,) = logger.handlers
+    assert isinstance(handler, AsyncLogHandler)
+
+    result = invoke(handler_app, "--verbosity", "INFO", color=False)
+    assert result.exit_code == 0
+    assert result.stderr == "info: Hello!\n"
+
+    extra_basic_config("handler_app", handlers=(logging.NullHandler(),))
+
+
+@pytest.mark.parametrize(
+    ("default_logger", "handler_class", "expected_class"),
+    (
+        (None, None, ExtraLogHandler),
+        (None, AsyncLogHandler, AsyncLogHandler),
+        (logging.getLogger(), AsyncLogHandler, AsyncLogHandler),
+    ),
+)
+def test_verbosity_option_root_handler(default_logger, handler_class, expected_class):
+    """The root logger is set up by ``None``, not by its ambiguous ``root`` name."""
+    with patch(
+        "click_extra.logging.extra_basic_config", wraps=extra_basic_config
+    ) as config_spy:
+        option = VerbosityOption(
+            default_logger=default_logger, handler_class=handler_class
+        )
+    try:
+        config_spy.assert_called_once_with(None, handler_class=expected_class)
+        assert option.logger_name == "root"
+        (handler,) = logging.getLogger().handlers
+        assert isinstance(handler, expected_class)
+    finally:
+        extra_basic_config()
+
+
+def eager_log_calls(source: str) -> Iterator[int]:
+    """Yields line numbers of log calls rendering their message before the call."""
+    log_methods = {"debug", "info", "warning", "error", "critical", "exception", "log"}
+    for node in ast.walk(ast.parse(source)):
+        if not (
+            isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute)
+            and node.func.attr in log_methods
+        ):
+            continue
+        # Only consider calls on loggers.
+        receiver = node.func.value
+        if not (
+            (isinstance(receiver, ast.Name) and receiver.id.endswith("logger"))
+            or (
+                isinstance(receiver, ast.Call)
+                and isinstance(receiver.func, ast.Attribute)
+                and receiver.func.attr == "getLogger"
+            )
+        ):
+            continue
+        for arg in node.args:
+            if (
+                isinstance(arg, ast.JoinedStr)
+                or (isinstance(arg, ast.BinOp) and isinstance(arg.op, ast.Mod))
+                or (
+                    isinstance(arg, ast.Call)
+                    and isinstance(arg.func, ast.Attribute)
+                    and arg.func.attr == "format"
+                )
+            ):
+                yield node.lineno
+
+
+def test_lazy_log_calls():
+    """Messages of internal log calls are only rendered if their level is enabled.
+
+    They have to be passed as ``%``-style templates and arguments, not as f-strings
+    or pre-formatted strings.
+    """
+    assert list(eager_log_calls('logger.debug(f"Conf: {conf}")')) == [1]
+    assert list(eager_log_calls('logger.debug("Conf: %s" % conf)')) == [1]
+    assert list(eager_log_calls('logger.debug("Conf: %s", conf)')) == []
+
+    package_dir = Path(click_extra.__file__).parent
+    eager_calls = [
+        f"{path.name}:{line}"
+        for path in sorted(package_dir.glob("*.py"))
+        for line in eager_log_calls(path.read_text(encoding="utf-8"))
+    ]
+    assert not eager_calls
+
+
+def test_formatter_does_not_mutate_records():
+    """Each handler gets the original level name of the record."""
+    formatter = ExtraLogFormatter("{levelname}: {message}", style="{")
+    plain_formatter = logging.Formatter("{levelname}: {message}", style="{")
+    record = logging.makeLogRecord(
+        {"levelname": "ERROR", "levelno": logging.ERROR, "msg": "Boom"}
+    )
+
+    assert formatter.format(record) == "\x1b[31merror\x1b[0m: Boom"
+    assert record.levelname == "ERROR"
+    assert plain_formatter.format(record) == "ERROR: Boom"
+
+    # Levels unknown to the theme are left untouched.
+    record.levelname = "CUSTOM"
+    assert formatter.format(record) == "CUSTOM: Boom"
+
+    # Styling is skipped if colors are disabled in the context.
+    record.levelname = "ERROR"
+    ctx = click.Context(click.Command("cli"), color=False)
+    with ctx:
+        assert formatter.format(record) == "error: Boom"
+
+
+@pytest.mark.parametrize(
+    ("fmt", "style"),
+    (
+        ("%(levelname)s: %(message)s", "%"),
+        ("%(levelname)-16s|%(message)s", "%"),
+        ("{levelname!r} {message}", "{"),
+        ("{levelname:>16}|{message}", "{"),
+        ("$levelname: $message", "$"),
+        ("${levelname}|${message}", "$"),
+        ("%(message)s", "%"),
+    ),
+)
+def test_formatter_styles(fmt, style):
+    """Level names are rendered in templates of all styles, with their format
+    specifications."""
+    record = logging.makeLogRecord(
+        {"levelname": "ERROR", "levelno": logging.ERROR, "msg": "100% {$}"}
+    )
+    styled_record = logging.makeLogRecord(
+        {**record.__dict__, "levelname": "\x1b[31merror\x1b[0m"}
+    )
+    assert ExtraLogFormatter(fmt, style=style).format(record) == logging.Formatter(
+        fmt, style=style
+    ).format(styled_record)
+
+
+def test_formatter_match_legacy():
+    """Precomputed level styles render records like the formatter restyling and
+    mutating each of them."""
+
+    class LegacyFormatter(logging.Formatter):
+        def formatMessage(self, record):
+            level = record.levelname.lower()
+            level_style = getattr(default_theme, level, None)
+            if level_style:
+                record.levelname = level_style(level)
+            return super().formatMessage(record)
+
+    def make_records():
+        return [
+            logging.makeLogRecord(
+                {
+                    "levelname": levelname,
+                    "levelno": logging.getLevelName(levelname),
+                    "msg": f"Msg #{i}.",
+                }
+            )
+            for i in range(1000)
+            for levelname in ("DEBUG", "INFO", "ERROR")
+        ]
+
+    legacy_formatter = LegacyFormatter("{levelname}: {message}", style="{")
+    expected = [legacy_formatter.format(record) for record in make_records()]
+
+    formatter = ExtraLogFormatter("{levelname}: {message}", style="{", color=True)
+    records = make_records()
+    with patch.object(formatter, "level_name", wraps=formatter.level_name) as spy:
+        assert [formatter.format(record) for record in records] == expected
+    # Each level name is styled once, then its style is reused for all its records.
+    assert spy.call_count == 3
+    assert {record.levelname for record in records} == {"DEBUG", "INFO", "ERROR"}
+
+
+@pytest.mark.parametrize("from_conf", (True, False))
+def test_json_log_format(invoke, create_config, from_conf):
+    @extra_group(params=[ConfigOption(), LogFormatOption(), VerbosityOption()])
+    def json_cli():
+        pass
+
+    @json_cli.command()
+    def crash():
+        logging.getLogger().warning("Crashing %s...", "now")
+        try:
+            raise ValueError("Boom.")
+        except ValueError:
+            logging.getLogger("json_app").exception("Crashed.")
+
+    conf_path = create_config(
+        "conf.toml", '[json-cli]\nlog_format = "json"\nverbosity = "DEBUG"\n'
+    )
+    if from_conf:
+        args = ("--config", str(conf_path), "crash")
+    else:
+        args = ("--log-format", "json", "--verbosity", "DEBUG", "crash")
+    result = invoke(json_cli, args, color=False)
+    assert result.exit_code == 0
+    assert not result.stdout
+
+    lines = result.stderr.splitlines()
+    # The location of an explicit configuration file is printed as-is.
+    if from_conf:
+        assert lines.pop(0) == f"Load configuration matching {conf_path}"
+    records = [json.loads(line) for line in lines]
+    # All records of the CLI are rendered as JSON, including the ones logged while
+    # setting up and resetting the verbosity.
+    assert records[0]["message"] == "Set <Logger click_extra (DEBUG)> to DEBUG."
+    assert records[-1]["message"] == "Reset <Logger click_extra (DEBUG)> to WARNING."
+    for record in records:
+        assert list(record)[:5] == [
+            "timestamp",
+            "level",
+            "logger",
+            "message",
+            "command",
+        ]
+        assert re.fullmatch(
+            r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{3}Z", record["timestamp"]
+        )
+
+    warning, error = (r for r in records if r["level"] in ("WARNING", "ERROR"))
+    assert warning == {
+        "timestamp": warning["timestamp"],
+        "level": "WARNING",
+        "logger": "root",
+        "message": "Crashing now...",
+        "command": "json-cli crash",
+    }
+    assert error["logger"] == "json_app"
+    assert error["message"] == "Crashed."
+    assert error["exc_info"].startswith("Traceback (most recent call last):\n")
+    assert error["exc_info"].endswith("ValueError: Boom.")
+
+    # Log format does not leak out of the CLI.
+    result = invoke(json_cli, "--verbosity", "DEBUG", "crash", color=False)
+    assert result.stderr.startswith(
+        "debug: Set <Logger click_extra (DEBUG)> to DEBUG.\n"
+    )
+
+
+def test_json_formatter_match_dict():
+    """Lines assembled by the JSON formatter are the serialization of a ``dict`` per
+    record."""
+    formatter = JSONLogFormatter()
+    records = []
+    for i in range(300):
+        created = 1_700_000_000.25 + i / 100
+        records.append(
+            logging.makeLogRecord(
+                {
+                    "name": "json_app",
+                    "levelname": "DEBUG",
+                    "msg": 'Message #%d with "quotes", \\, \n and ünicode.',
+                    "args": (i,),
+                    "created": created,
+                    "msecs": (created - int(created)) * 1000,
+                }
+            )
+        )
+
+    with patch.object(time, "strftime", wraps=time.strftime) as strftime_spy:
+        lines = [formatter.format(record) for record in records]
+    # The date and time part is rendered once per second.
+    assert strftime_spy.call_count == 4
+
+    for record, line in zip(records, lines):
+        assert line == json.dumps(
+            {
+                "timestamp": formatter.formatTime(record),
+                "level": record.levelname,
+                "logger": record.name,
+                "message": record.getMessage(),
+                "command": None,
+            },
+            ensure_ascii=False,
+        )
+    assert json.loads(lines[0])["timestamp"] == "2023-11-14T22:13:20.250Z"
+    assert json.loads(lines[-1])["timestamp"] == "2023-11-14T22:13:23.240Z"
+
+
+@pytest.mark.parametrize("log_format", ("text", "json"))
+def test_log_file_option(invoke, tmp_path, log_format):
+    @extra_command(version="1.0.0")
+    @log_file_option
+    @log_format_option
+    def file_app():
+        logging.getLogger("file_app").warning("Written to %s.", "file")
+
+    log_path = tmp_path / "logs" / "app.log"
+    log_path.parent.mkdir()
+    args = ("--log-file", str(log_path), "--log-format", log_format)
+    result = invoke(file_app, args, "--verbosity", "DEBUG", color=True)
+    assert result.exit_code == 0
+
+    # The file collects all records of the CLI, up to the reset of the levels.
+    lines = log_path.read_text().splitlines()
+    if log_format == "json":
+        records = [json.loads(line) for line in lines]
+        assert records[0]["message"] == "Set <Logger click_extra (DEBUG)> to DEBUG."
+        (warning,) = (r for r in records if r["level"] == "WARNING")
+        assert warning["logger"] == "file_app"
+        assert warning["message"] == "Written to file."
+        assert records[-1]["message"] == (
+            "Reset <Logger click_extra (DEBUG)> to WARNING."
+        )
+    else:
+        assert re.fullmatch(
+            r"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d,\d{3} "
+            r"debug: Set <Logger click_extra \(DEBUG\)> to DEBUG\.",
+            lines[0],
+        )
+        # Level names are not colored in the file.
+        assert any(line.endswith(" warning: Written to file.") for line in lines)
+        assert lines[-1].endswith(
+            " debug: Reset <Logger click_extra (DEBUG)> to WARNING."
+        )
+    # Neither are messages styled by the CLI.
+    assert "\x1b[" not in log_path.read_text()
+    # Records are still printed to <stderr>.
+    assert "Written to file." in result.stderr
+
+    # The handler is detached once the CLI is done, and the file is appended to.
+    assert not any(
+        isinstance(h, BufferedFileHandler) for h in logging.getLogger().handlers
+    )
+    invoke(file_app, "--log-file", str(log_path), color=False)
+    assert len(log_path.read_text().splitlines()) == len(lines) + 1
+
+
+def test_log_file_option_loggers(invoke, tmp_path):
+    """The handler follows the loggers of the verbosity option."""
+
+    @extra_command(
+        params=[LogFileOption(), VerbosityOption(default_logger="file_app_logger")],
+    )
+    def file_app():
+        logging.getLogger("file_app_logger").warning("App message.")
+        logging.getLogger("file_app_logger.child").warning("Child message.")
+        logging.getLogger("unrelated_logger").warning("Unrelated message.")
+
+    log_path = tmp_path / "app.log"
+    result = invoke(file_app, "--log-file", str(log_path), "-v", "DEBUG", color=False)
+    assert result.exit_code == 0
+
+    lines = [line.split(" ", 2)[2] for line in log_path.read_text().splitlines()]
+    assert lines == [
+        "debug: Set <Logger click_extra (DEBUG)> to DEBUG.",
+        "debug: Set <Logger file_app_logger (DEBUG)> to DEBUG.",
+        "warning: App message.",
+        "warning: Child message.",
+        "debug: Reset <Logger file_app_logger (DEBUG)> to WARNING.",
+        "debug: Reset <Logger click_extra (DEBUG)> to WARNING.",
+    ]
+    for name in ("click_extra", "file_app_logger"):
+        assert not logging.getLogger(name).handlers
+
+
+def test_buffered_file_handler_flush_interval(tmp_path):
+    log_path = tmp_path / "app.log"
+    handler = BufferedFileHandler(log_path, flush_interval=0.05)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = logging.getLogger("buffered_file_app")
+    logger.addHandler(handler)
+    try:
+        logger.warning("Message #1.")
+        # Messages are written by the background thread without explicit flush.
+        deadline = time.monotonic() + 10
+        while not log_path.exists() or not log_path.read_text():
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert log_path.read_text() == "Message #1.\n"
+
+        logger.warning("Message #2.")
+        handler.flush()
+        assert log_path.read_text() == "Message #1.\nMessage #2.\n"
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+
+@pytest.mark.parametrize("compress", (False, True))
+def test_buffered_file_handler_rotation(tmp_path, compress):
+    log_path = tmp_path / "app.log"
+    handler = BufferedFileHandler(
+        log_path,
+        capacity=100,
+        max_bytes=1000,
+        backup_count=2,
+        compress=compress,
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger = logging.getLogger("rotating_file_app")
+    logger.addHandler(handler)
+    try:
+        for i in range(1000):
+            logger.warning("Message #%04d.", i)
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    suffix = ".gz" if compress else ""
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "app.log",
+        f"app.log.1{suffix}",
+        f"app.log.2{suffix}",
+    ]
+    contents = []
+    for path in (
+        tmp_path / f"app.log.2{suffix}",
+        tmp_path / f"app.log.1{suffix}",
+        log_path,
+    ):
+        content = gzip.decompress(path.read_bytes()) if path.suffix == ".gz" else (
+            path.read_bytes()
+        )
+        assert 0 < len(content) <= 1000
+        contents.append(content.decode())
+
+    # Files hold the most recent messages, in order and without gaps.
+    lines = "".join(contents).splitlines()
+    first = int(lines[0][9:13])
+    assert lines == [f"Message #{i:04d}." for i in range(first, 1000)]
+
+
+def test_buffered_file_handler_bounded_queue(tmp_path):
+    """Emitting records blocks while the queue of the writer thread is full."""
+    log_path = tmp_path / "bounded.log"
+    handler = BufferedFileHandler(
+        log_path, capacity=10, flush_interval=60, max_queue_size=2
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    write_chunk = handler._write_chunk
+    release = threading.Event()
+
+    def blocking_write_chunk(chunk):
+        assert release.wait(timeout=10)
+        write_chunk(chunk)
+
+    logger = logging.getLogger("file_bounded")
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.addHandler(handler)
+    producer = threading.Thread(
+        target=lambda: [logger.debug("Message #%02d.", i) for i in range(50)],
+    )
+    try:
+        with patch.object(handler, "_write_chunk", side_effect=blocking_write_chunk):
+            producer.start()
+            deadline = time.monotonic() + 10
+            while not handler._queue.full():
+                assert time.monotonic() < deadline
+                time.sleep(0.01)
+            # The producer waits for the writer thread to free some room.
+            producer.join(timeout=0.1)
+            assert producer.is_alive()
+            assert handler._queue.qsize() == 2
+
+            release.set()
+            producer.join(timeout=10)
+            assert not producer.is_alive()
+            handler.flush()
+    finally:
+        release.set()
+        logger.removeHandler(handler)
+        handler.close()
+
+    assert log_path.read_text() == "".join(f"Message #{i:02d}.\n" for i in range(50))
+
+
+def test_buffered_file_handler_chunks(tmp_path):
+    """Messages are written in chunks of ``capacity`` characters, instead of one write
+    per record."""
+    log_path = tmp_path / "chunks.log"
+    handler = BufferedFileHandler(log_path, capacity=4096, flush_interval=60)
+    handler.setFormatter(logging.Formatter("%(levelname)s: %(message)s"))
+    logger = logging.getLogger("file_chunks")
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    logger.addHandler(handler)
+    try:
+        with patch.object(
+            handler, "_write_chunk", wraps=handler._write_chunk
+        ) as write_spy:
+            for i in range(20_000):
+                logger.debug("Message #%d.", i)
+            handler.flush()
+    finally:
+        logger.removeHandler(handler)
+        handler.close()
+
+    expected = "".join(f"DEBUG: Message #{i}.\n" for i in range(20_000))
+    assert log_path.read_text() == expected
+
+    chunks = [call.args[0] for call in write_spy.call_args_list]
+    assert "".join(chunks) == expected
+    # All chunks but the last one are handed over once they reach the capacity.
+    assert len(chunks) <= len(expected) // 4096 + 1
+    assert all(4096 <= len(chunk) < 4096 + 32 for chunk in chunks[:-1])
@@ -20,9 +20,11 @@ import re
 from os.path import sep
 from pathlib import Path
 from textwrap import dedent
+from unittest.mock import patch
 
 import click
 import pytest
+from mergedeep import merge
 from pytest_cases import parametrize
 from tabulate import tabulate
 
@@ -47,7 +49,13 @@ from click_extra import (
     search_params,
 )
 from click_extra.decorators import extra_command, extra_group, show_params_option
-from click_extra.parameters import ShowParamsOption, extend_envvars, normalize_envvar
+from click_extra.config import ConfigOption
+from click_extra.parameters import (
+    ShowParamsOption,
+    extend_envvars,
+    invalidate_params_index,
+    normalize_envvar,
+)
 from click_extra.platforms import is_windows
 
 from .conftest import command_decorators
@@ -645,3 +653,123 @@ def test_recurse_subcommands(invoke):
     )
     assert result.stdout == f"{output}\n"
 
+
+def test_param_trees_match_legacy():
+    """Compare the single-pass tree builder with a ``mergedeep``-based one."""
+
+    @extra_group(params=[ShowParamsOption()])
+    def huge_cli():
+        pass
+
+    for cmd_index in range(50):
+        huge_cli.add_command(
+            click.Command(
+                f"subcmd-{cmd_index}",
+                params=[click.Option([f"--opt-{i}"]) for i in range(100)],
+            ),
+        )
+
+    show_params = search_params(huge_cli.params, ShowParamsOption)
+
+    def legacy_build():
+        template: dict = {}
+        types: dict = {}
+        for keys, param in show_params.walk_params():
+            if show_params.SEP.join(keys) in show_params.excluded_params:
+                continue
+            merge(template, show_params.init_tree_dict(*keys))
+            param_type = show_params.get_param_type(param)
+            merge(types, show_params.init_tree_dict(*keys, leaf=param_type))
+        return template, types
+
+    with click.Context(huge_cli):
+        legacy_template, legacy_types = legacy_build()
+
+        # The whole command tree is walked once, then the shared index is reused by
+        # all subsequent builds.
+        with patch.object(
+            ShowParamsOption, "walk_params", wraps=show_params.walk_params
+        ) as walk_spy:
+            show_params.build_param_trees()
+            show_params.build_param_trees()
+        assert walk_spy.call_count == 1
+
+        assert show_params.params_template == legacy_template
+        assert show_params.params_types == legacy_types
+
+    # 50 subcommands with 100 options each, plus root-level options that are not
+    # excluded by default.
+    subcmd_params = [p for p in show_params.params_index if ".subcmd-" in p]
+    assert len(subcmd_params) == 5000
+    for path, param in show_params.params_index.items():
+        assert show_params.get_tree_value(
+            show_params.params_objects, *path.split(show_params.SEP)
+        ) is param
+
+
+def test_shared_params_index():
+    """The parameter index is computed once per CLI and shared by all options."""
+
+    @extra_group
+    def shared_cli():
+        pass
+
+    @shared_cli.command()
+    @option("--int-param", type=int)
+    def subcmd(int_param):
+        pass
+
+    config_option = search_params(shared_cli.params, ConfigOption)
+    show_params = search_params(shared_cli.params, ShowParamsOption)
+
+    with click.Context(shared_cli):
+        index = show_params.shared_params_index
+        assert config_option.shared_params_index is index
+
+        entry = index["shared-cli.subcmd.int_param"]
+        assert entry.param is subcmd.params[0]
+        assert entry.python_type is int
+        assert entry.excluded is False
+        assert "SUBCMD_INT_PARAM" in entry.envvars
+        assert index["shared-cli.config"].excluded is True
+
+        # Each option applies its own blocklist on top of the shared index.
+        assert "shared-cli.config" in show_params.params_index
+        assert "shared-cli.config" not in config_option.params_index
+
+        # Adding a subcommand invalidates the index.
+        @shared_cli.command()
+        @option("--flag", is_flag=True)
+        def other_subcmd(flag):
+            pass
+
+        new_index = show_params.shared_params_index
+        assert new_index is not index
+        assert config_option.shared_params_index is new_index
+        assert config_option.params_types["shared-cli"]["other-subcmd"] == {
+            "flag": bool,
+        }
+
+        # Parameters added after the fact require an explicit invalidation.
+        other_subcmd.params.append(click.Option(["--str-param"]))
+        assert show_params.shared_params_index is new_index
+        invalidate_params_index()
+        assert "shared-cli.other-subcmd.str_param" in show_params.params_index
+
+
+def test_shared_params_index_envvar_prefix(invoke):
+    """Environment variables follow the prefix of each invocation of the same CLI."""
+
+    @extra_command(params=[ShowParamsOption()])
+    @option("--int-param", type=int)
+    def prefixed_cli(int_param):
+        pass
+
+    for prefix in ("FIRST", "SECOND"):
+        result = invoke(
+            prefixed_cli, "--show-params", color=False, auto_envvar_prefix=prefix
+        )
+        assert result.exit_code == 0
+        assert f"{prefix}_INT_PARAM" in result.stdout
+        other = "SECOND" if prefix == "FIRST" else "FIRST"
+        assert f"{other}_INT_PARAM" not in result.stdout
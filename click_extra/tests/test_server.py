@@ -0,0 +1,244 @@
+# Copyright Kevin Deldycke <kevin@deldycke.com> and contributors.
+#
+# This program is Free Software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation; either version 2
+# of the License, or (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 59 Temple Place - Suite 330, Boston, MA  02111-1307, USA.
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import time
+from functools import partial
+from textwrap import dedent
+
+import pytest
+
+from click_extra.server import (
+    default_socket_path,
+    forward,
+    server_supported,
+    socket_dir,
+    spawn_server,
+)
+
+pytestmark = pytest.mark.skipif(
+    not server_supported(),
+    reason="Unix sockets and fork() required",
+)
+
+
+CLI_MODULE = dedent(
+    """\
+    import os
+
+    import click
+
+    from click_extra import extra_command, option, pass_context
+
+    @click.command()
+    @click.argument("name")
+    @click.option("--fail", is_flag=True)
+    def warm_cli(name, fail):
+        click.echo(f"Hello {name} from {os.getcwd()}!")
+        click.echo(f"ENV={os.environ.get('WARM_CLI_VAR')}")
+        click.echo(f"PPID={os.getppid()}")
+        if fail:
+            raise click.ClickException("Failed.")
+
+    @extra_command
+    @option("--name", default="World")
+    @pass_context
+    def warm_extra_cli(ctx, name):
+        click.echo(f"Hello {name}!")
+        click.echo(f"show_default={ctx.show_default}")
+        click.echo(f"color={ctx.color}")
+        click.echo(f"conf_source={ctx.meta.get('click_extra.conf_source')}")
+        click.echo(f"PPID={os.getppid()}")
+    """,
+)
+
+
+@pytest.fixture
+def cli_module(tmp_path, monkeypatch):
+    """A CLI in a temporary module, importable by the daemon."""
+    module_dir = tmp_path / "modules"
+    module_dir.mkdir()
+    module_path = module_dir / "warm_cli_module.py"
+    module_path.write_text(CLI_MODULE)
+    monkeypatch.setenv(
+        "PYTHONPATH",
+        os.pathsep.join((str(module_dir), os.environ.get("PYTHONPATH", ""))),
+    )
+    return module_path
+
+
+def wait_for(condition, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.02)
+
+
+def call(socket_path, tmp_path, *args, env=None, cwd=None, prog_name="warm-cli"):
+    """Forward a request to the daemon, and capture its output in files."""
+    stdout_path = tmp_path / "stdout.txt"
+    stderr_path = tmp_path / "stderr.txt"
+    with open(os.devnull) as stdin, stdout_path.open("w") as stdout:
+        with stderr_path.open("w") as stderr:
+            fds = (stdin.fileno(), stdout.fileno(), stderr.fileno())
+            exit_code = forward(
+                socket_path, args, prog_name, env=env, cwd=cwd, fds=fds
+            )
+    return exit_code, stdout_path.read_text(), stderr_path.read_text()
+
+
+def test_socket_permissions(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    path = default_socket_path("some_package.cli:main")
+    assert path.parent == socket_dir() == tmp_path / "click-extra"
+    assert path.name.startswith("some_package.cli_main-")
+    assert path.parent.stat().st_mode & 0o777 == 0o700
+
+    # Refuse directories accessible to other users.
+    path.parent.chmod(0o755)
+    with pytest.raises(PermissionError):
+        socket_dir()
+
+
+def test_no_server(tmp_path):
+    assert forward(tmp_path / "missing.sock", [], "warm-cli") is None
+
+
+def test_server_lifecycle(cli_module, tmp_path):
+    socket_path = tmp_path / "warm.sock"
+    daemon = spawn_server("warm_cli_module:warm_cli", socket_path, idle_timeout=5)
+    wait_for(socket_path.exists)
+    assert socket_path.stat().st_mode & 0o777 == 0o600
+
+    # Arguments, environment and working directory are forwarded.
+    env = {**os.environ, "WARM_CLI_VAR": "forwarded"}
+    exit_code, stdout, stderr = call(
+        socket_path, tmp_path, "World", env=env, cwd=str(cli_module.parent)
+    )
+    assert exit_code == 0
+    assert stdout.startswith(
+        f"Hello World from {cli_module.parent}!\nENV=forwarded\n",
+    )
+    # The CLI runs in a child of the daemon.
+    assert stdout.endswith(f"PPID={daemon.pid}\n")
+    assert not stderr
+
+    # Exit codes and errors are reported.
+    exit_code, stdout, stderr = call(socket_path, tmp_path, "World", "--fail")
+    assert exit_code == 1
+    assert stderr == "Error: Failed.\n"
+
+    exit_code, stdout, stderr = call(socket_path, tmp_path)
+    assert exit_code == 2
+    assert "Error: Missing argument 'NAME'." in stderr
+
+    # A second daemon on the same socket leaves the first one alone.
+    second = spawn_server("warm_cli_module:warm_cli", socket_path, idle_timeout=5)
+    assert second.wait(timeout=10) == 0
+    assert daemon.poll() is None
+
+    # The daemon refuses to serve modified sources, and shuts down.
+    stat = cli_module.stat()
+    os.utime(cli_module, (stat.st_atime, stat.st_mtime + 10))
+    assert call(socket_path, tmp_path, "World") == (None, "", "")
+    assert daemon.wait(timeout=10) == 0
+    assert not socket_path.exists()
+
+
+def test_extra_command(cli_module, tmp_path):
+    """Extra commands are set up in the forked child as in a fresh process."""
+    socket_path = tmp_path / "extra.sock"
+    daemon = spawn_server(
+        "warm_cli_module:warm_extra_cli", socket_path, idle_timeout=2
+    )
+    wait_for(socket_path.exists)
+
+    # The default configuration is looked up in the folders of the client.
+    conf_path = tmp_path / "config" / "warm-extra-cli" / "config.toml"
+    conf_path.parent.mkdir(parents=True)
+    conf_path.write_text('[warm-extra-cli]\nname = "Config"\n')
+    env = {**os.environ, "XDG_CONFIG_HOME": str(tmp_path / "config")}
+    call_extra = partial(call, socket_path, tmp_path, prog_name="warm-extra-cli")
+
+    exit_code, stdout, stderr = call_extra(env=env)
+    assert exit_code == 0
+    # Context defaults of extra commands are applied, and colors are forced.
+    assert stdout == (
+        "Hello Config!\n"
+        "show_default=True\n"
+        "color=True\n"
+        f"conf_source={conf_path.resolve()}\n"
+        f"PPID={daemon.pid}\n"
+    )
+    assert not stderr
+
+    # Explicit parameters are honored.
+    other_conf = tmp_path / "other.toml"
+    other_conf.write_text('[warm-extra-cli]\nname = "Other"\n')
+    exit_code, stdout, stderr = call_extra("--config", str(other_conf), "--no-color")
+    assert exit_code == 0
+    assert stdout.startswith("Hello Other!\nshow_default=True\ncolor=False\n")
+    assert f"conf_source={other_conf}\n" in stdout
+    assert stderr == f"Load configuration matching {other_conf}\n"
+
+    # Help is not colored, as output is not a terminal.
+    exit_code, stdout, stderr = call_extra("--help")
+    assert exit_code == 0
+    assert stdout.startswith("Usage: warm-extra-cli [OPTIONS]\n")
+    assert "\x1b[" not in stdout
+    assert not stderr
+
+    assert daemon.wait(timeout=10) == 0
+    assert not socket_path.exists()
+
+
+def test_idle_timeout(cli_module, tmp_path):
+    socket_path = tmp_path / "idle.sock"
+    daemon = spawn_server("warm_cli_module:warm_cli", socket_path, idle_timeout=0.5)
+    wait_for(socket_path.exists)
+    assert daemon.wait(timeout=10) == 0
+    assert not socket_path.exists()
+
+
+def test_run(cli_module, tmp_path):
+    """The first run is local and starts the daemon used by the next runs."""
+    socket_path = tmp_path / "run.sock"
+    script = (
+        "from click_extra.server import run; "
+        f"run('warm_cli_module:warm_cli', socket_path={str(socket_path)!r}, "
+        "idle_timeout=2)"
+    )
+
+    def run_cli():
+        result = subprocess.run(
+            (sys.executable, "-c", script, "World"),
+            capture_output=True,
+            text=True,
+            timeout=30,
+        )
+        assert result.returncode == 0
+        assert result.stdout.startswith("Hello World from ")
+        return int(result.stdout.rsplit("PPID=", 1)[1])
+
+    assert run_cli() == os.getpid()
+    wait_for(socket_path.exists)
+    assert run_cli() != os.getpid()
+
+    wait_for(lambda: not socket_path.exists())
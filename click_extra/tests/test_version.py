@@ -17,6 +17,9 @@
 from __future__ import annotations
 
 import re
+import subprocess
+import sys
+from textwrap import dedent
 
 import click
 import pytest
@@ -199,3 +202,33 @@ def test_color_option_precedence(invoke):
     assert result.stdout == (
         "\x1b[97mcolor-cli6\x1b[0m, version \x1b[32m2.1.9\x1b[0m\n"
     )
+
+
+def test_version_without_testing_module():
+    """Version option works in processes where ``click.testing`` is not imported."""
+    probe = dedent(
+        """
+        from click_extra import extra_command
+
+        # Mimics a CLI run as ``python -m probe_package``.
+        __package__ = "probe_package"
+
+        @extra_command(version="1.2.3")
+        def probe_cli():
+            pass
+
+        # Version is detected from within a frame named like CliRunner.invoke().
+        def invoke():
+            probe_cli()
+
+        invoke()
+        """,
+    )
+    result = subprocess.run(
+        (sys.executable, "-c", probe, "--version"),
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 0
+    assert "1.2.3" in result.stdout
+    assert not result.stderr
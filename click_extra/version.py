@@ -20,6 +20,7 @@ from __future__ import annotations
 import inspect
 import logging
 import re
+import sys
 import warnings
 from functools import cached_property
 from gettext import gettext as _
@@ -30,7 +31,7 @@ import click
 from boltons.ecoutils import get_profile
 
 from . import Context, Parameter, Style, echo, get_current_context
-from .colorize import default_theme
+from .colorize import apply_style, default_theme
 from .parameters import ExtraOption
 
 if TYPE_CHECKING:
@@ -150,10 +151,13 @@ class ExtraVersionOption(ExtraOption):
             frame_chain.append((frame_name, frame_info.function))
 
             # Stop at the invoke() function of any CliRunner class, which is used for
-            # testing.
-            if frame_info.function == "invoke" and isinstance(
-                frame.f_locals.get("self"),
-                click.testing.CliRunner,
+            # testing. Its module is not imported by Click, so no CliRunner can run
+            # before something else imports it.
+            testing = sys.modules.get("click.testing")
+            if (
+                testing
+                and frame_info.function == "invoke"
+                and isinstance(frame.f_locals.get("self"), testing.CliRunner)
             ):
                 pass
 
@@ -180,7 +184,7 @@ class ExtraVersionOption(ExtraOption):
         if not package_name:
             logger = logging.getLogger("click_extra")
             for counter, (p_name, f_name) in enumerate(frame_chain):
-                logger.debug(f"Inspected frame #{counter}: {p_name}, {f_name}")
+                logger.debug("Inspected frame #%s: %s, %s", counter, p_name, f_name)
             msg = (
                 "Could not determine the package name automatically from the frame "
                 "stack. Try passing 'package_name' instead."
@@ -258,7 +262,7 @@ class ExtraVersionOption(ExtraOption):
             # Get the style function for this part, defaults to `self.message_style`.
             style_func = part_vars.get(part, self.message_style)
             # Apply the style function if any, otherwise just append the part.
-            colored_template += style_func(part) if style_func else part
+            colored_template += apply_style(style_func, part)
 
         return colored_template
 